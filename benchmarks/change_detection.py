@@ -0,0 +1,86 @@
+"""
+Measures the time ChangeDetector takes to derive last_reported for a feed's vehicles, when a fraction of them
+changed since the previous update, as well as the size of its fingerprint store in memory and on disk.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.change_detection [-v 100000] [-c 0.1] [-n 5]
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Dict, List
+
+from x2gbfs.change_detection import ChangeDetector
+
+VEHICLE_TYPE_IDS = ['bike', 'cargo_bike', 'ebike', 'car', 'ecar']
+
+
+def synthetic_vehicles(vehicles: int, last_reported: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    return [
+        {
+            'bike_id': f'vehicle-{i}',
+            'lat': round(48 + rnd.random(), 6),
+            'lon': round(9 + rnd.random(), 6),
+            'is_reserved': rnd.random() < 0.1,
+            'is_disabled': rnd.random() < 0.05,
+            'vehicle_type_id': rnd.choice(VEHICLE_TYPE_IDS),
+            'current_range_meters': rnd.randrange(100000),
+            'last_reported': last_reported,
+        }
+        for i in range(vehicles)
+    ]
+
+
+def next_cycle(vehicles: List[Dict[str, Any]], changed_fraction: float, last_reported: int) -> int:
+    """
+    Stamps all vehicles with last_reported like a provider would and moves changed_fraction of them.
+    Returns the number of moved vehicles.
+    """
+    rnd = random.Random(7)  # noqa: S311 (no cryptographic purpose)
+    changed = 0
+    for vehicle in vehicles:
+        vehicle['last_reported'] = last_reported
+        if rnd.random() < changed_fraction:
+            vehicle['lat'] = round(vehicle['lat'] + 0.0001, 6)
+            changed += 1
+    return changed
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=100000, type=int)
+    parser.add_argument('-c', '--changed', default=0.1, type=float, help='fraction of vehicles changed per update')
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    print(f'vehicles: {args.vehicles}, changed: {args.changed}, runs: {args.runs}')
+    with tempfile.TemporaryDirectory() as state_dir:
+        vehicles = synthetic_vehicles(args.vehicles, 1700000000)
+        tracemalloc.start()
+        detector = ChangeDetector(state_dir)
+        detector.update('feed', 'vehicles', vehicles, 'bike_id', 1700000000)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        detected_as_expected = True
+        for run in range(1, args.runs + 1):
+            last_reported = 1700000000 + run * 60
+            expected = next_cycle(vehicles, args.changed, last_reported)
+            start = time.perf_counter()
+            detected = detector.update('feed', 'vehicles', vehicles, 'bike_id', last_reported)
+            timings.append(time.perf_counter() - start)
+            detected_as_expected &= detected == expected
+
+        file_size = os.path.getsize(os.path.join(state_dir, 'feed.vehicles.fingerprints'))
+        median = statistics.median(timings) * 1000
+        print(f'update median [ms]: {median:7.1f} (including persisting)')
+        print(f'store memory [MiB]: {memory / 1024 / 1024:6.1f}, file [MiB]: {file_size / 1024 / 1024:6.1f}')
+        print(f'changes detected as expected: {detected_as_expected}')
@@ -0,0 +1,62 @@
+"""
+Measures simplification of a synthetic operating area (a noisy ring with a hole close to it)
+for several tolerances and reports vertex counts and the size of the serialized geofencing_zones.json.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.geofencing [-v 20000] [-n 5]
+"""
+
+import math
+import random
+import statistics
+import time
+from argparse import ArgumentParser
+from typing import Any, Dict, List
+
+from x2gbfs.gbfs import GbfsTransformer
+from x2gbfs.gbfs.geometry import count_vertices, simplify_features
+from x2gbfs.gbfs.serializer import get_serializer
+
+TOLERANCES_METERS = (1, 5, 10, 50)
+
+
+def noisy_ring(rnd: random.Random, radius: float, vertices: int, counterclockwise: bool = True) -> List[List[float]]:
+    ring = []
+    direction = 1 if counterclockwise else -1
+    for i in range(vertices):
+        angle = direction * 2 * math.pi * i / vertices
+        # about ±10m of noise
+        noisy_radius = radius + rnd.uniform(-0.0001, 0.0001)
+        ring.append([9.18 + noisy_radius * math.cos(angle) / 0.66, 48.78 + noisy_radius * math.sin(angle)])
+    return ring + [ring[0]]
+
+
+def synthetic_operating_area(vertices: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    exterior = noisy_ring(rnd, 0.05, vertices)
+    # a hole (e.g. a no-parking zone) only about 50m from the exterior
+    hole = noisy_ring(rnd, 0.0495, vertices // 4, counterclockwise=False)
+    return [{'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Polygon', 'coordinates': [exterior, hole]}}]
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vertices', default=20000, type=int, help='vertices of the exterior')
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    serializer = get_serializer()
+    zones = synthetic_operating_area(args.vertices)
+    print(f'vertices: {count_vertices(zones)}, size [KiB]: {len(serializer.dumps(zones)) / 1024:7.1f}')
+    for tolerance in (None, *TOLERANCES_METERS):
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            simplified = simplify_features(zones, tolerance, GbfsTransformer.MAX_COORDINATE_PRECISION)
+            timings.append(time.perf_counter() - start)
+        print(
+            f'tolerance [m]: {tolerance!s:4}, vertices: {count_vertices(simplified):6}, '
+            f'size [KiB]: {len(serializer.dumps(simplified)) / 1024:7.1f}, '
+            f'median [ms]: {statistics.median(timings) * 1000:7.1f}'
+        )
@@ -0,0 +1,53 @@
+"""
+Measures the cold start latency of a single provider run, i.e. the time a fresh interpreter
+needs to import x2gbfs and build the extractor for one provider, and lists which of the
+heavier third party dependencies got imported on the way.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.import_time [-p lastenvelo_fr] [-n 20]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+HEAVY_MODULES = ['websockets', 'xmltodict', 'unidecode', 'requests', 'decouple']
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from x2gbfs.x2gbfs import build_extractor
+with open('config/{provider}.json') as config_file:
+    build_extractor('{provider}', json.load(config_file))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': [m for m in {heavy_modules!r} if m in sys.modules]}}))
+'''
+
+
+def measure(provider: str, runs: int) -> None:
+    probe = PROBE.format(provider=provider, heavy_modules=HEAVY_MODULES)
+    timings = []
+    modules = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['seconds'] * 1000)
+        modules = result['modules']
+
+    print(f'provider:         {provider}')
+    print(f'runs:             {runs}')
+    print(f'median [ms]:      {statistics.median(timings):.1f}')
+    print(f'min [ms]:         {min(timings):.1f}')
+    print(f'heavy modules:    {", ".join(modules) or "-"}')
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-p', '--provider', default='lastenvelo_fr')
+    parser.add_argument('-n', '--runs', default=10, type=int)
+    args = parser.parse_args()
+
+    measure(args.provider, args.runs)
@@ -0,0 +1,77 @@
+"""
+Compares the JSON serializer backends on a synthetic vehicle_status.json and checks
+they produce identical output.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.serializer [-v 50000] [-n 5]
+"""
+
+import random
+import statistics
+import time
+from argparse import ArgumentParser
+from typing import Any, Dict
+
+from x2gbfs.gbfs.serializer import SERIALIZERS, JsonSerializer
+
+
+def synthetic_vehicle_status(vehicles: int) -> Dict[str, Any]:
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    return {
+        'data': {
+            'vehicles': [
+                {
+                    'vehicle_id': f'{rnd.getrandbits(64):016x}',
+                    'lat': round(rnd.uniform(47.5, 49.8), 6),
+                    'lon': round(rnd.uniform(7.5, 10.5), 6),
+                    'is_reserved': rnd.random() < 0.1,
+                    'is_disabled': False,
+                    'vehicle_type_id': f'type_{rnd.randrange(20)}',
+                    'last_reported': '2024-06-07T12:00:00+00:00',
+                    'current_range_meters': rnd.randrange(100000),
+                    'current_fuel_percent': round(rnd.random(), 2),
+                    'station_id': f'Straße {rnd.randrange(1000)}',
+                    'rental_uris': {'web': f'https://example.com/vehicle/{i}'},
+                }
+                for i in range(vehicles)
+            ]
+        },
+        'last_updated': '2024-06-07T12:00:00+00:00',
+        'ttl': 60,
+        'version': '3.0',
+    }
+
+
+def measure(serializer: JsonSerializer, content: Dict[str, Any], compact: bool, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        serializer.dumps(content, compact)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=50000, type=int)
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    content = synthetic_vehicle_status(args.vehicles)
+    serializers = {}
+    for name, serializer_class in SERIALIZERS.items():
+        try:
+            serializers[name] = serializer_class()
+        except ImportError:
+            print(f'{name}: not installed, skipped')
+
+    print(f'vehicles: {args.vehicles}, runs: {args.runs}')
+    for compact in (False, True):
+        mode = 'compact' if compact else 'canonical'
+        outputs = {name: serializer.dumps(content, compact) for name, serializer in serializers.items()}
+        identical = len(set(outputs.values())) == 1
+        for name, serializer in serializers.items():
+            median = measure(serializer, content, compact, args.runs)
+            print(f'{mode:10} {name:7} median [ms]: {median:8.1f}   size [bytes]: {len(outputs[name])}')
+        print(f'{mode:10} outputs identical: {identical}')
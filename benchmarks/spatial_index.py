@@ -0,0 +1,79 @@
+"""
+Measures snapping free floating vehicles to their nearest station via StationGrid
+and compares a sample of its results with a brute force search over all stations.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.spatial_index [-v 50000] [-s 10000] [-r 50] [-n 5]
+"""
+
+import math
+import random
+import statistics
+import time
+from argparse import ArgumentParser
+from typing import Dict, List, Optional, Tuple
+
+from x2gbfs.gbfs.spatial import StationGrid
+
+# Bounding box of the synthetic positions, roughly Stuttgart
+MIN_LAT, MAX_LAT = 48.70, 48.86
+MIN_LON, MAX_LON = 9.05, 9.30
+# Number of vehicles the brute force search is run for
+BRUTE_FORCE_SAMPLE = 1000
+
+
+def synthetic_positions(count: int, rnd: random.Random) -> List[Tuple[float, float]]:
+    return [(rnd.uniform(MIN_LAT, MAX_LAT), rnd.uniform(MIN_LON, MAX_LON)) for _ in range(count)]
+
+
+def brute_force_nearest(stations: List[Dict], lat: float, lon: float, radius_meters: float) -> Optional[str]:
+    nearest_station_id, nearest_distance = None, radius_meters
+    for station in stations:
+        # great-circle distance via haversine formula
+        delta_lat = math.radians(station['lat'] - lat)
+        delta_lon = math.radians(station['lon'] - lon)
+        a = (
+            math.sin(delta_lat / 2) ** 2
+            + math.cos(math.radians(lat)) * math.cos(math.radians(station['lat'])) * math.sin(delta_lon / 2) ** 2
+        )
+        distance = 2 * 6371008.8 * math.asin(math.sqrt(a))
+        if distance < nearest_distance:
+            nearest_station_id, nearest_distance = station['station_id'], distance
+    return nearest_station_id
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=50000, type=int)
+    parser.add_argument('-s', '--stations', default=10000, type=int)
+    parser.add_argument('-r', '--radius', default=50, type=float, help='snapping radius in meters')
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    stations = [
+        {'station_id': str(i), 'lat': lat, 'lon': lon}
+        for i, (lat, lon) in enumerate(synthetic_positions(args.stations, rnd))
+    ]
+    vehicles = synthetic_positions(args.vehicles, rnd)
+
+    build_timings, lookup_timings = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        grid = StationGrid(stations, args.radius)
+        build_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        snapped = [grid.nearest(lat, lon) for lat, lon in vehicles]
+        lookup_timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    expected = [brute_force_nearest(stations, lat, lon, args.radius) for lat, lon in vehicles[:BRUTE_FORCE_SAMPLE]]
+    brute_force_per_vehicle = (time.perf_counter() - start) / BRUTE_FORCE_SAMPLE
+
+    print(f'vehicles: {args.vehicles}, stations: {args.stations}, radius [m]: {args.radius}, runs: {args.runs}')
+    print(f'snapped vehicles: {sum(station_id is not None for station_id in snapped)}')
+    print(f'grid build median [ms]: {statistics.median(build_timings) * 1000:7.1f}')
+    print(f'grid lookup median [ms]: {statistics.median(lookup_timings) * 1000:7.1f}')
+    print(f'brute force (extrapolated) [ms]: {brute_force_per_vehicle * args.vehicles * 1000:7.1f}')
+    print(f'sample results identical: {snapped[:BRUTE_FORCE_SAMPLE] == expected}')
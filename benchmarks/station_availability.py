@@ -0,0 +1,212 @@
+"""
+Compares GbfsTransformer's deduction of station availabilities from vehicles with the previous
+implementation (which counted vehicles per station and vehicle type in two passes via Counter)
+on synthetic stations and vehicles, and checks both produce identical results (ignoring the order of
+vehicle types, which used to depend on the order of vehicles).
+
+Additionally compares full recomputation with the incremental availability mode in a cycle following
+one in which a fraction of vehicles changed, and checks both produce identical results.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.station_availability [-v 100000] [-s 5000] [-c 0.01] [-n 5]
+"""
+
+import copy
+import random
+import statistics
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from x2gbfs.gbfs import GbfsTransformer
+
+VEHICLE_TYPE_IDS = ['bike', 'cargo_bike', 'ebike', 'car', 'ecar']
+
+
+class PreviousGbfsTransformer(GbfsTransformer):
+    """
+    GbfsTransformer with the previous implementation of station availability deduction.
+    """
+
+    def _count_vehicle_types_at_station(self, vehicles_map, filter) -> Counter:
+        filtered_vehicle_map = {k: v for k, v in vehicles_map.items() if filter(v)}
+        station_vehicle_type_arr = [(v['station_id'], v['vehicle_type_id']) for v in filtered_vehicle_map.values()]
+
+        return Counter(station_vehicle_type_arr)
+
+    def _update_stations_availability_status(self, status_map: Dict[str, Dict], vehicles_map: Dict[str, Dict]) -> None:
+        station_vehicle_type_free_cnt = self._count_vehicle_types_at_station(
+            vehicles_map, lambda v: not v['is_reserved'] and not v['is_disabled'] and 'station_id' in v
+        )
+        station_vehicle_type_cnt = self._count_vehicle_types_at_station(vehicles_map, lambda v: 'station_id' in v)
+
+        vehicle_types_per_station: Dict[str, list] = {}
+        for station_vehicle_type in station_vehicle_type_cnt:
+            station_id = station_vehicle_type[0]
+
+            if station_id not in vehicle_types_per_station:
+                vehicle_types_per_station[station_id] = []
+
+            vehicle_types_per_station[station_id].append(
+                {
+                    'vehicle_type_id': station_vehicle_type[1],
+                    'count': station_vehicle_type_free_cnt.get(station_vehicle_type, 0),
+                }
+            )
+
+        for station_id in status_map.keys():
+            if station_id in vehicle_types_per_station:
+                self._previous_update_station_availability_status(
+                    vehicle_types_per_station[station_id], status_map[station_id]
+                )
+            else:
+                status_map[station_id]['vehicle_types_available'] = []
+                if 'num_bikes_available' not in status_map[station_id]:
+                    status_map[station_id]['num_bikes_available'] = 0
+
+    def _previous_update_station_availability_status(
+        self, vt_available: List[Dict[str, Any]], station_status: Dict[str, Any]
+    ) -> None:
+        num_bikes_available = sum([vt['count'] for vt in vt_available])
+        station_status['num_bikes_available'] = num_bikes_available
+        station_status['vehicle_types_available'] = self._previous_merge_vehicle_types_available(
+            vt_available, station_status.get('vehicle_types_available')
+        )
+
+    def _previous_merge_vehicle_types_available(
+        self, vt_available: List[Dict[str, Any]], pre_existing_vt: Optional[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        if not pre_existing_vt:
+            return vt_available
+
+        vt_map = {vt['vehicle_type_id']: vt for vt in vt_available}
+        vt_map_fallback = {vt['vehicle_type_id']: vt for vt in pre_existing_vt}
+        vt_merged = {**vt_map_fallback, **vt_map}
+        return list(vt_merged.values())
+
+
+def synthetic_stations_and_vehicles(vehicles: int, stations: int) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    status_map: Dict[str, Dict] = {}
+    for i in range(stations):
+        station_status: Dict[str, Any] = {'station_id': str(i), 'is_renting': True}
+        if rnd.random() < 0.2:
+            # some providers declare the vehicle types rentable at a station upfront
+            station_status['vehicle_types_available'] = [
+                {'vehicle_type_id': vehicle_type_id, 'count': 0} for vehicle_type_id in rnd.sample(VEHICLE_TYPE_IDS, 2)
+            ]
+        status_map[str(i)] = station_status
+    vehicles_map: Dict[str, Dict] = {}
+    for i in range(vehicles):
+        vehicle: Dict[str, Any] = {
+            'bike_id': str(i),
+            'vehicle_type_id': rnd.choice(VEHICLE_TYPE_IDS),
+            'is_reserved': rnd.random() < 0.1,
+            'is_disabled': rnd.random() < 0.05,
+        }
+        if rnd.random() < 0.9:
+            # a few vehicles are free floating, or parked at unknown stations
+            vehicle['station_id'] = str(rnd.randrange(int(stations * 1.01)))
+        vehicles_map[str(i)] = vehicle
+    return status_map, vehicles_map
+
+
+def measure(
+    update: Callable[[Dict[str, Dict], Dict[str, Dict]], None],
+    status_map: Dict[str, Dict],
+    vehicles_map: Dict[str, Dict],
+    runs: int,
+) -> float:
+    timings = []
+    for _ in range(runs):
+        # stations are updated in place, so every run gets a fresh copy
+        status_map_copy = copy.deepcopy(status_map)
+        start = time.perf_counter()
+        update(status_map_copy, vehicles_map)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def with_changed_vehicles(vehicles_map: Dict[str, Dict], stations: int, fraction: float) -> Dict[str, Dict]:
+    """
+    Returns a copy of vehicles_map, in which the given fraction of vehicles was rented, returned or moved.
+    """
+    rnd = random.Random(7)  # noqa: S311 (no cryptographic purpose)
+    changed_vehicles_map = {vehicle_id: dict(vehicle) for vehicle_id, vehicle in vehicles_map.items()}
+    for vehicle_id in rnd.sample(sorted(changed_vehicles_map), int(len(changed_vehicles_map) * fraction)):
+        action = rnd.randrange(3)
+        if action == 0:
+            del changed_vehicles_map[vehicle_id]
+        elif action == 1:
+            changed_vehicles_map[vehicle_id]['is_reserved'] = not changed_vehicles_map[vehicle_id]['is_reserved']
+        else:
+            changed_vehicles_map[vehicle_id]['station_id'] = str(rnd.randrange(stations))
+    return changed_vehicles_map
+
+
+def measure_second_cycle(
+    availability_mode: str,
+    status_map: Dict[str, Dict],
+    vehicles_map: Dict[str, Dict],
+    changed_vehicles_map: Dict[str, Dict],
+    runs: int,
+) -> Tuple[float, Dict[str, Dict]]:
+    timings = []
+    for _ in range(runs):
+        transformer = GbfsTransformer(availability_mode)
+        transformer._update_stations_availability_status(copy.deepcopy(status_map), vehicles_map)
+        second_status_map = copy.deepcopy(status_map)
+        start = time.perf_counter()
+        transformer._update_stations_availability_status(second_status_map, changed_vehicles_map)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, second_status_map
+
+
+def normalized(status_map: Dict[str, Dict]) -> Dict[str, Dict]:
+    return {
+        station_id: {
+            **station_status,
+            'vehicle_types_available': sorted(
+                station_status['vehicle_types_available'], key=lambda vt: vt['vehicle_type_id']
+            ),
+        }
+        for station_id, station_status in status_map.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=100000, type=int)
+    parser.add_argument('-s', '--stations', default=5000, type=int)
+    parser.add_argument('-c', '--changed', default=0.01, type=float, help='fraction of vehicles changed per cycle')
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    status_map, vehicles_map = synthetic_stations_and_vehicles(args.vehicles, args.stations)
+    implementations = {
+        'previous': PreviousGbfsTransformer()._update_stations_availability_status,
+        'current': GbfsTransformer()._update_stations_availability_status,
+    }
+
+    results = []
+    print(f'vehicles: {args.vehicles}, stations: {args.stations}, runs: {args.runs}')
+    for name, update in implementations.items():
+        result = copy.deepcopy(status_map)
+        update(result, vehicles_map)
+        results.append(normalized(result))
+        median = measure(update, status_map, vehicles_map, args.runs)
+        print(f'{name:11} median [ms]: {median:7.1f}')
+    print(f'results identical: {results[0] == results[1]}')
+
+    print(f'second cycle, {args.changed:.1%} of vehicles changed')
+    changed_vehicles_map = with_changed_vehicles(vehicles_map, args.stations, args.changed)
+    second_cycle_results = []
+    for availability_mode in ('full', 'incremental'):
+        median, result = measure_second_cycle(
+            availability_mode, status_map, vehicles_map, changed_vehicles_map, args.runs
+        )
+        second_cycle_results.append(result)
+        print(f'{availability_mode:11} median [ms]: {median:7.1f}')
+    print(f'results identical: {second_cycle_results[0] == second_cycle_results[1]}')
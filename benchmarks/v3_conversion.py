@@ -0,0 +1,112 @@
+"""
+Compares the throughput of GbfsV3Writer's conversion from GBFS v2 to v3 with the previous
+implementation (which checked all keys for every entity and formatted every timestamp anew)
+on synthetic stations and vehicles, and checks both produce identical results.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.v3_conversion [-v 50000] [-s 5000] [-n 5]
+"""
+
+import copy
+import random
+import statistics
+import time
+from argparse import ArgumentParser
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, List
+
+from x2gbfs.gbfs.gbfs_writer import V3_CONVERSION_PLANS, GbfsV3Writer
+
+LAST_REPORTED = 1717761600
+
+
+def previous_convert_to_v3(feed_language: str, elements: List[Dict]) -> List[Dict]:
+    for element in elements:
+        for key in ['name', 'description', 'make', 'model', 'summary']:
+            if key in element and isinstance(element[key], str):
+                element[key] = [{'language': feed_language, 'text': element[key]}]
+
+        for replacement in [
+            {'former': 'bike_id', 'new': 'vehicle_id'},
+            {'former': 'num_bikes_available', 'new': 'num_vehicles_available'},
+        ]:
+            if replacement['former'] in element:
+                element[replacement['new']] = element.pop(replacement['former'])
+
+        if isinstance(element.get('last_reported'), int):
+            element['last_reported'] = datetime.fromtimestamp(element['last_reported'], UTC).isoformat()
+    return elements
+
+
+def synthetic_feed(vehicles: int, stations: int) -> Dict[str, List[Dict[str, Any]]]:
+    rnd = random.Random(42)  # noqa: S311 (no cryptographic purpose)
+    return {
+        'station_information': [
+            {'station_id': str(i), 'name': f'Station {i}', 'lat': 48.1, 'lon': 9.1} for i in range(stations)
+        ],
+        'station_status': [
+            {
+                'station_id': str(i),
+                'num_bikes_available': rnd.randrange(5),
+                'is_renting': True,
+                'last_reported': LAST_REPORTED,
+            }
+            for i in range(stations)
+        ],
+        'vehicles': [
+            {
+                'bike_id': f'{rnd.getrandbits(64):016x}',
+                'lat': 48.1,
+                'lon': 9.1,
+                'is_reserved': False,
+                'is_disabled': False,
+                'vehicle_type_id': 'car',
+                # a few vehicles report their own timestamp
+                'last_reported': LAST_REPORTED - (rnd.randrange(600) if rnd.random() < 0.05 else 0),
+            }
+            for _ in range(vehicles)
+        ],
+    }
+
+
+def measure(convert: Callable[[str, Dict[str, List[Dict]]], Any], feed: Dict[str, List[Dict]], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        # the previous conversion happened in place, so every run gets a fresh copy
+        feed_copy = copy.deepcopy(feed)
+        start = time.perf_counter()
+        convert('de', feed_copy)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def convert_previous(feed_language: str, feed: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    return {kind: previous_convert_to_v3(feed_language, elements) for kind, elements in feed.items()}
+
+
+def convert_current(feed_language: str, feed: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    writer = GbfsV3Writer()
+    return {
+        kind: writer._convert_to_v3(feed_language, elements, V3_CONVERSION_PLANS[kind])
+        for kind, elements in feed.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=50000, type=int)
+    parser.add_argument('-s', '--stations', default=5000, type=int)
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    feed = synthetic_feed(args.vehicles, args.stations)
+    previous_result = convert_previous('de', copy.deepcopy(feed))
+    current_result = convert_current('de', feed)
+
+    entities = sum(len(elements) for elements in feed.values())
+    print(f'vehicles: {args.vehicles}, stations: {args.stations}, runs: {args.runs}')
+    for name, convert in (('previous', convert_previous), ('current', convert_current)):
+        median = measure(convert, feed, args.runs)
+        print(f'{name:9} median [ms]: {median:7.1f}   entities/s: {entities / median * 1000:12.0f}')
+    print(f'results identical: {previous_result == current_result}')
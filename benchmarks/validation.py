@@ -0,0 +1,47 @@
+"""
+Measures the overhead of validating a synthetic vehicle_status.json against the vendored official GBFS 3.0 schema,
+compared to serializing it, and checks the synthetic file is valid.
+
+Usage (from the project base dir):
+
+    python -m benchmarks.validation [-v 50000] [-n 5]
+"""
+
+import statistics
+import time
+from argparse import ArgumentParser
+from typing import Any, Callable
+
+from benchmarks.serializer import synthetic_vehicle_status
+from x2gbfs.gbfs.serializer import get_serializer
+from x2gbfs.gbfs.validation import SchemaValidator
+
+
+def measure(function: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-v', '--vehicles', default=50000, type=int)
+    parser.add_argument('-n', '--runs', default=5, type=int)
+    args = parser.parse_args()
+
+    content = synthetic_vehicle_status(args.vehicles)
+    serializer = get_serializer()
+    start = time.perf_counter()
+    validator = SchemaValidator()
+    compile_time = (time.perf_counter() - start) * 1000
+
+    validation = measure(lambda: validator.errors('3.0', 'vehicle_status.json', content), args.runs)
+    serialization = measure(lambda: serializer.dumps(content), args.runs)
+    print(f'vehicles: {args.vehicles}, runs: {args.runs}')
+    print(f'compiling all schemas [ms]: {compile_time:8.1f}')
+    print(f'validation median [ms]:     {validation:8.1f}   vehicles/s: {args.vehicles / validation * 1000:10.0f}')
+    print(f'serialization ({serializer.name}) [ms]: {serialization:8.1f}')
+    print(f'valid: {not validator.errors("3.0", "vehicle_status.json", content)}')
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from x2gbfs.gbfs.delta import DeltaTracker
+from x2gbfs.gbfs.gbfs_writer import GbfsV3Writer
+
+system_information = {'system_id': 'any_id', 'languages': ['de'], 'name': 'any_name', 'opening_hours': '24/7'}
+
+
+def write_vehicles(writer, dest, vehicles):
+    writer.write_gbfs_feed(str(dest), system_information, None, None, None, vehicles, None, None, None, '', 0)
+    return json.loads((dest / 'vehicle_status.delta.json').read_bytes())['data']
+
+
+def test_delta_lists_added_modified_and_removed_vehicles():
+    tracker = DeltaTracker()
+    vehicles = [{'vehicle_id': 'a', 'is_reserved': False}, {'vehicle_id': 'b', 'is_reserved': False}]
+
+    delta, snapshot = tracker.diff('vehicle_status.json', 'vehicles', 'vehicle_id', vehicles)
+    assert delta == {'sequence': 1, 'added': vehicles, 'modified': [], 'removed': []}
+    tracker.commit('vehicle_status.json', snapshot)
+
+    vehicles = [{'vehicle_id': 'b', 'is_reserved': True}, {'vehicle_id': 'c', 'is_reserved': False}]
+    delta, _ = tracker.diff('vehicle_status.json', 'vehicles', 'vehicle_id', vehicles)
+    assert delta == {
+        'sequence': 2,
+        'added': [{'vehicle_id': 'c', 'is_reserved': False}],
+        'modified': [{'vehicle_id': 'b', 'is_reserved': True}],
+        'removed': [{'vehicle_id': 'a'}],
+    }
+
+
+def test_delta_is_continued_from_files_of_previous_run(tmp_path):
+    vehicles = [{'vehicle_id': 'a', 'is_reserved': False}, {'vehicle_id': 'b', 'lat': 48.1}]
+    write_vehicles(GbfsV3Writer(delta_tracker=DeltaTracker()), tmp_path, vehicles)
+    write_vehicles(GbfsV3Writer(delta_tracker=DeltaTracker()), tmp_path, vehicles)
+
+    # a new tracker, e.g. after a restart, restores its snapshot from the written files
+    delta = write_vehicles(GbfsV3Writer(delta_tracker=DeltaTracker()), tmp_path, vehicles[1:])
+
+    assert delta == {'sequence': 3, 'added': [], 'modified': [], 'removed': [{'vehicle_id': 'a'}]}
+
+
+def test_changes_of_a_failed_write_are_contained_in_the_next_delta(tmp_path, monkeypatch):
+    writer = GbfsV3Writer(delta_tracker=DeltaTracker())
+    vehicles = [{'vehicle_id': 'a', 'is_reserved': False}]
+    write_vehicles(writer, tmp_path, vehicles)
+    write_chunks = writer._write_chunks
+
+    def write_chunks_failing_for_delta(filename, chunks, ttl):
+        if filename.endswith('.delta.json'):
+            raise OSError('disk full')
+        write_chunks(filename, chunks, ttl)
+
+    monkeypatch.setattr(writer, '_write_chunks', write_chunks_failing_for_delta)
+    with pytest.raises(OSError):
+        write_vehicles(writer, tmp_path, vehicles + [{'vehicle_id': 'b', 'is_reserved': False}])
+    monkeypatch.undo()
+
+    delta = write_vehicles(writer, tmp_path, vehicles + [{'vehicle_id': 'b', 'is_reserved': True}])
+
+    # b was never published in a delta, so it is still added, in the sequence following the last written delta
+    assert delta == {'sequence': 2, 'added': [{'vehicle_id': 'b', 'is_reserved': True}], 'modified': [], 'removed': []}
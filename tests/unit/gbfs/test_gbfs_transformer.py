@@ -0,0 +1,79 @@
+from x2gbfs.gbfs import GbfsTransformer
+
+
+def test_station_availability_is_deduced_from_vehicles():
+    status_map = {
+        'a': {'station_id': 'a', 'vehicle_types_available': [{'vehicle_type_id': 'car', 'count': 0}]},
+        'b': {'station_id': 'b', 'num_bikes_available': 2},
+    }
+    vehicles_map = {
+        '1': {'bike_id': '1', 'station_id': 'a', 'vehicle_type_id': 'bike', 'is_reserved': False, 'is_disabled': False},
+        '2': {'bike_id': '2', 'station_id': 'a', 'vehicle_type_id': 'bike', 'is_reserved': True, 'is_disabled': False},
+        '3': {'bike_id': '3', 'station_id': 'a', 'vehicle_type_id': 'ebike', 'is_reserved': False, 'is_disabled': True},
+        '4': {'bike_id': '4', 'vehicle_type_id': 'bike', 'is_reserved': False, 'is_disabled': False},
+    }
+
+    GbfsTransformer()._update_stations_availability_status(status_map, vehicles_map)
+
+    # pre-existing vehicle types are kept, types without available vehicles are listed with count 0
+    assert status_map['a']['vehicle_types_available'] == [
+        {'vehicle_type_id': 'car', 'count': 0},
+        {'vehicle_type_id': 'bike', 'count': 1},
+        {'vehicle_type_id': 'ebike', 'count': 0},
+    ]
+    assert status_map['a']['num_bikes_available'] == 1
+    # num_bikes_available set by the provider is retained for stations without vehicles
+    assert status_map['b'] == {'station_id': 'b', 'num_bikes_available': 2, 'vehicle_types_available': []}
+
+
+def test_free_floating_vehicles_are_snapped_to_nearby_stations():
+    station_infos_map = {'a': {'station_id': 'a', 'lat': 48.0, 'lon': 9.0}}
+    status_map = {'a': {'station_id': 'a'}}
+    vehicles_map = {
+        '1': {'bike_id': '1', 'lat': 48.0001, 'lon': 9.0, 'vehicle_type_id': 'car', 'is_reserved': False},
+        '2': {'bike_id': '2', 'lat': 48.01, 'lon': 9.0, 'vehicle_type_id': 'car', 'is_reserved': False},
+    }
+    for vehicle in vehicles_map.values():
+        vehicle['is_disabled'] = False
+
+    _, status, _, vehicles, _, _ = GbfsTransformer()._postprocess(
+        station_infos_map, status_map, None, vehicles_map, None, 0, station_snapping_radius_meters=25
+    )
+
+    assert vehicles[0]['station_id'] == 'a'
+    assert 'station_id' not in vehicles[1]
+    assert status[0]['num_bikes_available'] == 1
+
+
+def test_incremental_availability_equals_full_recomputation(caplog):
+    def vehicle(vehicle_id, station_id, vehicle_type_id='bike', is_reserved=False):
+        free_floating_vehicle = {
+            'bike_id': vehicle_id,
+            'vehicle_type_id': vehicle_type_id,
+            'is_reserved': is_reserved,
+            'is_disabled': False,
+        }
+        return {**free_floating_vehicle, 'station_id': station_id} if station_id else free_floating_vehicle
+
+    cycles = [
+        [vehicle('1', 'a'), vehicle('2', 'a', 'ebike'), vehicle('3', 'b'), vehicle('4', 'c')],
+        # 1 is reserved, 2 moved to b, 3 is gone, 4 is unchanged and 5 is new
+        [vehicle('1', 'a', is_reserved=True), vehicle('2', 'b', 'ebike'), vehicle('4', 'c'), vehicle('5', 'a')],
+        # 5 is no longer at a station
+        [vehicle('1', 'a', is_reserved=True), vehicle('2', 'b', 'ebike'), vehicle('4', 'c'), vehicle('5', None)],
+    ]
+    incremental_transformer = GbfsTransformer('verify')
+
+    for vehicles in cycles:
+        status_maps = [{station_id: {'station_id': station_id} for station_id in 'abcd'} for _ in range(2)]
+        vehicles_map = {vehicle['bike_id']: vehicle for vehicle in vehicles}
+        GbfsTransformer()._update_stations_availability_status(status_maps[0], vehicles_map)
+        incremental_transformer._update_stations_availability_status(status_maps[1], vehicles_map)
+
+        assert status_maps[1] == status_maps[0]
+    assert status_maps[1]['a'] == {
+        'station_id': 'a',
+        'num_bikes_available': 0,
+        'vehicle_types_available': [{'vehicle_type_id': 'bike', 'count': 0}],
+    }
+    assert 'differs from full recomputation' not in caplog.text
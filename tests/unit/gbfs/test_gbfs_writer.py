@@ -1,9 +1,18 @@
 # EUROPEAN UNION PUBLIC LICENCE v. 1.2
 # EUPL © the European Union 2007, 2016
 
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from unittest.mock import MagicMock
 
-from x2gbfs.gbfs.gbfs_writer import GbfsV3Writer
+import pytest
+
+from x2gbfs.gbfs.delta import DeltaTracker
+from x2gbfs.gbfs.gbfs_writer import STREAM_CHUNK_SIZE, GbfsV3Writer
+from x2gbfs.gbfs.static_files import StaticFileTracker
+from x2gbfs.metrics import CycleMetrics
 
 system_information_v2 = {
     'system_id': 'any_id',
@@ -26,14 +35,14 @@ system_information_v3 = {
 }
 
 
-def test_system_information_v2_is_transformed_to_v3():
+def test_system_information_v2_is_transformed_to_v3(tmp_path):
     writer = GbfsV3Writer()
     writer._dump_json = MagicMock(return_value=None)
 
-    writer.write_gbfs_feed('none', system_information_v2, None, None, None, None, None, None, None, None, 0)
+    writer.write_gbfs_feed(str(tmp_path), system_information_v2, None, None, None, None, None, None, None, None, 0)
 
     writer._dump_json.assert_any_call(
-        'none/gbfs.json',
+        f'{tmp_path}/gbfs.json',
         {
             'data': {'feeds': [{'name': 'system_information', 'url': 'None/system_information.json'}]},
             'last_updated': '1970-01-01T00:00:00+00:00',
@@ -42,7 +51,7 @@ def test_system_information_v2_is_transformed_to_v3():
         },
     )
     writer._dump_json.assert_any_call(
-        'none/system_information.json',
+        f'{tmp_path}/system_information.json',
         {
             'data': {
                 'system_id': 'any_id',
@@ -60,14 +69,14 @@ def test_system_information_v2_is_transformed_to_v3():
     )
 
 
-def test_system_information_v3_is_unchanged():
+def test_system_information_v3_is_unchanged(tmp_path):
     writer = GbfsV3Writer()
     writer._dump_json = MagicMock(return_value=None)
 
-    writer.write_gbfs_feed('none', system_information_v3, None, None, None, None, None, None, None, None, 0)
+    writer.write_gbfs_feed(str(tmp_path), system_information_v3, None, None, None, None, None, None, None, None, 0)
 
     writer._dump_json.assert_any_call(
-        'none/gbfs.json',
+        f'{tmp_path}/gbfs.json',
         {
             'data': {'feeds': [{'name': 'system_information', 'url': 'None/system_information.json'}]},
             'last_updated': '1970-01-01T00:00:00+00:00',
@@ -76,7 +85,7 @@ def test_system_information_v3_is_unchanged():
         },
     )
     writer._dump_json.assert_any_call(
-        'none/system_information.json',
+        f'{tmp_path}/system_information.json',
         {
             'data': {
                 'system_id': 'any_id',
@@ -94,7 +103,7 @@ def test_system_information_v3_is_unchanged():
     )
 
 
-def test_station_status_v2_is_transformed_to_v3():
+def test_station_status_v2_is_transformed_to_v3(tmp_path):
     writer = GbfsV3Writer()
     writer._dump_json = MagicMock(return_value=None)
 
@@ -106,11 +115,21 @@ def test_station_status_v2_is_transformed_to_v3():
 
     station_status_v2 = [{'station_id': 'any_station_id', 'last_reported': 1765108648}]
     writer.write_gbfs_feed(
-        'none', system_information_v2, station_information_v2, station_status_v2, None, None, None, None, None, None, 0
+        str(tmp_path),
+        system_information_v2,
+        station_information_v2,
+        station_status_v2,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        0,
     )
 
     writer._dump_json.assert_any_call(
-        'none/station_status.json',
+        f'{tmp_path}/station_status.json',
         {
             'data': {
                 'stations': [
@@ -124,7 +143,7 @@ def test_station_status_v2_is_transformed_to_v3():
     )
 
 
-def test_station_status_v3_is_unchanged():
+def test_station_status_v3_is_unchanged(tmp_path):
     writer = GbfsV3Writer()
     writer._dump_json = MagicMock(return_value=None)
 
@@ -137,11 +156,21 @@ def test_station_status_v3_is_unchanged():
     station_status_v3 = [{'station_id': 'any_station_id', 'last_reported': '2025-12-07T11:57:28+00:00'}]
 
     writer.write_gbfs_feed(
-        'none', system_information_v3, station_information_v3, station_status_v3, None, None, None, None, None, None, 0
+        str(tmp_path),
+        system_information_v3,
+        station_information_v3,
+        station_status_v3,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        0,
     )
 
     writer._dump_json.assert_any_call(
-        'none/station_status.json',
+        f'{tmp_path}/station_status.json',
         {
             'data': {
                 'stations': [
@@ -153,3 +182,195 @@ def test_station_status_v3_is_unchanged():
             'version': '3.0',
         },
     )
+
+
+def test_compact_mode_writes_sorted_minimal_json_and_gzip_variant(tmp_path):
+    writer = GbfsV3Writer(compact=True, precompress=True)
+    vehicles = [{'vehicle_id': 'b', 'is_reserved': False}, {'vehicle_id': 'a', 'is_reserved': True}]
+
+    writer.write_gbfs_feed(str(tmp_path), system_information_v3, None, None, None, vehicles, None, None, None, '', 0)
+
+    content = (tmp_path / 'vehicle_status.json').read_bytes()
+    assert content.startswith(b'{"data":{"vehicles":[{"is_reserved":true,"vehicle_id":"a"},')
+    assert gzip.decompress((tmp_path / 'vehicle_status.json.gz').read_bytes()) == content
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('number_of_vehicles', [0, 1, STREAM_CHUNK_SIZE + 1])
+def test_streamed_output_equals_serialized_content(tmp_path, compact, number_of_vehicles):
+    writer = GbfsV3Writer(compact=compact)
+    vehicles = [
+        {'vehicle_id': str(i), 'lat': 48.1, 'rental_uris': {'web': 'https://x'}} for i in range(number_of_vehicles)
+    ]
+    content = {'data': {'vehicles': vehicles}, 'last_updated': '1970-01-01T00:00:00+00:00', 'ttl': 60, 'version': '3.0'}
+
+    writer._dump_json(str(tmp_path / 'vehicle_status.json'), content)
+
+    assert (tmp_path / 'vehicle_status.json').read_bytes() == writer.serializer.dumps(content, compact)
+
+
+def test_system_information_conversion_does_not_modify_config():
+    system_information = dict(system_information_v2)
+
+    GbfsV3Writer()._convert_system_information_to_v3(system_information)
+
+    assert system_information == system_information_v2
+
+
+def test_v3_conversion_does_not_modify_v2_entities(tmp_path):
+    vehicles_v2 = [{'bike_id': 'any_id', 'last_reported': 1765108648}]
+
+    writer = GbfsV3Writer()
+    writer._dump_json = MagicMock(return_value=None)
+    writer.write_gbfs_feed(
+        str(tmp_path), system_information_v2, None, None, None, vehicles_v2, None, None, None, None, 0
+    )
+
+    assert vehicles_v2 == [{'bike_id': 'any_id', 'last_reported': 1765108648}]
+
+
+def written_content(path):
+    """
+    Returns the content written to path, checking it is the canonical serialization of that content.
+    """
+    written_bytes = path.read_bytes()
+    content = json.loads(written_bytes)
+    assert written_bytes == GbfsV3Writer().serializer.dumps(content)
+    return content
+
+
+def test_written_station_files_are_converted_to_v3(tmp_path):
+    station_information_v2 = [{'station_id': 'any_station_id', 'name': 'any_name'}]
+    station_status_v2 = [{'station_id': 'any_station_id', 'num_bikes_available': 1, 'last_reported': 1765108648}]
+
+    GbfsV3Writer().write_gbfs_feed(
+        str(tmp_path),
+        system_information_v2,
+        station_information_v2,
+        station_status_v2,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        0,
+    )
+
+    assert written_content(tmp_path / 'station_information.json')['data'] == {
+        'stations': [{'station_id': 'any_station_id', 'name': [{'language': 'de', 'text': 'any_name'}]}]
+    }
+    assert written_content(tmp_path / 'station_status.json') == {
+        'data': {
+            'stations': [
+                {
+                    'station_id': 'any_station_id',
+                    'num_vehicles_available': 1,
+                    'last_reported': '2025-12-07T11:57:28+00:00',
+                },
+            ]
+        },
+        'last_updated': '1970-01-01T00:00:00+00:00',
+        'ttl': 60,
+        'version': '3.0',
+    }
+
+
+def test_v2_vehicles_are_converted_while_written_without_modifying_them(tmp_path):
+    vehicles_v2 = [{'bike_id': str(i), 'last_reported': 1765108648} for i in range(STREAM_CHUNK_SIZE + 1)]
+
+    GbfsV3Writer(compact=True, delta_tracker=DeltaTracker()).write_gbfs_feed(
+        str(tmp_path), system_information_v2, None, None, None, vehicles_v2, None, None, None, None, 0
+    )
+
+    assert vehicles_v2[0] == {'bike_id': '0', 'last_reported': 1765108648}
+    written_bytes = (tmp_path / 'vehicle_status.json').read_bytes()
+    # in compact mode, vehicles are ordered by their id
+    assert written_bytes.startswith(
+        b'{"data":{"vehicles":[{"last_reported":"2025-12-07T11:57:28+00:00","vehicle_id":"0"},'
+        b'{"last_reported":"2025-12-07T11:57:28+00:00","vehicle_id":"1"},'
+        b'{"last_reported":"2025-12-07T11:57:28+00:00","vehicle_id":"10"},'
+    )
+    assert len(json.loads(written_bytes)['data']['vehicles']) == STREAM_CHUNK_SIZE + 1
+    delta = json.loads((tmp_path / 'vehicle_status.delta.json').read_bytes())
+    assert delta['data']['added'][0] == {'vehicle_id': '0', 'last_reported': '2025-12-07T11:57:28+00:00'}
+
+
+class StageRecordingMetrics(CycleMetrics):
+    """
+    CycleMetrics keeping track of the stages currently timed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.current_stages = []
+
+    @contextmanager
+    def timed(self, stage):
+        self.current_stages.append(stage)
+        try:
+            with super().timed(stage):
+                yield
+        finally:
+            self.current_stages.pop()
+
+
+def test_entities_converted_while_written_are_timed_as_convert_stage(tmp_path):
+    vehicles_v2 = [{'bike_id': str(i), 'last_reported': 1765108648} for i in range(STREAM_CHUNK_SIZE + 1)]
+    metrics = StageRecordingMetrics()
+    writer = GbfsV3Writer(metrics=metrics)
+    stages_while_converting = []
+    convert_entity = writer._convert_entity
+
+    def recording_convert_entity(*args):
+        stages_while_converting.append(tuple(metrics.current_stages))
+        return convert_entity(*args)
+
+    writer._convert_entity = recording_convert_entity
+    writer.write_gbfs_feed(
+        str(tmp_path), system_information_v2, None, None, None, vehicles_v2, None, None, None, None, 0
+    )
+
+    assert set(stages_while_converting) == {('convert',)}
+
+
+def test_unchanged_static_files_are_not_rewritten(tmp_path):
+    writer = GbfsV3Writer(static_file_tracker=StaticFileTracker())
+    writer.write_gbfs_feed(str(tmp_path), system_information_v3, None, None, None, None, None, None, None, '', 0)
+    writer.write_gbfs_feed(str(tmp_path), system_information_v3, None, None, None, None, None, None, None, '', 60)
+
+    system_information = json.loads((tmp_path / 'system_information.json').read_bytes())
+    assert system_information['last_updated'] == '1970-01-01T00:00:00+00:00'
+    gbfs = json.loads((tmp_path / 'gbfs.json').read_bytes())
+    assert gbfs['last_updated'] == '1970-01-01T00:01:00+00:00'
+
+    # a new tracker, e.g. after a restart, restores fingerprints from the written files
+    changed_system_information = {**system_information_v3, 'opening_hours': 'Mo-Fr 08:00-18:00'}
+    writer = GbfsV3Writer(static_file_tracker=StaticFileTracker())
+    writer.write_gbfs_feed(str(tmp_path), system_information_v3, None, None, None, None, None, None, None, '', 120)
+    writer.write_gbfs_feed(str(tmp_path), changed_system_information, None, None, None, None, None, None, None, '', 180)
+
+    system_information = json.loads((tmp_path / 'system_information.json').read_bytes())
+    assert system_information['last_updated'] == '1970-01-01T00:03:00+00:00'
+
+
+def test_parallel_writes_produce_same_files_and_skip_gbfs_json_on_failure(tmp_path):
+    vehicles = [{'vehicle_id': str(i), 'is_reserved': False} for i in range(10)]
+    vehicle_types = [{'vehicle_type_id': 'car', 'form_factor': 'car'}]
+    with ThreadPoolExecutor(max_workers=4) as write_executor:
+        for dest, executor in ((tmp_path / 'sequential', None), (tmp_path / 'parallel', write_executor)):
+            GbfsV3Writer(write_executor=executor).write_gbfs_feed(
+                str(dest), system_information_v3, None, None, vehicle_types, vehicles, None, None, None, '', 0
+            )
+
+        writer = GbfsV3Writer(write_executor=write_executor)
+        writer.write_status_file = MagicMock(side_effect=OSError('disk full'))
+        with pytest.raises(OSError):
+            writer.write_gbfs_feed(
+                str(tmp_path / 'failed'), system_information_v3, None, None, None, vehicles, None, None, None, '', 0
+            )
+
+    sequential_files = {path.name: path.read_bytes() for path in (tmp_path / 'sequential').iterdir()}
+    parallel_files = {path.name: path.read_bytes() for path in (tmp_path / 'parallel').iterdir()}
+    assert sequential_files == parallel_files
+    assert not (tmp_path / 'failed' / 'gbfs.json').exists()
@@ -0,0 +1,58 @@
+from x2gbfs.gbfs.geometry import count_vertices, simplify_features
+
+
+def polygon_feature(*rings):
+    return {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Polygon', 'coordinates': list(rings)}}
+
+
+def test_coordinates_are_rounded_and_duplicates_dropped():
+    feature = polygon_feature([[9.12345678, 48.1], [9.2, 48.1], [9.2000001, 48.1], [9.2, 48.2], [9.12345678, 48.1]])
+
+    simplified = simplify_features([feature], None, 6)
+
+    assert simplified[0]['geometry']['coordinates'] == [[[9.123457, 48.1], [9.2, 48.1], [9.2, 48.2], [9.123457, 48.1]]]
+    # the original feature is not modified
+    assert count_vertices([feature]) == 5
+
+
+def test_simplification_preserves_topology():
+    # a square (about 1.1km wide) with a wiggly bottom edge and a bump of about 55m at the top
+    bottom_edge = [[i / 1000, 0.000001 * (i % 2)] for i in range(11)]
+    top_edge = [[0.01, 0.01], [0.0055, 0.01], [0.005, 0.0105], [0.0045, 0.01], [0, 0.01]]
+    exterior = bottom_edge + top_edge + [[0, 0]]
+    # a (clockwise) hole reaching into the bump
+    hole = [[0.0049, 0.0098], [0.005, 0.0103], [0.0051, 0.0098], [0.0049, 0.0098]]
+
+    without_hole = simplify_features([polygon_feature(exterior)], 100, 6)
+    with_hole = simplify_features([polygon_feature(exterior, hole)], 100, 6)
+
+    assert without_hole[0]['geometry']['coordinates'] == [[[0, 0], [0.01, 0], [0.01, 0.01], [0, 0.01], [0, 0]]]
+    # dropping the bump's apex would make the hole cross the exterior, so it is kept
+    simplified_exterior, simplified_hole = with_hole[0]['geometry']['coordinates']
+    assert simplified_exterior == [[0, 0], [0.01, 0], [0.01, 0.01], [0.005, 0.0105], [0, 0.01], [0, 0]]
+    assert simplified_hole == hole
+
+
+def test_small_clockwise_ring_is_not_collapsed():
+    # a clockwise square of about 1m, much smaller than the tolerance
+    ring = [[9.0, 48.0], [9.0, 48.0001], [9.000005, 48.0001], [9.00001, 48.0001], [9.00001, 48.0], [9.0, 48.0]]
+
+    simplified = simplify_features([polygon_feature(ring)], 50, 6)
+
+    assert simplified[0]['geometry']['coordinates'] == [ring]
+
+
+def test_empty_polygons_and_degenerate_rings_are_left_as_they_are():
+    square = [[9.0, 48.0], [9.01, 48.0], [9.01, 48.01], [9.0, 48.01], [9.0, 48.0]]
+    degenerate_hole = [[9.005, 48.005], [9.006, 48.005], [9.005, 48.005]]
+    features = [
+        polygon_feature(),
+        polygon_feature([]),
+        {'type': 'Feature', 'geometry': {'type': 'MultiPolygon', 'coordinates': [[], [square, degenerate_hole]]}},
+    ]
+
+    simplified = simplify_features(features, 10, 6)
+
+    assert simplified[0]['geometry']['coordinates'] == []
+    assert simplified[1]['geometry']['coordinates'] == [[]]
+    assert simplified[2]['geometry']['coordinates'] == [[], [square, degenerate_hole]]
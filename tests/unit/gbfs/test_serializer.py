@@ -0,0 +1,26 @@
+import pytest
+
+from x2gbfs.gbfs.serializer import JsonSerializer, OrjsonSerializer
+
+CONTENT = {
+    'data': {
+        'vehicles': [
+            {'vehicle_id': '5e3a', 'name': 'Lastenrad Straße 😀\x7f', 'lat': 47.99, 'lon': 0.00001, 'range': 1e16},
+            {'vehicle_id': 'b', 'name': 'plain', 'lat': 48.123456, 'lon': -10.00002, 'is_reserved': False},
+        ],
+        'empty_list': [],
+        'empty_dict': {},
+    },
+    'ttl': 60,
+}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_orjson_serializer_output_equals_json_serializer_output(compact):
+    pytest.importorskip('orjson')
+
+    assert OrjsonSerializer().dumps(CONTENT, compact) == JsonSerializer().dumps(CONTENT, compact)
+    without_diverging_floats = {'data': {'vehicles': CONTENT['data']['vehicles'][1:]}, 'name': 'Straße'}
+    assert OrjsonSerializer().dumps(without_diverging_floats, compact) == JsonSerializer().dumps(
+        without_diverging_floats, compact
+    )
@@ -0,0 +1,28 @@
+import pytest
+
+from x2gbfs.gbfs.spatial import METERS_PER_DEGREE, StationGrid
+
+# Offset of 10m in latitude
+TEN_METERS = 10 / METERS_PER_DEGREE
+
+
+def test_nearest_station_within_radius_is_found():
+    stations = [
+        {'station_id': 'a', 'lat': 48.0, 'lon': 9.0},
+        {'station_id': 'b', 'lat': 48.0 + 3 * TEN_METERS, 'lon': 9.0},
+        {'station_id': 'virtual', 'station_area': {}},
+    ]
+    grid = StationGrid(stations, 25)
+
+    assert len(grid) == 2
+    assert grid.nearest(48.0 + TEN_METERS, 9.0) == 'a'
+    assert grid.nearest(48.0 + 2 * TEN_METERS, 9.0) == 'b'
+    assert grid.nearest(48.0 - 3 * TEN_METERS, 9.0) is None
+    # 20m east, though a degree of longitude is shorter than one of latitude
+    assert grid.nearest(48.0, 9.0 + 2 * TEN_METERS / 0.6691) == 'a'
+    assert grid.nearest(48.0, 9.0 + 3 * TEN_METERS / 0.6691) is None
+
+
+def test_radius_must_be_positive():
+    with pytest.raises(ValueError):
+        StationGrid([], 0)
@@ -0,0 +1,57 @@
+import pytest
+
+from x2gbfs.gbfs.gbfs_writer import GbfsV3Writer
+from x2gbfs.gbfs.validation import FeedValidationError, SchemaValidator
+
+# optional dependency, see pyproject.toml
+pytest.importorskip('fastjsonschema')
+
+system_information = {
+    'system_id': 'any_id',
+    'languages': ['de'],
+    'name': 'any_name',
+    'opening_hours': '24/7',
+    'feed_contact_email': 'mobidata-bw@nvbw.de',
+    'timezone': 'Europe/Berlin',
+}
+
+
+def vehicle_status(vehicles):
+    return {'data': {'vehicles': vehicles}, 'last_updated': '2024-06-07T12:00:00+00:00', 'ttl': 60, 'version': '3.0'}
+
+
+def test_violations_are_reported_per_entity():
+    content = vehicle_status(
+        [
+            {'vehicle_id': 'a', 'is_reserved': False, 'is_disabled': False, 'lat': 48.1, 'lon': 9.1},
+            {'vehicle_id': 'b', 'is_reserved': False, 'is_disabled': False, 'lat': 91, 'lon': 9.1},
+            {'is_reserved': True, 'is_disabled': True, 'lat': 48.1, 'lon': 9.1},
+            # fastjsonschema reports the first violation of every entity only
+            {'vehicle_id': 'd', 'is_reserved': 0, 'is_disabled': False, 'lat': 48.1},
+        ]
+    )
+    content['ttl'] = -1
+
+    errors = SchemaValidator().errors('3.0', 'out/deer/vehicle_status.json', content)
+
+    assert errors == {
+        "data.vehicles[1] (vehicle_id 'b')": ['lat: must be smaller than or equal to 90'],
+        'data.vehicles[2]': ["must contain ['vehicle_id'] properties"],
+        "data.vehicles[3] (vehicle_id 'd')": ['cannot be validated by any definition'],
+        'file': ['ttl: must be bigger than or equal to 0'],
+    }
+
+
+def test_files_without_schema_are_not_validated():
+    assert SchemaValidator().errors('3.0', 'vehicle_status.delta.json', {'data': None}) == {}
+
+
+def test_no_file_of_an_invalid_feed_is_written_in_blocking_mode(tmp_path):
+    writer = GbfsV3Writer(validator=SchemaValidator(blocking=True))
+    vehicles = [{'vehicle_id': 'a', 'is_reserved': False, 'is_disabled': False, 'lat': 91}]
+
+    with pytest.raises(FeedValidationError):
+        writer.write_gbfs_feed(str(tmp_path), system_information, None, None, None, vehicles, None, None, None, '', 0)
+
+    # not even the valid system_information.json, which would be published with the previous vehicle_status.json
+    assert list(tmp_path.iterdir()) == []
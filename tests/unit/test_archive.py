@@ -0,0 +1,48 @@
+from x2gbfs.archive import SnapshotArchive
+from x2gbfs.gbfs.gbfs_writer import GbfsV3Writer
+from x2gbfs.gbfs.static_files import StaticFileTracker
+
+system_information = {'system_id': 'any_id', 'languages': ['de'], 'name': 'any_name', 'opening_hours': '24/7'}
+
+
+def test_snapshots_are_deduplicated_and_restored(tmp_path):
+    archive = SnapshotArchive(str(tmp_path / 'archive'), str(tmp_path / 'out'))
+    writer = GbfsV3Writer(static_file_tracker=StaticFileTracker(), archive=archive)
+    feed_dir = str(tmp_path / 'out' / 'deer')
+    first_vehicles = [{'vehicle_id': 'a', 'is_reserved': False}]
+
+    writer.write_gbfs_feed(feed_dir, system_information, None, None, None, first_vehicles, None, None, None, '', 0)
+    first_files = {path.name: path.read_bytes() for path in (tmp_path / 'out' / 'deer').iterdir()}
+    writer.write_gbfs_feed(feed_dir, system_information, None, None, None, first_vehicles, None, None, None, '', 60)
+    writer.write_gbfs_feed(feed_dir, system_information, None, None, None, [], None, None, None, '', 120)
+
+    snapshots = archive.snapshots('deer')
+    assert [(feed, last_updated) for _, feed, last_updated in snapshots] == [('deer', 0), ('deer', 60), ('deer', 120)]
+    # system_information (unchanged), vehicle_status and gbfs.json of the first two and gbfs.json of the last snapshot
+    assert len(list((tmp_path / 'archive' / 'blobs').glob('*/*.gz'))) == 6
+
+    restored_names = archive.restore(snapshots[0][0], str(tmp_path / 'restored'))
+    assert {name: (tmp_path / 'restored' / name).read_bytes() for name in restored_names} == first_files
+    # system_information has not been rewritten, but is still part of the last snapshot
+    assert sorted(archive.restore(snapshots[2][0], str(tmp_path / 'restored'))) == [
+        'gbfs.json',
+        'system_information.json',
+        'vehicle_status.json',
+    ]
+    archive.close()
+
+
+def test_unchanged_files_written_before_archiving_was_enabled_are_archived(tmp_path):
+    feed_dir = str(tmp_path / 'out' / 'deer')
+    GbfsV3Writer(static_file_tracker=StaticFileTracker()).write_gbfs_feed(
+        feed_dir, system_information, None, None, None, None, None, None, None, '', 0
+    )
+
+    archive = SnapshotArchive(str(tmp_path / 'archive'), str(tmp_path / 'out'))
+    GbfsV3Writer(static_file_tracker=StaticFileTracker(), archive=archive).write_gbfs_feed(
+        feed_dir, system_information, None, None, None, None, None, None, None, '', 60
+    )
+
+    snapshot_id = archive.snapshots('deer')[0][0]
+    assert sorted(archive.restore(snapshot_id, str(tmp_path / 'restored'))) == ['gbfs.json', 'system_information.json']
+    archive.close()
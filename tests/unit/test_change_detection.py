@@ -0,0 +1,35 @@
+from x2gbfs.change_detection import ChangeDetector
+
+
+def vehicles(last_reported, lat_of_b=48.1):
+    return [
+        {'bike_id': 'a', 'lat': 48.0, 'lon': 9.0, 'last_reported': last_reported},
+        {'bike_id': 'b', 'lat': lat_of_b, 'lon': 9.1, 'last_reported': last_reported},
+        # reported upstream, hence not tracked
+        {'bike_id': 'c', 'lat': 48.2, 'lon': 9.2, 'last_reported': 1000},
+    ]
+
+
+def test_last_reported_only_advances_on_change_and_survives_restart(tmp_path):
+    detector = ChangeDetector(str(tmp_path))
+    assert detector.update('feed', 'vehicles', vehicles(100), 'bike_id', 100) == 2
+
+    second = vehicles(200, lat_of_b=48.15)
+    assert detector.update('feed', 'vehicles', second, 'bike_id', 200) == 1
+    assert [vehicle['last_reported'] for vehicle in second] == [100, 200, 1000]
+
+    restarted_detector = ChangeDetector(str(tmp_path))
+    third = vehicles(300, lat_of_b=48.15)[1:]
+    assert restarted_detector.update('feed', 'vehicles', third, 'bike_id', 300) == 0
+    assert [vehicle['last_reported'] for vehicle in third] == [200, 1000]
+
+    # vehicle a disappeared in the previous update, so it is considered changed when it reappears
+    fourth = vehicles(400, lat_of_b=48.15)
+    assert restarted_detector.update('feed', 'vehicles', fourth, 'bike_id', 400) == 1
+    assert [vehicle['last_reported'] for vehicle in fourth] == [400, 200, 1000]
+
+
+def test_unreadable_state_is_reset(tmp_path):
+    (tmp_path / 'feed.vehicles.fingerprints').write_bytes(b'\x00\x05ab')
+    detector = ChangeDetector(str(tmp_path))
+    assert detector.update('feed', 'vehicles', vehicles(100), 'bike_id', 100) == 2
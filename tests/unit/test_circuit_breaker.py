@@ -0,0 +1,89 @@
+from x2gbfs.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from x2gbfs.gbfs import BaseProvider
+from x2gbfs.provider_registry import ProviderRegistry
+from x2gbfs.x2gbfs import run_provider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_opens_after_threshold_and_backs_off_exponentially():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=10, max_backoff=25, clock=clock)
+
+    breaker.record_failure('deer')
+    assert breaker.allow('deer')
+    breaker.record_failure('deer')
+    assert breaker.state('deer') == (OPEN, 2)
+    assert not breaker.allow('deer')
+
+    clock.now = 10
+    assert breaker.state('deer')[0] == HALF_OPEN
+    assert breaker.allow('deer')
+    # only a single trial while half open
+    assert not breaker.allow('deer')
+    breaker.record_failure('deer')
+    assert not breaker.allow('deer')
+    clock.now = 29
+    assert not breaker.allow('deer')
+    clock.now = 30
+    assert breaker.allow('deer')
+    breaker.record_failure('deer')
+    # backoff is capped at max_backoff
+    clock.now = 55
+    assert breaker.allow('deer')
+
+    breaker.record_success('deer')
+    assert breaker.state('deer') == (CLOSED, 0)
+    assert breaker.allow('deer')
+
+
+def test_backoff_starts_with_the_providers_period_up_to_max_backoff():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        1, base_backoff=60, max_backoff=3600, clock=clock, base_backoffs={'deer': 600, 'cambio': 86400}
+    )
+    for provider in ('deer', 'cambio', 'other'):
+        breaker.record_failure(provider)
+
+    clock.now = 599
+    assert not breaker.allow('deer')
+    assert breaker.allow('other')
+    clock.now = 600
+    assert breaker.allow('deer')
+    assert not breaker.allow('cambio')
+    clock.now = 3600
+    assert breaker.allow('cambio')
+
+
+class HealthyProvider(BaseProvider):
+    def load_stations(self, default_last_reported):
+        return None, None
+
+
+class FailingProvider(BaseProvider):
+    def load_stations(self, default_last_reported):
+        raise ConnectionError('upstream unavailable')
+
+
+def test_only_upstream_failures_open_the_circuit(tmp_path, monkeypatch):
+    for provider in ('healthy', 'failing'):
+        (tmp_path / f'{provider}.json').write_text('{"feed_data": {"system_information": {"name": "any_name"}}}')
+    providers = {'healthy': HealthyProvider, 'failing': FailingProvider}
+    registry = ProviderRegistry(lambda provider, feed_config: providers[provider](feed_config), str(tmp_path))
+    breaker = CircuitBreaker(1)
+
+    def write_failing(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr('x2gbfs.x2gbfs.write_gbfs_feed', write_failing)
+    for provider in providers:
+        assert not run_provider(provider, str(tmp_path), 'http://x', None, registry=registry, circuit_breaker=breaker)
+
+    assert breaker.state('healthy') == (CLOSED, 0)
+    assert breaker.state('failing') == (OPEN, 1)
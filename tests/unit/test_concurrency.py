@@ -0,0 +1,33 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from x2gbfs.concurrency import UpstreamLimiter
+
+
+def _max_concurrency(limiter: UpstreamLimiter, hosts: list) -> int:
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def request(host):
+        nonlocal active, max_active
+        with limiter.limit(host):
+            with lock:
+                active += 1
+                max_active = max(max_active, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        list(executor.map(request, hosts))
+    return max_active
+
+
+def test_requests_to_same_host_are_capped():
+    assert _max_concurrency(UpstreamLimiter(2), ['portal.moqo.de'] * 6) == 2
+
+
+def test_requests_without_host_are_not_capped():
+    assert _max_concurrency(UpstreamLimiter(1), [None] * 4) == 4
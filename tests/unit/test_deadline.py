@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from x2gbfs.deadline import DeadlineExceeded, check_deadline, deadline, remaining_timeout
+from x2gbfs.gbfs import BaseProvider
+from x2gbfs.metrics import MetricsExporter
+from x2gbfs.provider_registry import ProviderRegistry
+from x2gbfs.util import get
+from x2gbfs.x2gbfs import run_provider
+
+
+def test_timeouts_are_clamped_to_remaining_budget():
+    assert remaining_timeout(10) == 10
+
+    with deadline(1):
+        assert remaining_timeout(10) <= 1
+        assert remaining_timeout(0.5) == 0.5
+
+    assert remaining_timeout(10) == 10
+
+
+def test_expired_deadline_raises():
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            remaining_timeout(10)
+        with pytest.raises(TimeoutError):
+            check_deadline()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(1)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowProvider(BaseProvider):
+    def load_stations(self, default_last_reported):
+        get(self.config['url'])
+        return None, None
+
+
+def test_request_timed_out_by_deadline_is_reported_as_exceeded(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        config = {'url': f'http://127.0.0.1:{server.server_address[1]}/', 'x2gbfs': {'max_runtime_seconds': 0.2}}
+        (tmp_path / 'slow.json').write_text(json.dumps(config))
+        registry = ProviderRegistry(lambda provider, feed_config: SlowProvider(feed_config), str(tmp_path))
+        exporter = MetricsExporter(str(tmp_path / 'x2gbfs.prom'))
+
+        start = time.monotonic()
+        assert not run_provider('slow', str(tmp_path), 'http://x', None, registry=registry, exporter=exporter)
+
+        assert time.monotonic() - start < 1
+        assert 'x2gbfs_deadline_exceeded_total{feed="slow"} 1' in (tmp_path / 'x2gbfs.prom').read_text()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,37 @@
+import json
+
+from x2gbfs.manifest import ManifestWriter
+
+
+def test_manifest_is_updated_incrementally_and_restored(tmp_path):
+    manifest = ManifestWriter(str(tmp_path), systems_csv=True)
+    manifest.update(
+        {'system_id': 'deer', 'name': [{'language': 'de', 'text': 'deer'}]}, {3: 'https://x/deer/gbfs.json'}
+    )
+    manifest.update(
+        {'system_id': 'alpsgo', 'name': 'AlpsGo', 'url': 'https://alpsgo.de'},
+        {2: 'https://x/alpsgo/v2/gbfs.json', 3: 'https://x/alpsgo/v3/gbfs.json'},
+    )
+
+    content = json.loads((tmp_path / 'manifest.json').read_bytes())
+    assert content['data']['datasets'] == [
+        {
+            'system_id': 'alpsgo',
+            'versions': [
+                {'version': '2.3', 'url': 'https://x/alpsgo/v2/gbfs.json'},
+                {'version': '3.0', 'url': 'https://x/alpsgo/v3/gbfs.json'},
+            ],
+        },
+        {'system_id': 'deer', 'versions': [{'version': '3.0', 'url': 'https://x/deer/gbfs.json'}]},
+    ]
+    assert (tmp_path / 'systems.csv').read_text().splitlines() == [
+        'System ID,Name,URL,Auto-Discovery URL,Supported Versions',
+        'alpsgo,AlpsGo,https://alpsgo.de,https://x/alpsgo/v3/gbfs.json,2.3;3.0',
+        'deer,deer,,https://x/deer/gbfs.json,3.0',
+    ]
+
+    # a new writer, e.g. after a restart, keeps the datasets of the previous run
+    ManifestWriter(str(tmp_path), systems_csv=True).update({'system_id': 'deer', 'name': 'deer'}, {3: 'https://y'})
+
+    assert len(json.loads((tmp_path / 'manifest.json').read_bytes())['data']['datasets']) == 2
+    assert (tmp_path / 'systems.csv').read_text().splitlines()[1].startswith('alpsgo,AlpsGo,https://alpsgo.de,')
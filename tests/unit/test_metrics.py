@@ -0,0 +1,23 @@
+from x2gbfs.metrics import CycleMetrics, MetricsExporter
+
+
+def test_metrics_are_written_in_prometheus_text_format(tmp_path):
+    metrics_file = tmp_path / 'x2gbfs.prom'
+    exporter = MetricsExporter(str(metrics_file))
+
+    metrics = CycleMetrics()
+    with metrics.timed('fetch'):
+        pass
+    metrics.count('vehicles', [{}, {}])
+    metrics.count('stations', None)
+
+    exporter.record('deer', metrics, True)
+    exporter.record('deer', CycleMetrics(), False)
+
+    lines = metrics_file.read_text().splitlines()
+    assert '# TYPE x2gbfs_stage_duration_seconds gauge' in lines
+    assert any(line.startswith('x2gbfs_stage_duration_seconds{feed="deer",stage="fetch"} ') for line in lines)
+    assert 'x2gbfs_entities{feed="deer",kind="vehicles"} 2' in lines
+    assert 'x2gbfs_entities{feed="deer",kind="stations"} 0' in lines
+    assert 'x2gbfs_cycles_total{feed="deer",result="success"} 1' in lines
+    assert 'x2gbfs_cycles_total{feed="deer",result="failure"} 1' in lines
@@ -0,0 +1,43 @@
+import json
+import os
+
+from x2gbfs.gbfs import BaseProvider
+from x2gbfs.provider_registry import ProviderRegistry
+
+
+class CountingProvider(BaseProvider):
+    resets = 0
+
+    def reset(self) -> None:
+        self.resets += 1
+
+
+def _write_config(config_dir, provider, feed_config, mtime):
+    path = config_dir / f'{provider}.json'
+    path.write_text(json.dumps(feed_config))
+    os.utime(path, (mtime, mtime))
+
+
+def test_provider_instance_is_reused_until_config_changes(tmp_path):
+    built = []
+
+    def build_extractor(provider, feed_config):
+        built.append(provider)
+        return CountingProvider(feed_config)
+
+    registry = ProviderRegistry(build_extractor, str(tmp_path))
+    _write_config(tmp_path, 'example', {'ttl': 60}, 1_700_000_000)
+
+    first = registry.get('example')
+    second = registry.get('example')
+
+    assert second is first
+    assert built == ['example']
+    assert first.extractor.resets == 1
+
+    _write_config(tmp_path, 'example', {'ttl': 120}, 1_700_000_100)
+    third = registry.get('example')
+
+    assert third is not first
+    assert third.feed_config == {'ttl': 120}
+    assert built == ['example', 'example']
@@ -0,0 +1,27 @@
+import json
+import subprocess
+import sys
+
+from x2gbfs.providers import find_provider_spec
+
+
+def test_provider_is_resolved_by_id_prefix_and_config():
+    assert find_provider_spec('deer', {}).name == 'deer'
+    assert find_provider_spec('stadtmobil_stuttgart', {}).name == 'cantamen'
+    assert find_provider_spec('herrenberg_alf', {'x2gbfs': {'provider': 'gbfs-light'}}).name == 'gbfs-light'
+    assert find_provider_spec('unknown', {}) is None
+
+
+def test_building_a_single_provider_does_not_import_other_providers_dependencies():
+    probe = '''
+import json, sys
+from x2gbfs.x2gbfs import build_extractor
+with open('config/lastenvelo_fr.json') as config_file:
+    build_extractor('lastenvelo_fr', json.load(config_file))
+print(json.dumps([m for m in ('websockets', 'xmltodict', 'x2gbfs.providers.cantamen') if m in sys.modules]))
+'''
+    output = subprocess.run(  # noqa: S603 (no untrusted input)
+        [sys.executable, '-c', probe], check=True, capture_output=True, text=True
+    ).stdout
+
+    assert json.loads(output) == []
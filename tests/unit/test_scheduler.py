@@ -0,0 +1,54 @@
+from x2gbfs.scheduler import FeedScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_feeds_are_dispatched_according_to_their_period():
+    clock = FakeClock()
+    scheduler = FeedScheduler(clock)
+    scheduler.add('deer', 60)
+    scheduler.add('cambio_aachen', 86400)
+
+    assert sorted(scheduler.pop_due()) == ['cambio_aachen', 'deer']
+    scheduler.complete('deer')
+    scheduler.complete('cambio_aachen')
+
+    clock.now = 60
+    assert scheduler.pop_due() == ['deer']
+    scheduler.complete('deer')
+    assert scheduler.seconds_until_next_due() == 60
+
+
+def test_schedule_is_fixed_rate():
+    clock = FakeClock()
+    scheduler = FeedScheduler(clock)
+    scheduler.add('deer', 60)
+
+    assert scheduler.pop_due() == ['deer']
+    # the run took 20 seconds, which must not delay the next run
+    clock.now = 20
+    scheduler.complete('deer')
+    assert scheduler.seconds_until_next_due() == 40
+
+
+def test_running_feed_is_not_dispatched_again():
+    clock = FakeClock()
+    scheduler = FeedScheduler(clock)
+    scheduler.add('deer', 60)
+
+    assert scheduler.pop_due() == ['deer']
+    clock.now = 130
+    assert scheduler.pop_due() == []
+    assert scheduler.seconds_until_next_due() is None
+
+    # overrun runs are due immediately, missed runs are not caught up
+    scheduler.complete('deer')
+    assert scheduler.pop_due() == ['deer']
+    scheduler.complete('deer')
+    assert scheduler.seconds_until_next_due() == 60
@@ -0,0 +1,84 @@
+import gzip
+import http.client
+import os
+
+import pytest
+
+from x2gbfs.gbfs.gbfs_writer import GbfsV3Writer
+from x2gbfs.server import FeedStore, _accepts_gzip, start_server
+
+
+def test_feeds_are_served_with_etag_and_gzip(tmp_path):
+    store = FeedStore(str(tmp_path))
+    body = b'{"data": {}, "ttl": 60}'
+    store.publish(str(tmp_path / 'deer' / 'gbfs.json'), body, 60)
+    server = start_server(store, '127.0.0.1', 0)
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+
+        connection.request('GET', '/deer/gbfs.json')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read() == body
+        assert response.getheader('Cache-Control') in ('max-age=60', 'max-age=59')
+        etag = response.getheader('ETag')
+
+        connection.request('GET', '/deer/gbfs.json', headers={'If-None-Match': etag})
+        response = connection.getresponse()
+        assert response.status == 304
+        assert response.read() == b''
+
+        connection.request('GET', '/deer/gbfs.json', headers={'Accept-Encoding': 'gzip, deflate'})
+        response = connection.getresponse()
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert gzip.decompress(response.read()) == body
+
+        connection.request('GET', '/unknown/gbfs.json')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'accepted'),
+    [
+        ('gzip, deflate', True),
+        ('GZIP', True),
+        ('br;q=1.0, GZip;Q=0.5', True),
+        ('gzip;Q=0', False),
+        ('GZIP; Q=0.000', False),
+        ('*;q=0', False),
+        ('deflate', False),
+        (None, False),
+    ],
+)
+def test_accept_encoding_is_matched_case_insensitively(accept_encoding, accepted):
+    assert _accepts_gzip(accept_encoding) == accepted
+
+
+def test_precompressed_gzip_variants_are_reused(tmp_path):
+    store = FeedStore(str(tmp_path))
+    vehicles = [{'vehicle_id': 'a', 'is_reserved': False}]
+    system_information = {'system_id': 'any_id', 'languages': ['de'], 'name': 'any_name'}
+
+    GbfsV3Writer(precompress=True, feed_store=store).write_gbfs_feed(
+        str(tmp_path / 'deer'), system_information, None, None, None, vehicles, None, None, None, '', 0
+    )
+
+    gzip_variant = (tmp_path / 'deer' / 'vehicle_status.json.gz').read_bytes()
+    assert store.get('deer/vehicle_status.json').gzipped_body == gzip_variant
+
+    # on startup, only gzip variants at least as recent as their file are reused
+    outdated_gzip_path = tmp_path / 'deer' / 'gbfs.json.gz'
+    outdated_gzip_path.write_bytes(gzip.compress(b'outdated'))
+    modified_at = os.stat(tmp_path / 'deer' / 'gbfs.json').st_mtime
+    os.utime(outdated_gzip_path, (modified_at - 60, modified_at - 60))
+    reloaded_store = FeedStore(str(tmp_path))
+    reloaded_store.load_directory()
+
+    assert reloaded_store.get('deer/vehicle_status.json').gzipped_body == gzip_variant
+    gzipped_gbfs = reloaded_store.get('deer/gbfs.json').gzipped_body
+    assert gzip.decompress(gzipped_gbfs) == (tmp_path / 'deer' / 'gbfs.json').read_bytes()
@@ -0,0 +1,196 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    feed TEXT NOT NULL,
+    last_updated INTEGER NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_feed ON snapshots (feed, id);
+CREATE TABLE IF NOT EXISTS snapshot_files (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    filename TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, filename)
+);
+'''
+
+
+class BlobWriter:
+    """
+    Hashes and compresses a file chunk by chunk into a temporary file, which is moved into the blob store on commit.
+    """
+
+    def __init__(self, blob_dir: Path):
+        self.blob_dir = blob_dir
+        self.temp_path = blob_dir / f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        # closed in commit()
+        self.dest = open(self.temp_path, 'wb')
+        self.digest = hashlib.blake2b(digest_size=16)
+        # wbits=31 produces gzip format, so blobs can be inspected via zcat
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def write(self, chunk: bytes) -> None:
+        self.digest.update(chunk)
+        self.dest.write(self.compressor.compress(chunk))
+
+    def commit(self) -> str:
+        """
+        Stores the blob (unless a blob with the same content is stored already) and returns its hash.
+        """
+        self.dest.write(self.compressor.flush())
+        self.dest.close()
+        blob_hash = self.digest.hexdigest()
+        blob_path = self.blob_dir / blob_hash[:2] / f'{blob_hash}.gz'
+        if blob_path.exists():
+            self.temp_path.unlink()
+        else:
+            blob_path.parent.mkdir(exist_ok=True)
+            os.replace(self.temp_path, blob_path)
+        return blob_hash
+
+
+class SnapshotArchive:
+    """
+    Archives every published state of the feeds written below `root_dir`.
+
+    Files are stored content-addressed in `archive_dir/blobs`, so an unchanged file is stored only once.
+    After every update of a feed, a snapshot, i.e. the hash of each of the feed's files, is recorded
+    in the SQLite database `archive_dir/index.sqlite`. Files not rewritten by an update (e.g. unchanged
+    static files) keep the hash of their previous snapshot.
+    """
+
+    def __init__(self, archive_dir: str, root_dir: str):
+        self.root_dir = os.path.abspath(root_dir)
+        self.blob_dir = Path(archive_dir) / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        # the connection is shared by all threads, guarded by _lock
+        self._connection = sqlite3.connect(Path(archive_dir) / 'index.sqlite', check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # per feed, the hash of every file of its latest (possibly not yet recorded) state
+        self._files: Dict[str, Dict[str, str]] = {}
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root_dir).replace(os.sep, '/')
+
+    def _latest_files(self, feed: str) -> Dict[str, str]:
+        # must be called while holding _lock
+        if feed not in self._files:
+            rows = self._connection.execute(
+                'SELECT filename, hash FROM snapshot_files WHERE snapshot_id = '
+                '(SELECT MAX(id) FROM snapshots WHERE feed = ?)',
+                (feed,),
+            )
+            self._files[feed] = dict(rows.fetchall())
+        return self._files[feed]
+
+    def open_blob(self) -> BlobWriter:
+        return BlobWriter(self.blob_dir)
+
+    def add(self, filename: str, blob_hash: str) -> None:
+        """
+        Records that filename has been written with the content of the given blob.
+        """
+        # e.g. `deer` or `deer/v3` and `gbfs.json`
+        feed, _, name = self._key(filename).rpartition('/')
+        with self._lock:
+            self._latest_files(feed)[name] = blob_hash
+
+    def keep(self, filename: str) -> None:
+        """
+        Records that filename has been left unchanged. If it is not archived yet
+        (e.g. it was written before archiving was enabled), it is stored from disk.
+        """
+        feed, _, name = self._key(filename).rpartition('/')
+        with self._lock:
+            if name in self._latest_files(feed):
+                return
+        blob = self.open_blob()
+        with open(filename, 'rb') as existing_file:
+            blob.write(existing_file.read())
+        self.add(filename, blob.commit())
+
+    def record_snapshot(self, feed_dir: str, last_updated: int) -> int:
+        """
+        Records the current state of the feed written to feed_dir as snapshot and returns its id.
+        """
+        feed = self._key(feed_dir)
+        with self._lock, self._connection:
+            files = self._latest_files(feed)
+            cursor = self._connection.execute(
+                'INSERT INTO snapshots (feed, last_updated, archived_at) VALUES (?, ?, ?)',
+                (feed, last_updated, time.time()),
+            )
+            snapshot_id = cursor.lastrowid
+            self._connection.executemany(
+                'INSERT INTO snapshot_files (snapshot_id, filename, hash) VALUES (?, ?, ?)',
+                [(snapshot_id, name, blob_hash) for name, blob_hash in files.items()],
+            )
+        assert snapshot_id is not None  # noqa: S101 (always set after an INSERT)
+        return snapshot_id
+
+    def snapshots(self, feed: Optional[str] = None) -> List[Tuple[int, str, int]]:
+        """
+        Returns id, feed and last_updated of all snapshots (of the given feed), oldest first.
+        """
+        with self._lock:
+            if feed is None:
+                rows = self._connection.execute('SELECT id, feed, last_updated FROM snapshots ORDER BY id')
+            else:
+                rows = self._connection.execute(
+                    'SELECT id, feed, last_updated FROM snapshots WHERE feed = ? ORDER BY id', (feed,)
+                )
+            return rows.fetchall()
+
+    def restore(self, snapshot_id: int, dest_dir: str) -> List[str]:
+        """
+        Writes the files of the given snapshot to dest_dir and returns their names.
+        """
+        with self._lock:
+            files = self._connection.execute(
+                'SELECT filename, hash FROM snapshot_files WHERE snapshot_id = ?', (snapshot_id,)
+            ).fetchall()
+        if not files:
+            raise ValueError(f'Snapshot {snapshot_id} does not exist')
+        Path(dest_dir).mkdir(parents=True, exist_ok=True)
+        for name, blob_hash in files:
+            blob_path = self.blob_dir / blob_hash[:2] / f'{blob_hash}.gz'
+            (Path(dest_dir) / name).write_bytes(gzip.decompress(blob_path.read_bytes()))
+        return [name for name, _ in files]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Lists or restores archived feed snapshots')
+    parser.add_argument('archiveDir', help='directory of the archive')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = subparsers.add_parser('list', help='list snapshots')
+    list_parser.add_argument('-f', '--feed', help='only list snapshots of this feed, e.g. deer')
+    restore_parser = subparsers.add_parser('restore', help='write the files of a snapshot to a directory')
+    restore_parser.add_argument('snapshotId', type=int)
+    restore_parser.add_argument('destDir')
+    args = parser.parse_args()
+
+    # root_dir is irrelevant for listing and restoring
+    archive = SnapshotArchive(args.archiveDir, '.')
+    if args.command == 'list':
+        for snapshot_id, feed, last_updated in archive.snapshots(args.feed):
+            print(f'{snapshot_id}\t{feed}\t{last_updated}')  # noqa: T201
+    else:
+        for name in archive.restore(args.snapshotId, args.destDir):
+            print(f'{args.destDir}/{name}')  # noqa: T201
+    archive.close()
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per entity, an 8 byte fingerprint followed by the 8 byte (big endian) last_reported it was first seen with
+FINGERPRINT_SIZE = 8
+ID_LENGTH = struct.Struct('>H')
+
+
+def _json_dumps(content: Any) -> bytes:
+    return json.dumps(content, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _get_dumps() -> Callable[[Any], bytes]:
+    """
+    Returns a function serializing content deterministically (with sorted keys), via orjson, if installed.
+    Unlike the feed serializers, it need not produce the same output with and without orjson.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return _json_dumps
+
+    def dumps(content: Any) -> bytes:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers exceeding 64 bit or non-string keys
+            return _json_dumps(content)
+
+    return dumps
+
+
+class ChangeDetector:
+    """
+    Derives a real last_reported for stations and vehicles, which providers stamp with the time of the
+    feed generation cycle (default_last_reported), as their upstream does not tell when they last changed.
+
+    Every such entity is fingerprinted (all fields but last_reported) and compared with its fingerprint of
+    the previous cycle. If it did not change, its last_reported is reset to the one recorded when it last changed.
+    Entities with another last_reported (i.e. a real one provided upstream) are left untouched.
+
+    Per feed and kind of entity, only the id and 16 bytes are kept per entity. If a state_dir is given,
+    they are persisted after every update, so last_reported survives restarts.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None):
+        self.state_dir = state_dir
+        self._dumps = _get_dumps()
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self._stores: Dict[str, Dict[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, store_name: str) -> Optional[str]:
+        return os.path.join(self.state_dir, f'{store_name}.fingerprints') if self.state_dir else None
+
+    def _load(self, store_name: str) -> Dict[str, bytes]:
+        path = self._path(store_name)
+        if not path or not os.path.exists(path):
+            return {}
+        store: Dict[str, bytes] = {}
+        try:
+            with open(path, 'rb') as state_file:
+                content = state_file.read()
+            position = 0
+            while position < len(content):
+                (id_length,) = ID_LENGTH.unpack_from(content, position)
+                position += ID_LENGTH.size
+                entity_id = content[position : position + id_length].decode('utf-8')
+                position += id_length
+                value = content[position : position + 2 * FINGERPRINT_SIZE]
+                if len(value) != 2 * FINGERPRINT_SIZE:
+                    raise ValueError('truncated entry')
+                store[entity_id] = value
+                position += 2 * FINGERPRINT_SIZE
+        except (OSError, ValueError, struct.error):
+            logger.warning(f'Could not read previous {path}, last_reported of all entities is reset')
+            return {}
+        return store
+
+    def _save(self, store_name: str, store: Dict[str, bytes]) -> None:
+        path = self._path(store_name)
+        if not path:
+            return
+        chunks = []
+        for entity_id, value in store.items():
+            encoded_id = entity_id.encode('utf-8')
+            chunks += [ID_LENGTH.pack(len(encoded_id)), encoded_id, value]
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(b''.join(chunks))
+        os.replace(temp_path, path)
+
+    def update(
+        self, feed: str, kind: str, entities: Optional[List[Dict[str, Any]]], id_key: str, default_last_reported: int
+    ) -> int:
+        """
+        Resets last_reported of the given entities (e.g. the station_status of the feed, identified by station_id)
+        which did not change since the previous update, and returns the number of entities which changed.
+
+        Note: a feed's updates must not run concurrently.
+        """
+        store_name = f'{feed}.{kind}'
+        with self._lock:
+            if store_name not in self._stores:
+                self._stores[store_name] = self._load(store_name)
+            previous_store = self._stores[store_name]
+
+        store: Dict[str, bytes] = {}
+        changed = 0
+        dumps, blake2b = self._dumps, hashlib.blake2b
+        encoded_default_last_reported = default_last_reported.to_bytes(FINGERPRINT_SIZE, 'big')
+        for entity in entities or []:
+            if entity.get('last_reported') != default_last_reported or id_key not in entity:
+                continue
+            entity_id = str(entity[id_key])
+            # The fingerprint covers all fields but last_reported. Instead of copying the entity without it,
+            # last_reported is blanked while serializing and set to its resulting value afterwards.
+            entity['last_reported'] = None
+            fingerprint = blake2b(dumps(entity), digest_size=FINGERPRINT_SIZE).digest()
+            previous_value = previous_store.get(entity_id)
+            if previous_value is not None and previous_value.startswith(fingerprint):
+                entity['last_reported'] = int.from_bytes(previous_value[FINGERPRINT_SIZE:], 'big')
+                store[entity_id] = previous_value
+            else:
+                entity['last_reported'] = default_last_reported
+                store[entity_id] = fingerprint + encoded_default_last_reported
+                changed += 1
+
+        with self._lock:
+            # entities no longer published are forgotten
+            self._stores[store_name] = store
+        self._save(store_name, store)
+        return changed
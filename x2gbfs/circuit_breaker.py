@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.consecutive_failures = 0
+        self.backoff = 0.0
+        self.open_until = 0.0
+        self.trial_running = False
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures per provider and stops requesting a provider's upstream
+    while it is failing.
+
+    After `failure_threshold` consecutive failures, a provider's circuit opens, i.e. updates are
+    skipped for the provider's base backoff (its entry in `base_backoffs`, e.g. its refresh period,
+    or `base_backoff` seconds), but at most `max_backoff` seconds. When this backoff has elapsed, the circuit is half open
+    and a single trial update is allowed. If it succeeds, the circuit closes again, otherwise it reopens
+    with twice the backoff, up to `max_backoff` seconds.
+
+    A `failure_threshold` of 0 disables the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 60,
+        max_backoff: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+        base_backoffs: Optional[Mapping[str, float]] = None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.base_backoffs = base_backoffs or {}
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, provider: str) -> Tuple[str, int]:
+        """
+        Returns the provider's circuit state and its number of consecutive failures.
+        """
+        with self._lock:
+            circuit = self._circuits.get(provider)
+            return self._state(circuit), circuit.consecutive_failures if circuit else 0
+
+    def _state(self, circuit: Optional[_Circuit]) -> str:
+        if circuit is None or circuit.open_until == 0:
+            return CLOSED
+        if circuit.open_until > self.clock():
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self, provider: str) -> bool:
+        """
+        Returns True, if the provider's feed should be updated now. In half open state,
+        only a single trial update is allowed until its result is recorded.
+        """
+        with self._lock:
+            circuit = self._circuits.get(provider)
+            if circuit is None or circuit.open_until == 0:
+                return True
+            if circuit.open_until > self.clock() or circuit.trial_running:
+                return False
+            circuit.trial_running = True
+            return True
+
+    def record_success(self, provider: str) -> None:
+        with self._lock:
+            circuit = self._circuits.pop(provider, None)
+        if circuit and circuit.open_until:
+            logger.info(f'Upstream of {provider} recovered, closing circuit')
+
+    def record_failure(self, provider: str) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            circuit = self._circuits.setdefault(provider, _Circuit())
+            circuit.consecutive_failures += 1
+            circuit.trial_running = False
+            if circuit.consecutive_failures < self.failure_threshold:
+                return
+            base_backoff = self.base_backoffs.get(provider, self.base_backoff)
+            circuit.backoff = min(self.max_backoff, circuit.backoff * 2 if circuit.backoff else base_backoff)
+            circuit.open_until = self.clock() + circuit.backoff
+            backoff, failures = circuit.backoff, circuit.consecutive_failures
+        logger.warning(f'{provider} failed {failures} times in a row, skipping updates for {backoff:.0f}s')
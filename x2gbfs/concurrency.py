@@ -0,0 +1,39 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Generator, Optional
+
+
+class UpstreamLimiter:
+    """
+    Caps the number of providers which concurrently request the same upstream host,
+    so shared backends (e.g. MOQO's portal or Cantamen's IXSI service) are not hammered
+    when feeds are generated in parallel.
+
+    Providers not declaring an upstream host are not limited.
+    """
+
+    def __init__(self, max_per_host: int = 1):
+        if max_per_host < 1:
+            raise ValueError(f'max_per_host must be at least 1, got {max_per_host}')
+        self.max_per_host = max_per_host
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    @contextmanager
+    def limit(self, host: Optional[str]) -> Generator[None, None, None]:
+        """
+        Blocks until a slot for `host` is available and holds it while the context is active.
+        """
+        if host is None:
+            yield
+            return
+
+        semaphore = self._semaphore_for(host)
+        with semaphore:
+            yield
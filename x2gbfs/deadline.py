@@ -0,0 +1,99 @@
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Generator, Optional, overload
+
+# Monotonic time by which the current provider run must have completed, if any.
+# As a context variable, it is local to the thread generating a feed.
+_deadline: ContextVar[Optional[float]] = ContextVar('x2gbfs_deadline', default=None)
+# Socket timeouts clamped to the remaining budget might fire marginally before the deadline
+EXPIRY_TOLERANCE_SECONDS = 0.05
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a provider run exceeded its time budget (see `x2gbfs.max_runtime_seconds`).
+    """
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Generator[None, None, None]:
+    """
+    Limits all upstream requests performed within this context to a total of `seconds`.
+    If seconds is None, requests are not limited.
+
+    The deadline is enforced cooperatively: requests issued via `remaining_timeout` get their
+    timeout clamped to the remaining budget, and `check_deadline` raises DeadlineExceeded once it has expired.
+    A request timing out once the deadline has expired (i.e. due to its clamped timeout)
+    is reported as DeadlineExceeded as well.
+    """
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + seconds
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    except Exception as err:
+        if (
+            not isinstance(err, DeadlineExceeded)
+            and is_timeout(err)
+            and time.monotonic() >= expires_at - EXPIRY_TOLERANCE_SECONDS
+        ):
+            raise DeadlineExceeded('Time budget of provider run exceeded') from err
+        raise
+    finally:
+        _deadline.reset(token)
+
+
+def is_timeout(err: Exception) -> bool:
+    """
+    Returns True, if err signals a timed out request, i.e. is a TimeoutError (as raised e.g. by websockets)
+    or a requests Timeout, or a requests ConnectionError caused by a read timeout while reading the response body.
+
+    Note: requests is only imported by the providers using it, so we only check for its exceptions if it has been imported.
+    """
+    if isinstance(err, TimeoutError):
+        return True
+    requests_exceptions = sys.modules.get('requests.exceptions')
+    if requests_exceptions is None:
+        return False
+    if isinstance(err, requests_exceptions.Timeout):
+        return True
+    urllib3_exceptions = sys.modules.get('urllib3.exceptions')
+    return (
+        isinstance(err, requests_exceptions.ConnectionError)
+        and urllib3_exceptions is not None
+        and bool(err.args)
+        and isinstance(err.args[0], urllib3_exceptions.TimeoutError)
+    )
+
+
+def check_deadline() -> None:
+    """
+    Raises DeadlineExceeded, if the current deadline has expired.
+    """
+    remaining_timeout(None)
+
+
+@overload
+def remaining_timeout(timeout: float) -> float: ...
+
+
+@overload
+def remaining_timeout(timeout: None) -> Optional[float]: ...
+
+
+def remaining_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    Returns the given timeout, clamped to the time remaining until the current deadline.
+    Raises DeadlineExceeded, if the deadline has already expired.
+    """
+    current_deadline = _deadline.get()
+    if current_deadline is None:
+        return timeout
+    remaining = current_deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded('Time budget of provider run exceeded')
+    return remaining if timeout is None else min(timeout, remaining)
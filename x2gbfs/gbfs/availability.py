@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Station, vehicle type and availability (neither reserved nor disabled) of a vehicle at a station
+VehicleState = Tuple[Any, str, bool]
+# num_bikes_available and vehicle_types_available of a station
+StationResult = Tuple[int, List[Dict[str, Any]]]
+
+
+class StationAvailabilityState:
+    """
+    Keeps the station assignment of every vehicle and the resulting per station aggregates
+    across feed generation cycles, so that only stations touched by added, removed or changed vehicles
+    need to be recomputed. Additionally keeps the station status computed for every station in the previous
+    cycle, together with the provider's input it was computed from.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets all state, so the next update touches all stations with vehicles.
+        """
+        self._vehicle_states: Dict[str, VehicleState] = {}
+        # per station and vehicle type, the number of vehicles and of available vehicles
+        self._counts: Dict[Any, Dict[str, List[int]]] = {}
+        # per station, the provider's vehicle_types_available and the resulting station status values
+        self._results: Dict[Any, Tuple[Optional[List[Dict[str, Any]]], StationResult]] = {}
+
+    def update(self, vehicles_map: Dict[str, Dict]) -> Set[Any]:
+        """
+        Updates the aggregates for the given vehicles (keyed by their id) and returns the ids of the stations
+        whose aggregates changed since the previous update.
+        """
+        touched_stations: Set[Any] = set()
+        # states left in previous_states after the loop are those of vehicles gone or no longer at a station
+        previous_states = self._vehicle_states
+        states: Dict[str, VehicleState] = {}
+        for vehicle_id, vehicle in vehicles_map.items():
+            if 'station_id' not in vehicle:
+                continue
+            state = (
+                vehicle['station_id'],
+                vehicle['vehicle_type_id'],
+                not vehicle['is_reserved'] and not vehicle['is_disabled'],
+            )
+            states[vehicle_id] = state
+            previous_state = previous_states.pop(vehicle_id, None)
+            if previous_state != state:
+                if previous_state is not None:
+                    self._remove(previous_state)
+                    touched_stations.add(previous_state[0])
+                self._add(state)
+                touched_stations.add(state[0])
+        for previous_state in previous_states.values():
+            self._remove(previous_state)
+            touched_stations.add(previous_state[0])
+        self._vehicle_states = states
+        return touched_stations
+
+    def _add(self, state: VehicleState) -> None:
+        station_id, vehicle_type_id, is_available = state
+        counts = self._counts.setdefault(station_id, {}).setdefault(vehicle_type_id, [0, 0])
+        counts[0] += 1
+        counts[1] += is_available
+
+    def _remove(self, state: VehicleState) -> None:
+        station_id, vehicle_type_id, is_available = state
+        counts_per_type = self._counts[station_id]
+        counts = counts_per_type[vehicle_type_id]
+        counts[0] -= 1
+        counts[1] -= is_available
+        if counts[0] == 0:
+            del counts_per_type[vehicle_type_id]
+            if not counts_per_type:
+                del self._counts[station_id]
+
+    def available_per_type(self, station_id: Any) -> Optional[Dict[str, int]]:
+        """
+        Returns the number of available vehicles per vehicle type at the given station,
+        or None, if no vehicle is at this station.
+        """
+        counts_per_type = self._counts.get(station_id)
+        if counts_per_type is None:
+            return None
+        return {vehicle_type_id: counts[1] for vehicle_type_id, counts in counts_per_type.items()}
+
+    def previous_result(
+        self, station_id: Any, pre_existing_vt: Optional[List[Dict[str, Any]]]
+    ) -> Optional[StationResult]:
+        """
+        Returns num_bikes_available and vehicle_types_available computed for the station in the previous cycle,
+        if it was computed from the same pre-existing vehicle_types_available.
+        """
+        previous = self._results.get(station_id)
+        if previous is None or previous[0] != (pre_existing_vt or None):
+            return None
+        return previous[1]
+
+    def record_result(
+        self, station_id: Any, pre_existing_vt: Optional[List[Dict[str, Any]]], result: Optional[StationResult]
+    ) -> None:
+        """
+        Records the result computed for the station from the given pre-existing vehicle_types_available,
+        or forgets the previous one, if result is None.
+        """
+        if result is None:
+            self._results.pop(station_id, None)
+            return
+        # pre-existing entries are copied, in case a provider reuses and modifies them
+        copied_pre_existing_vt = [dict(vt) for vt in pre_existing_vt] if pre_existing_vt else None
+        self._results[station_id] = (copied_pre_existing_vt, result)
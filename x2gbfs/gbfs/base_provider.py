@@ -12,6 +12,36 @@ class BaseProvider:
     def __init__(self, feed_config: dict[str, Any]):
         self.config = feed_config
 
+    @classmethod
+    def from_config(cls, feed_config: dict[str, Any]) -> 'BaseProvider':
+        """
+        Creates a provider instance for the given feed config.
+        Providers which require further collaborators (e.g. an API client
+        configured via environment variables) should overwrite this method.
+        """
+        return cls(feed_config)
+
+    def upstream_host(self) -> Optional[str]:
+        """
+        Returns the host name of the upstream API this provider retrieves its data from.
+        Providers sharing the same upstream host are not run concurrently
+        beyond the configured per host limit.
+
+        The default implementation returns None, i.e. the provider
+        is not subject to any per host limit.
+        """
+        return None
+
+    def reset(self) -> None:
+        """
+        Resets state which must not be carried over from one feed generation cycle
+        to the next, e.g. cached upstream responses.
+
+        Provider instances are reused across cycles, so authentication tokens or other
+        caches survive. This method is called before every cycle in which an instance
+        is reused. The default implementation does nothing.
+        """
+
     def load_system_information(self) -> Dict[str, Any]:
         """
         Retrieves the system_information for this provider.
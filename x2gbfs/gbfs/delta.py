@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from x2gbfs.gbfs.serializer import JsonSerializer, get_serializer
+
+logger = logging.getLogger(__name__)
+
+
+def delta_filename(filename: str) -> str:
+    """
+    Returns the name of the delta file belonging to the given gbfs file,
+    e.g. `vehicle_status.delta.json` for `vehicle_status.json`.
+    """
+    return filename.removesuffix('.json') + '.delta.json'
+
+
+class Snapshot:
+    """
+    The sequence number of a written status file and a fingerprint of each of its entities, keyed by entity id.
+    """
+
+    def __init__(self, sequence: int, fingerprints: Dict[str, bytes]):
+        self.sequence = sequence
+        self.fingerprints = fingerprints
+
+
+class DeltaTracker:
+    """
+    Keeps a snapshot of the previously written status files (e.g. vehicle_status.json),
+    to derive the entities added, modified and removed since, so that clients can catch up
+    incrementally instead of downloading the full file every ttl.
+
+    Only fingerprints of entities are kept, not the entities themselves. On the first update of a file,
+    its snapshot and sequence number are restored from the files written by a previous run (if any).
+
+    A diff's snapshot only becomes the base of the next diff once it is committed, i.e. after the status file
+    and its delta file were both written, so that the changes of a failed write are contained in the next delta.
+    """
+
+    def __init__(self, serializer: Optional[JsonSerializer] = None):
+        self.serializer = serializer or get_serializer()
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._lock = threading.Lock()
+
+    def _fingerprints(self, entities: List[Dict], id_key: str) -> Dict[str, bytes]:
+        # the compact serialization has sorted keys, so equal entities have equal fingerprints
+        return {
+            str(entity.get(id_key)): hashlib.blake2b(self.serializer.dumps(entity, True), digest_size=16).digest()
+            for entity in entities
+        }
+
+    def _load_snapshot(self, filename: str, key: str, id_key: str) -> Snapshot:
+        """
+        Restores the snapshot of filename from the file itself and its delta file as written by a previous run.
+        """
+        sequence = 0
+        try:
+            with open(delta_filename(filename), 'rb') as delta_file:
+                sequence = int(json.load(delta_file)['data']['sequence'])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning(f'Could not read sequence from {delta_filename(filename)}, restarting at 1')
+
+        try:
+            with open(filename, 'rb') as status_file:
+                entities = json.load(status_file)['data'][key]
+            return Snapshot(sequence, self._fingerprints(entities, id_key))
+        except FileNotFoundError:
+            return Snapshot(sequence, {})
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logger.warning(f'Could not read previous {filename}, all entities will be reported as added')
+            return Snapshot(sequence, {})
+
+    def diff(
+        self,
+        filename: str,
+        key: str,
+        id_key: str,
+        entities: Iterable[Dict],
+    ) -> Tuple[Dict[str, Any], Snapshot]:
+        """
+        Returns the changes of the entities about to be written to filename (below data.key) since
+        its previous (committed) update, and the snapshot of the entities, which is to be committed
+        once they were written. Entities are compared (and returned) as they are written, i.e. converted
+        (if given as ConvertedEntities).
+
+        Must be called before filename is overwritten, as the initial snapshot is restored from it.
+        """
+        with self._lock:
+            previous = self._snapshots.get(filename)
+        if previous is None:
+            previous = self._load_snapshot(filename, key, id_key)
+            # kept, as filename might not be readable anymore, if writing it fails
+            with self._lock:
+                self._snapshots.setdefault(filename, previous)
+
+        fingerprints: Dict[str, bytes] = {}
+        added = []
+        modified = []
+        for entity in entities:
+            entity_id = str(entity.get(id_key))
+            fingerprint = hashlib.blake2b(self.serializer.dumps(entity, True), digest_size=16).digest()
+            fingerprints[entity_id] = fingerprint
+            previous_fingerprint = previous.fingerprints.get(entity_id)
+            if previous_fingerprint is None:
+                added.append(entity)
+            elif previous_fingerprint != fingerprint:
+                modified.append(entity)
+        removed = [{id_key: entity_id} for entity_id in previous.fingerprints if entity_id not in fingerprints]
+
+        sequence = previous.sequence + 1
+        delta = {'sequence': sequence, 'added': added, 'modified': modified, 'removed': removed}
+        return delta, Snapshot(sequence, fingerprints)
+
+    def commit(self, filename: str, snapshot: Snapshot) -> None:
+        """
+        Makes snapshot (as returned by diff) the base of the next diff of filename.
+        """
+        with self._lock:
+            self._snapshots[filename] = snapshot
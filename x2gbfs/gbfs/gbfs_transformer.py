@@ -1,8 +1,16 @@
-from collections import Counter
+import copy
+import logging
 from datetime import datetime
 from typing import Any, Collection, Dict, List, Optional, Tuple
 
+from x2gbfs.metrics import CycleMetrics, timed
+
+from .availability import StationAvailabilityState
 from .base_provider import BaseProvider
+from .geometry import count_vertices, simplify_features
+from .spatial import StationGrid
+
+logger = logging.getLogger(__name__)
 
 
 class GbfsTransformer:
@@ -12,6 +20,17 @@ class GbfsTransformer:
     # see https://wiki.openstreetmap.org/wiki/Precision_of_coordinates
     MAX_COORDINATE_PRECISION = 6
 
+    # full recomputes station availabilities every cycle, incremental only those of stations whose vehicles changed,
+    # verify additionally recomputes all of them and logs differences
+    AVAILABILITY_MODES = ('full', 'incremental', 'verify')
+
+    def __init__(self, availability_mode: str = 'full'):
+        if availability_mode not in self.AVAILABILITY_MODES:
+            raise ValueError(f'Unknown availability_mode {availability_mode}')
+        self.availability_mode = availability_mode
+        # kept across cycles, as transformers are reused in interval mode
+        self._availability_state = StationAvailabilityState() if availability_mode != 'full' else None
+
     def load_system_information(self, provider: BaseProvider) -> Dict[str, Any]:
         """
         Loads system_information information from the provider.
@@ -31,7 +50,11 @@ class GbfsTransformer:
         return provider.load_alerts()
 
     def load_stations_and_vehicles(
-        self, provider: BaseProvider
+        self,
+        provider: BaseProvider,
+        metrics: Optional[CycleMetrics] = None,
+        station_snapping_radius_meters: Optional[float] = None,
+        geofencing_simplification_meters: Optional[float] = None,
     ) -> Tuple[Optional[List], Optional[List], Optional[List], Optional[List], Optional[List], int]:
         """
         Load stations and vehicles from provider, updates vehicle availabilities at stations
@@ -40,16 +63,54 @@ class GbfsTransformer:
         Note, that all these collections are conditionally required, and hence may be missing
         (see e.g. https://github.com/MobilityData/gbfs/blob/v2.3/gbfs.md#files)
 
+        If station_snapping_radius_meters is given, vehicles without station_id are assigned
+        to the nearest station within this radius, before availabilities are deduced.
+
+        Coordinates of geofencing zones are rounded and, if geofencing_simplification_meters is given,
+        simplified with this tolerance (see x2gbfs.gbfs.geometry.simplify_features).
+
+        If metrics are provided, time spent retrieving data from the provider is recorded as
+        fetch stage, the time spent on postprocessing as transform stage.
         """
         default_last_reported = int(datetime.timestamp(datetime.now()))
 
-        station_infos_map, station_status_map, vehicle_types_map, vehicles_map = provider.load_stations_and_vehicles(
-            default_last_reported
-        )
+        with timed(metrics, 'fetch'):
+            station_infos_map, station_status_map, vehicle_types_map, vehicles_map = (
+                provider.load_stations_and_vehicles(default_last_reported)
+            )
 
-        geofencing_zones = (
-            provider.load_geofencing_zones() if callable(getattr(provider, 'load_geofencing_zones', None)) else None
-        )
+            geofencing_zones = (
+                provider.load_geofencing_zones() if callable(getattr(provider, 'load_geofencing_zones', None)) else None
+            )
+
+        with timed(metrics, 'transform'):
+            simplified_geofencing_zones = (
+                self._simplify_geofencing_zones(geofencing_zones, geofencing_simplification_meters, metrics)
+                if geofencing_zones
+                else None
+            )
+            return self._postprocess(
+                station_infos_map,
+                station_status_map,
+                vehicle_types_map,
+                vehicles_map,
+                simplified_geofencing_zones,
+                default_last_reported,
+                station_snapping_radius_meters,
+            )
+
+    def _postprocess(
+        self,
+        station_infos_map: Optional[Dict],
+        station_status_map: Optional[Dict],
+        vehicle_types_map: Optional[Dict],
+        vehicles_map: Optional[Dict],
+        geofencing_zones: Optional[Collection],
+        default_last_reported: int,
+        station_snapping_radius_meters: Optional[float] = None,
+    ) -> Tuple[Optional[List], Optional[List], Optional[List], Optional[List], Optional[List], int]:
+        if station_snapping_radius_meters and station_infos_map and vehicles_map:
+            self._snap_vehicles_to_stations(vehicles_map, station_infos_map, station_snapping_radius_meters)
 
         if station_status_map and vehicles_map:
             # if feed has stations and vehicles, we deduce vehicle_types_available
@@ -71,6 +132,38 @@ class GbfsTransformer:
             default_last_reported,
         )
 
+    def _simplify_geofencing_zones(
+        self, geofencing_zones: Collection, tolerance_meters: Optional[float], metrics: Optional[CycleMetrics]
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the geofencing zones with rounded and, if tolerance_meters is given, simplified coordinates.
+        The number of vertices before and after is recorded in metrics.
+        """
+        simplified_zones = simplify_features(geofencing_zones, tolerance_meters, self.MAX_COORDINATE_PRECISION)
+        vertices_before, vertices_after = count_vertices(geofencing_zones), count_vertices(simplified_zones)
+        if tolerance_meters:
+            logger.info(f'Simplified geofencing zones from {vertices_before} to {vertices_after} vertices')
+        if metrics:
+            metrics.set_count('geofencing_vertices_received', vertices_before)
+            metrics.set_count('geofencing_vertices', vertices_after)
+        return simplified_zones
+
+    @staticmethod
+    def _snap_vehicles_to_stations(
+        vehicles_map: Dict[str, Dict], station_infos_map: Dict[str, Dict], radius_meters: float
+    ) -> None:
+        """
+        Assigns every vehicle without station_id to the nearest station within radius_meters (if any).
+        """
+        grid = StationGrid(station_infos_map.values(), radius_meters)
+        for vehicle in vehicles_map.values():
+            lat, lon = vehicle.get('lat'), vehicle.get('lon')
+            if 'station_id' in vehicle or lat is None or lon is None:
+                continue
+            station_id = grid.nearest(lat, lon)
+            if station_id is not None:
+                vehicle['station_id'] = station_id
+
     @staticmethod
     def _round_coordinates(vehicles_or_stations: Collection[dict[str, Any]]) -> None:
         """
@@ -82,11 +175,22 @@ class GbfsTransformer:
             if isinstance(vehicle_or_station.get('lon'), float):
                 vehicle_or_station['lon'] = round(vehicle_or_station['lon'], GbfsTransformer.MAX_COORDINATE_PRECISION)
 
-    def _count_vehicle_types_at_station(self, vehicles_map, filter) -> Counter:
-        filtered_vehicle_map = {k: v for k, v in vehicles_map.items() if filter(v)}
-        station_vehicle_type_arr = [(v['station_id'], v['vehicle_type_id']) for v in filtered_vehicle_map.values()]
-
-        return Counter(station_vehicle_type_arr)
+    @staticmethod
+    def _count_available_vehicles_per_station(vehicles_map: Dict[str, Dict]) -> Dict[str, Dict[str, int]]:
+        """
+        Returns, per station and vehicle type, the number of vehicles neither reserved nor disabled,
+        in a single pass over all vehicles. Every vehicle type with any vehicle at a station
+        is included, even if none of its vehicles is available (i.e. with count 0).
+        """
+        available_per_station: Dict[str, Dict[str, int]] = {}
+        for vehicle in vehicles_map.values():
+            if 'station_id' not in vehicle:
+                continue
+            available_per_type = available_per_station.setdefault(vehicle['station_id'], {})
+            vehicle_type_id = vehicle['vehicle_type_id']
+            is_available = not vehicle['is_reserved'] and not vehicle['is_disabled']
+            available_per_type[vehicle_type_id] = available_per_type.get(vehicle_type_id, 0) + is_available
+        return available_per_station
 
     def _update_stations_availability_status(self, status_map: Dict[str, Dict], vehicles_map: Dict[str, Dict]) -> None:
         """
@@ -95,38 +199,83 @@ class GbfsTransformer:
         is assigned to this station. However, for the availabilty count,
         only those vehicles not reserved and not disabled are taken into account.
         """
+        if self._availability_state is None:
+            self._recompute_stations_availability_status(status_map, vehicles_map)
+            return
 
-        station_vehicle_type_free_cnt = self._count_vehicle_types_at_station(
-            vehicles_map, lambda v: not v['is_reserved'] and not v['is_disabled'] and 'station_id' in v
-        )
-        station_vehicle_type_cnt = self._count_vehicle_types_at_station(vehicles_map, lambda v: 'station_id' in v)
+        expected_status_map = copy.deepcopy(status_map) if self.availability_mode == 'verify' else None
+        try:
+            self._update_changed_stations_availability_status(self._availability_state, status_map, vehicles_map)
+        except Exception:
+            # partially applied changes would corrupt subsequent updates
+            self._availability_state.reset()
+            raise
+        if expected_status_map is not None:
+            self._recompute_stations_availability_status(expected_status_map, vehicles_map)
+            differing_station_ids = [
+                station_id
+                for station_id, station_status in status_map.items()
+                if station_status != expected_status_map[station_id]
+            ]
+            if differing_station_ids:
+                logger.error(
+                    f'Incrementally updated availability differs from full recomputation for '
+                    f'{len(differing_station_ids)} stations, e.g. {differing_station_ids[:10]}, using recomputed ones'
+                )
+                status_map.update(expected_status_map)
+                self._availability_state.reset()
 
-        vehicle_types_per_station: Dict[str, list] = {}
-        for station_vehicle_type in station_vehicle_type_cnt:
-            station_id = station_vehicle_type[0]
+    def _recompute_stations_availability_status(
+        self, status_map: Dict[str, Dict], vehicles_map: Dict[str, Dict]
+    ) -> None:
+        available_per_station = self._count_available_vehicles_per_station(vehicles_map)
 
-            if station_id not in vehicle_types_per_station:
-                vehicle_types_per_station[station_id] = []
+        for station_id, station_status in status_map.items():
+            if station_id in available_per_station:
+                self._update_station_availability_status(available_per_station[station_id], station_status)
+            else:
+                self._update_station_without_vehicles(station_status)
 
-            vehicle_types_per_station[station_id].append(
-                {
-                    'vehicle_type_id': station_vehicle_type[1],
-                    'count': station_vehicle_type_free_cnt.get(station_vehicle_type, 0),
-                }
+    def _update_changed_stations_availability_status(
+        self, state: StationAvailabilityState, status_map: Dict[str, Dict], vehicles_map: Dict[str, Dict]
+    ) -> None:
+        """
+        Updates the availability of stations touched by vehicles added, removed or changed since the previous cycle
+        (or whose provided vehicle_types_available changed). For all other stations, the previous result is reused.
+        """
+        touched_station_ids = state.update(vehicles_map)
+
+        for station_id, station_status in status_map.items():
+            pre_existing_vt = station_status.get('vehicle_types_available')
+            previous_result = (
+                None if station_id in touched_station_ids else state.previous_result(station_id, pre_existing_vt)
             )
+            if previous_result is not None:
+                station_status['num_bikes_available'], station_status['vehicle_types_available'] = previous_result
+                continue
 
-        for station_id in status_map.keys():
-            if station_id in vehicle_types_per_station:
-                self._update_station_availability_status(vehicle_types_per_station[station_id], status_map[station_id])
+            available_per_type = state.available_per_type(station_id)
+            if available_per_type is None:
+                self._update_station_without_vehicles(station_status)
+                state.record_result(station_id, None, None)
             else:
-                status_map[station_id]['vehicle_types_available'] = []
-                if 'num_bikes_available' not in status_map[station_id]:
-                    # num_bikes_available might have been set by provider,
-                    # so we only redefine if this is not the case
-                    status_map[station_id]['num_bikes_available'] = 0
+                self._update_station_availability_status(available_per_type, station_status)
+                state.record_result(
+                    station_id,
+                    pre_existing_vt,
+                    (station_status['num_bikes_available'], station_status['vehicle_types_available']),
+                )
+
+    @staticmethod
+    def _update_station_without_vehicles(station_status: Dict[str, Any]) -> None:
+        station_status['vehicle_types_available'] = []
+        if 'num_bikes_available' not in station_status:
+            # num_bikes_available might have been set by provider,
+            # so we only redefine if this is not the case
+            station_status['num_bikes_available'] = 0
 
     def _update_station_availability_status(
-        self, vt_available: List[Dict[str, Any]], station_status: Dict[str, Any]
+        self, available_per_type: Dict[str, int], station_status: Dict[str, Any]
     ) -> None:
         """
         Sets station_status.vehicle_types_available and
@@ -135,23 +284,20 @@ class GbfsTransformer:
         for vehicle_type_ids without available vehicles,
         as this is the only way to find out, if vehicles are for rent at this station.
         """
-        num_bikes_available = sum([vt['count'] for vt in vt_available])
-        station_status['num_bikes_available'] = num_bikes_available
+        station_status['num_bikes_available'] = sum(available_per_type.values())
         station_status['vehicle_types_available'] = self._merge_vehicle_types_available(
-            vt_available, station_status.get('vehicle_types_available')
+            available_per_type, station_status.get('vehicle_types_available')
         )
 
     def _merge_vehicle_types_available(
-        self, vt_available: List[Dict[str, Any]], pre_existing_vt: Optional[List[Dict[str, Any]]]
+        self, available_per_type: Dict[str, int], pre_existing_vt: Optional[List[Dict[str, Any]]]
     ) -> List[Dict[str, Any]]:
         """
-        Merges vehicle_types_available lists.
+        Merges the counted vehicle types into pre-existing vehicle_types_available,
+        keeping the order of pre-existing vehicle types. Further vehicle types are appended
+        ordered by their id, so the order does not depend on the order of vehicles.
         """
-        if not pre_existing_vt:
-            return vt_available
-
-        # convert both to map, merge, reconvert to list
-        vt_map = {vt['vehicle_type_id']: vt for vt in vt_available}
-        vt_map_fallback = {vt['vehicle_type_id']: vt for vt in pre_existing_vt}
-        vt_merged = {**vt_map_fallback, **vt_map}
+        vt_merged = {vt['vehicle_type_id']: vt for vt in pre_existing_vt} if pre_existing_vt else {}
+        for vehicle_type_id, count in sorted(available_per_type.items()):
+            vt_merged[vehicle_type_id] = {'vehicle_type_id': vehicle_type_id, 'count': count}
         return list(vt_merged.values())
@@ -1,35 +1,424 @@
-import copy
-import json
 import logging
+import os
 import re
+import zlib
+from concurrent.futures import Executor, Future, wait
 from datetime import UTC, datetime
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from x2gbfs.gbfs.delta import DeltaTracker, delta_filename
+from x2gbfs.gbfs.serializer import JsonSerializer, get_serializer
+from x2gbfs.gbfs.static_files import StaticFileTracker
+from x2gbfs.gbfs.validation import SchemaValidator
+from x2gbfs.metrics import CycleMetrics, timed
+
+if TYPE_CHECKING:
+    from x2gbfs.archive import SnapshotArchive
+    from x2gbfs.server import FeedStore
 
 logger = logging.getLogger(__name__)
 
 OPENING_HOURS_DEFAULT = '24/7'
 PHONE_NUMBER_GBFS_V3_PATTERN = re.compile(r'^\+\d+$')
+# Placeholder for the entity list in the envelope of a streamed gbfs file
+STREAMED_ENTITIES_PLACEHOLDER = '__x2gbfs_streamed_entities__'
+# Number of entities serialized at once when streaming
+STREAM_CHUNK_SIZE = 500
+
+# Converts a single entity, e.g. from GBFS v2 to v3, returning a converted copy
+EntityConverter = Callable[[Dict], Dict]
+
+
+class V3ConversionPlan:
+    """
+    Describes how an entity of a certain kind is converted from GBFS v2 to v3: which of its keys
+    are localized in v3, which keys were renamed and which keys hold timestamps.
+    """
+
+    def __init__(
+        self,
+        localized_keys: Sequence[str] = (),
+        renamed_keys: Sequence[Tuple[str, str]] = (),
+        timestamp_keys: Sequence[str] = (),
+    ):
+        self.localized_keys = localized_keys
+        self.renamed_keys = renamed_keys
+        self.timestamp_keys = timestamp_keys
+
+
+# Plans per entity kind, so only keys relevant for the kind are checked for every entity
+V3_CONVERSION_PLANS = {
+    'station_information': V3ConversionPlan(localized_keys=('name',)),
+    'station_status': V3ConversionPlan(
+        renamed_keys=(('num_bikes_available', 'num_vehicles_available'),), timestamp_keys=('last_reported',)
+    ),
+    'vehicle_types': V3ConversionPlan(localized_keys=('name', 'description', 'make', 'model')),
+    'vehicles': V3ConversionPlan(renamed_keys=(('bike_id', 'vehicle_id'),), timestamp_keys=('last_reported',)),
+    'geofencing_zones': V3ConversionPlan(),
+    'pricing_plans': V3ConversionPlan(localized_keys=('name', 'description')),
+    'alerts': V3ConversionPlan(localized_keys=('summary', 'description')),
+}
+# Plan for entities of unknown kind, checking all keys
+GENERIC_V3_CONVERSION_PLAN = V3ConversionPlan(
+    localized_keys=('name', 'description', 'make', 'model', 'summary'),
+    renamed_keys=(('bike_id', 'vehicle_id'), ('num_bikes_available', 'num_vehicles_available')),
+    timestamp_keys=('last_reported',),
+)
+
+
+class ConvertedEntities(Sequence[Dict]):
+    """
+    A read-only view of entities as converted by convert, e.g. from GBFS v2 to v3.
+    Entities are converted whenever they are accessed, so the converted copies of all of them
+    need not be held in memory at once. The entities themselves are not modified.
+    """
+
+    def __init__(self, entities: List[Dict], convert: EntityConverter):
+        self.entities = entities
+        self.convert = convert
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.convert(entity) for entity in self.entities[index]]
+        return self.convert(self.entities[index])
+
+    def __iter__(self) -> Iterator[Dict]:
+        return map(self.convert, self.entities)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ConvertedEntities)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'ConvertedEntities({list(self)!r})'
+
+
+def _is_streamed(data: Any) -> bool:
+    """
+    Returns whether data is a single list of entities (e.g. {'vehicles': [...]}), which is streamed while written.
+    """
+    return (
+        isinstance(data, dict) and len(data) == 1 and isinstance(next(iter(data.values())), (list, ConvertedEntities))
+    )
+
+
+@lru_cache(maxsize=4096)
+def isoformat_timestamp(timestamp: int) -> str:
+    """
+    Returns the unix timestamp in isoformat. Memoized, as most entities share the same (default) last_reported.
+    """
+    return datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+
+class CompressedFile:
+    """
+    A file chunks are compressed into incrementally.
+    """
+
+    def __init__(
+        self, filename: str, compress: Callable[[bytes], bytes], flush: Callable[[], bytes], keep: bool = False
+    ):
+        # closed in close()
+        self.dest = open(filename, 'wb')
+        self.compress = compress
+        self.flush = flush
+        # If keep is set, the compressed bytes are additionally kept in memory, e.g. to publish them
+        self.kept_chunks: Optional[List[bytes]] = [] if keep else None
+
+    def _write_compressed(self, compressed: bytes) -> None:
+        self.dest.write(compressed)
+        if self.kept_chunks is not None:
+            self.kept_chunks.append(compressed)
+
+    def write(self, chunk: bytes) -> None:
+        self._write_compressed(self.compress(chunk))
+
+    def close(self) -> None:
+        self._write_compressed(self.flush())
+        self.dest.close()
+
+    @staticmethod
+    def open_variants(filename: str, keep_gzip: bool = False) -> List['CompressedFile']:
+        """
+        Opens the gzip and, if the brotli module is available, the brotli compressed variant of filename.
+        If keep_gzip is set, the gzip variant keeps its compressed bytes in memory (see kept_chunks).
+        """
+        # wbits=31 produces gzip format (with mtime 0 and without file name)
+        gzip_compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        variants = [CompressedFile(f'{filename}.gz', gzip_compressor.compress, gzip_compressor.flush, keep_gzip)]
+        try:
+            import brotli
+        except ImportError:
+            return variants
+        brotli_compressor = brotli.Compressor()
+        variants.append(CompressedFile(f'{filename}.br', brotli_compressor.process, brotli_compressor.finish))
+        return variants
 
 
 class GbfsV2Writer:
 
+    VERSION = '2.3'
     VEHICLE_STATUS_FEED_NAME = 'free_bike_status'
     VEHICLE_STATUS_KEY = 'bikes'
+    VEHICLE_ID_KEY = 'bike_id'
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        metrics: Optional[CycleMetrics] = None,
+        feed_store: Optional['FeedStore'] = None,
+        compact: bool = False,
+        precompress: bool = False,
+        serializer: Optional[JsonSerializer] = None,
+        delta_tracker: Optional[DeltaTracker] = None,
+        static_file_tracker: Optional[StaticFileTracker] = None,
+        write_executor: Optional[Executor] = None,
+        archive: Optional['SnapshotArchive'] = None,
+        validator: Optional[SchemaValidator] = None,
+    ):
+        self.metrics = metrics
+        # If given, every written file is additionally published to this store for serving from memory
+        self.feed_store = feed_store
+        # If True, files are written without whitespace, with sorted keys and entities sorted by id,
+        # so that unchanged data results in identical files
+        self.compact = compact
+        # If True, a gzip (and, if the brotli module is available, a brotli) compressed variant of every file
+        # is written alongside, e.g. for nginx's gzip_static
+        self.precompress = precompress
+        # Defaults to the fastest available serializer, which all produce identical output
+        self.serializer = serializer or get_serializer()
+        # If given, a delta file with the entities changed since the previous update is written
+        # alongside every status file (i.e. station_status and vehicle status)
+        self.delta_tracker = delta_tracker
+        # If given, rarely changing files (e.g. system_information) are only rewritten when their content changed
+        self.static_file_tracker = static_file_tracker
+        # If given, the files of a feed are serialized and written concurrently in this executor
+        # (except gbfs.json, which is written last, once all others were written successfully)
+        self.write_executor = write_executor
+        # If given, every written file is stored in this archive, and a snapshot is recorded once the feed is written
+        self.archive = archive
+        # If given, all files of a feed are validated against their GBFS schemas before any of them is written
+        self.validator = validator
 
     def _dump_json(self, filename: str, content: dict):
-        with open(filename, 'w') as dest:
-            json.dump(content, dest, indent=2)
+        data = content['data']
+        if _is_streamed(data):
+            # e.g. {'vehicles': [...]}, which might be large, so entities are streamed
+            (key, entities), *_ = data.items()
+            chunks = self._serialize_streamed({**content, 'data': {key: [STREAMED_ENTITIES_PLACEHOLDER]}}, entities)
+        else:
+            with timed(self.metrics, 'serialize'):
+                chunks = iter([self.serializer.dumps(content, self.compact)])
+        self._write_chunks(filename, chunks, content['ttl'])
+
+    def _validate_feed(self, files: Dict[str, Dict], timestamp: int, ttl: int) -> None:
+        """
+        Validates the data of all files of a feed (by filename) before any of them is written,
+        so that in blocking mode, an invalid feed is not published partially.
+        """
+        if not self.validator:
+            return
+
+        def contents() -> Iterator[Tuple[str, Dict]]:
+            # converted one file after another, so only a single file's converted entities are held at once
+            for filename, data in files.items():
+                if _is_streamed(data):
+                    (key, entities), *_ = data.items()
+                    if isinstance(entities, ConvertedEntities):
+                        data = {key: list(entities)}
+                yield filename, self._envelope(data, timestamp, ttl)
+
+        with timed(self.metrics, 'validate'):
+            self.validator.check_feed(self.VERSION, contents())
+
+    def _serialize_streamed(self, content: Dict[str, Any], entities: Iterable[Dict]) -> Iterator[bytes]:
+        """
+        Serializes content, in which STREAMED_ENTITIES_PLACEHOLDER is replaced by the given entities,
+        chunk by chunk, so the complete serialized file never needs to be held in memory.
+        ConvertedEntities are converted chunk by chunk, right before they are serialized,
+        so only the converted copies of a single chunk are held in memory at once.
+
+        The output is identical to serializing content with the list of (converted) entities in place.
+        """
+        convert: Optional[EntityConverter] = None
+        if isinstance(entities, ConvertedEntities):
+            # converted here, so conversion is timed separately from serialization
+            convert = entities.convert
+            entities = entities.entities
+        with timed(self.metrics, 'serialize'):
+            skeleton = self.serializer.dumps(content, self.compact)
+        head, tail = skeleton.split(self.serializer.dumps(STREAMED_ENTITIES_PLACEHOLDER))
+        list_start = head.rindex(b'[') + 1
+        # e.g. '\n      ' when indenting or '' in compact mode
+        entity_prefix = head[list_start:]
+        separator = b',' + entity_prefix
+
+        iterator = iter(entities)
+        chunk = list(islice(iterator, STREAM_CHUNK_SIZE))
+        if not chunk:
+            # serialized empty lists have no inner whitespace
+            yield head[:list_start] + tail[tail.index(b']') :]
+            return
+
+        chunk_prefix = head
+        while chunk:
+            if convert:
+                with timed(self.metrics, 'convert'):
+                    chunk = [convert(entity) for entity in chunk]
+            with timed(self.metrics, 'serialize'):
+                serialized_entities = [self.serializer.dumps(entity, self.compact) for entity in chunk]
+                if entity_prefix:
+                    # indent entities to the list's level
+                    serialized_entities = [entity.replace(b'\n', entity_prefix) for entity in serialized_entities]
+            yield chunk_prefix + separator.join(serialized_entities)
+            chunk_prefix = separator
+            chunk = list(islice(iterator, STREAM_CHUNK_SIZE))
+        yield tail
+
+    def _write_chunks(self, filename: str, chunks: Iterator[bytes], ttl: int) -> None:
+        """
+        Writes the (lazily serialized) chunks to filename and to its compressed variants (if precompress
+        is enabled) one after another, publishes the complete content to the feed store (if any)
+        and stores it in the archive (if any).
+        """
+        # the gzip variant is kept to publish it, so the feed store need not compress the file once more
+        compressed_files = (
+            CompressedFile.open_variants(filename, keep_gzip=bool(self.feed_store)) if self.precompress else []
+        )
+        blob = self.archive.open_blob() if self.archive else None
+        published_chunks: List[bytes] = []
+        with open(filename, 'wb') as dest:
+            # chunks time their serialization themselves, as streamed chunks might also be converted
+            for chunk in chunks:
+                with timed(self.metrics, 'write'):
+                    dest.write(chunk)
+                if compressed_files:
+                    with timed(self.metrics, 'compress'):
+                        for compressed_file in compressed_files:
+                            compressed_file.write(chunk)
+                if blob:
+                    with timed(self.metrics, 'archive'):
+                        blob.write(chunk)
+                if self.feed_store:
+                    published_chunks.append(chunk)
+        if compressed_files:
+            with timed(self.metrics, 'compress'):
+                for compressed_file in compressed_files:
+                    compressed_file.close()
+        if self.archive and blob:
+            with timed(self.metrics, 'archive'):
+                self.archive.add(filename, blob.commit())
+        if self.feed_store:
+            gzipped_body = next(
+                (b''.join(file.kept_chunks) for file in compressed_files if file.kept_chunks is not None), None
+            )
+            self.feed_store.publish(filename, b''.join(published_chunks), ttl, gzipped_body=gzipped_body)
+
+    def _ordered(self, entities: Optional[List[Dict]], *id_keys: str) -> Optional[List[Dict]]:
+        """
+        In compact mode, returns the entities sorted by their id (the value of the first of id_keys they have),
+        so their order does not depend on the order the upstream API returned them in.
+        Otherwise, returns them unchanged.
+        """
+        if not self.compact or not entities:
+            return entities
+        return sorted(entities, key=lambda entity: str(next((entity[key] for key in id_keys if key in entity), '')))
+
+    def _entity_converter(self, kind: str, feed_language: str) -> Optional[EntityConverter]:
+        """
+        Returns the converter applied to every entity of the given kind (e.g. 'vehicles') while writing it,
+        or None, if entities are written as they are.
+        """
+        return None
+
+    def _converted(self, entities: List[Dict], kind: str, feed_language: str) -> Sequence[Dict]:
+        """
+        Returns the entities of the given kind as they are written, i.e. lazily converted (see ConvertedEntities).
+        """
+        convert = self._entity_converter(kind, feed_language)
+        return ConvertedEntities(entities, convert) if convert else entities
 
     def gbfs_data(self, base_url: str, feeds: List[str], feed_language: str) -> Dict:
         return {feed_language: {'feeds': [{'name': feed, 'url': f'{base_url}/{feed}.json'} for feed in feeds]}}
 
+    def _envelope(self, data: Any, timestamp: int, ttl: int) -> Dict[str, Any]:
+        return {'data': data, 'last_updated': timestamp, 'ttl': ttl, 'version': self.VERSION}
+
     def write_gbfs_file(self, filename: str, data, timestamp: int, ttl: int = 60) -> None:
-        content = {'data': data, 'last_updated': timestamp, 'ttl': ttl, 'version': '2.3'}
+        self._dump_json(filename, self._envelope(data, timestamp, ttl))
+
+    def write_static_file(self, filename: str, data, timestamp: int, ttl: int = 60) -> None:
+        """
+        Writes a rarely changing gbfs file. If a static file tracker is given, the file
+        (and its last_updated) is left untouched, if its content did not change.
+        """
+        if not self.static_file_tracker:
+            self.write_gbfs_file(filename, data, timestamp, ttl)
+            return
+        content = self._envelope(data, timestamp, ttl)
+        with timed(self.metrics, 'serialize'):
+            fingerprint = self.static_file_tracker.fingerprint(content)
+        # when precompress was enabled since the file was written, it lacks its compressed variant
+        if self.static_file_tracker.is_unchanged(filename, fingerprint) and (
+            not self.precompress or os.path.exists(f'{filename}.gz')
+        ):
+            logger.debug(f'{filename} is unchanged, skip rewriting it')
+            if self.feed_store:
+                # the unchanged file is still up to date
+                self.feed_store.touch(filename)
+            if self.archive:
+                with timed(self.metrics, 'archive'):
+                    self.archive.keep(filename)
+            return
         self._dump_json(filename, content)
+        self.static_file_tracker.record(filename, fingerprint)
+
+    def write_status_file(
+        self,
+        filename: str,
+        key: str,
+        id_key: str,
+        entities: Sequence[Dict],
+        timestamp: int,
+        ttl: int = 60,
+    ) -> None:
+        """
+        Writes a status file and, if deltas are enabled, its delta file.
+        id_key is the key of the entities' id once converted.
+        """
+        if not self.delta_tracker:
+            self.write_gbfs_file(filename, {key: entities}, timestamp, ttl)
+            return
+        with timed(self.metrics, 'delta'):
+            delta, snapshot = self.delta_tracker.diff(filename, key, id_key, entities)
+        self.write_gbfs_file(filename, {key: entities}, timestamp, ttl)
+        self.write_gbfs_file(delta_filename(filename), delta, timestamp, ttl)
+        # only once both are written, so that if either write fails, the next delta still contains these changes
+        self.delta_tracker.commit(filename, snapshot)
+
+    def _schedule(self, pending_writes: List[Future], write: Callable[[], None]) -> None:
+        """
+        Submits write to the write executor, if any, and performs it immediately otherwise.
+        """
+        if self.write_executor:
+            pending_writes.append(self.write_executor.submit(write))
+        else:
+            write()
+
+    @staticmethod
+    def _await(pending_writes: List[Future]) -> None:
+        """
+        Waits for all pending writes to complete and raises the exception of the first failed one (if any).
+        """
+        wait(pending_writes)
+        for pending_write in pending_writes:
+            pending_write.result()
 
     def write_gbfs_feed(
         self,
@@ -46,16 +435,39 @@ class GbfsV2Writer:
         timestamp: int,
         ttl: int = 60,
     ) -> None:
-        Path(destFolder).mkdir(parents=True, exist_ok=True)
+        if 'languages' in system_information:
+            feed_language = system_information['languages'][0]
+        elif 'language' in system_information:
+            feed_language = system_information['language']
+        else:
+            raise Exception('Config neither provides language nor languages to deduce feed language')
 
+        Path(destFolder).mkdir(parents=True, exist_ok=True)
+        station_information = self._ordered(station_information, 'station_id')
+        station_status = self._ordered(station_status, 'station_id')
+        # vehicles might not be converted yet, i.e. still be identified by their v2 bike_id
+        vehicles = self._ordered(vehicles, 'bike_id', self.VEHICLE_ID_KEY)
+        vehicle_types = self._ordered(vehicle_types, 'vehicle_type_id')
+        pricing_plans = self._ordered(pricing_plans, 'plan_id')
+        alerts = self._ordered(alerts, 'alert_id')
+
+        # data per file, written once all of them were validated
+        files: Dict[str, Dict] = {}
+        writes: List[Callable[[], None]] = []
         feeds = ['system_information']
-        self.write_gbfs_file(destFolder + '/system_information.json', system_information, timestamp, ttl)
+        filename = destFolder + '/system_information.json'
+        files[filename] = system_information
+        writes.append(partial(self.write_static_file, filename, system_information, timestamp, ttl))
         if station_information and station_status:
             feeds.extend(('station_information', 'station_status'))
-            self.write_gbfs_file(
-                destFolder + '/station_information.json', {'stations': station_information}, timestamp, ttl
-            )
-            self.write_gbfs_file(destFolder + '/station_status.json', {'stations': station_status}, timestamp, ttl)
+            filename = destFolder + '/station_information.json'
+            stations = {'stations': self._converted(station_information, 'station_information', feed_language)}
+            files[filename] = stations
+            writes.append(partial(self.write_gbfs_file, filename, stations, timestamp, ttl))
+            filename = destFolder + '/station_status.json'
+            statuses = self._converted(station_status, 'station_status', feed_language)
+            files[filename] = {'stations': statuses}
+            writes.append(partial(self.write_status_file, filename, 'stations', 'station_id', statuses, timestamp, ttl))
         elif station_information or station_status:
             logger.error(
                 f'For feed {system_information["system_id"]}, only one of station_information or station_status was returned. Skipping station generation.'
@@ -66,54 +478,65 @@ class GbfsV2Writer:
             )
         if vehicles:
             feeds.append(self.VEHICLE_STATUS_FEED_NAME)
-            self.write_gbfs_file(
-                f'{destFolder}/{self.VEHICLE_STATUS_FEED_NAME}.json',
-                {self.VEHICLE_STATUS_KEY: vehicles},
-                timestamp,
-                ttl,
-            )
-        if vehicle_types:
-            feeds.append('vehicle_types')
-            self.write_gbfs_file(destFolder + '/vehicle_types.json', {'vehicle_types': vehicle_types}, timestamp, ttl)
-        if pricing_plans:
-            feeds.append('system_pricing_plans')
-            self.write_gbfs_file(destFolder + '/system_pricing_plans.json', {'plans': pricing_plans}, timestamp, ttl)
-        if geofencing_zones:
-            feeds.append('geofencing_zones')
-            self.write_gbfs_file(
-                destFolder + '/geofencing_zones.json',
-                {'geofencing_zones': {'type': 'FeatureCollection', 'features': geofencing_zones}},
-                timestamp,
-                ttl,
+            filename = f'{destFolder}/{self.VEHICLE_STATUS_FEED_NAME}.json'
+            converted_vehicles = self._converted(vehicles, 'vehicles', feed_language)
+            files[filename] = {self.VEHICLE_STATUS_KEY: converted_vehicles}
+            writes.append(
+                partial(
+                    self.write_status_file,
+                    filename,
+                    self.VEHICLE_STATUS_KEY,
+                    self.VEHICLE_ID_KEY,
+                    converted_vehicles,
+                    timestamp,
+                    ttl,
+                )
             )
-
-        if alerts:
-            feeds.append('system_alerts')
-            self.write_gbfs_file(destFolder + '/system_alerts.json', {'alerts': alerts}, timestamp, ttl)
-
-        if 'languages' in system_information:
-            feed_language = system_information['languages'][0]
-        elif 'language' in system_information:
-            feed_language = system_information['language']
-        else:
-            raise Exception('Config neither provides language nor languages to deduce feed language')
-
-        self.write_gbfs_file(destFolder + '/gbfs.json', self.gbfs_data(base_url, feeds, feed_language), timestamp, ttl)
+        static_files = [
+            ('vehicle_types', vehicle_types and {'vehicle_types': vehicle_types}),
+            ('system_pricing_plans', pricing_plans and {'plans': pricing_plans}),
+            (
+                'geofencing_zones',
+                geofencing_zones and {'geofencing_zones': {'type': 'FeatureCollection', 'features': geofencing_zones}},
+            ),
+            ('system_alerts', alerts and {'alerts': alerts}),
+        ]
+        for feed, data in static_files:
+            if not data:
+                continue
+            feeds.append(feed)
+            filename = f'{destFolder}/{feed}.json'
+            files[filename] = data
+            writes.append(partial(self.write_static_file, filename, data, timestamp, ttl))
+        gbfs_filename = destFolder + '/gbfs.json'
+        gbfs_data = self.gbfs_data(base_url, feeds, feed_language)
+        self._validate_feed({**files, gbfs_filename: gbfs_data}, timestamp, ttl)
+
+        pending_writes: List[Future] = []
+        for write in writes:
+            self._schedule(pending_writes, write)
+        self._await(pending_writes)
+
+        self.write_gbfs_file(gbfs_filename, gbfs_data, timestamp, ttl)
+        if self.archive:
+            with timed(self.metrics, 'archive'):
+                self.archive.record_snapshot(destFolder, timestamp)
 
 
 class GbfsV3Writer(GbfsV2Writer):
 
+    VERSION = '3.0'
     VEHICLE_STATUS_FEED_NAME = 'vehicle_status'
     VEHICLE_STATUS_KEY = 'vehicles'
+    VEHICLE_ID_KEY = 'vehicle_id'
 
-    def write_gbfs_file(self, filename: str, data, timestamp: int, ttl: int = 60) -> None:
-        content = {
+    def _envelope(self, data: Any, timestamp: int, ttl: int) -> Dict[str, Any]:
+        return {
             'data': data,
-            'last_updated': datetime.fromtimestamp(timestamp, UTC).isoformat(),
+            'last_updated': isoformat_timestamp(timestamp),
             'ttl': ttl,
-            'version': '3.0',
+            'version': self.VERSION,
         }
-        self._dump_json(filename, content)
 
     def gbfs_data(self, base_url: str, feeds: List[str], feed_language: str) -> Dict:
         return {'feeds': [{'name': feed, 'url': f'{base_url}/{feed}.json'} for feed in feeds]}
@@ -123,12 +546,15 @@ class GbfsV3Writer(GbfsV2Writer):
         # a v3 compliant system_information.
         # If it's already a valid v3 config, it will be unchanged.
 
-        new_system_information = copy.deepcopy(system_information)
+        # A shallow copy suffices, as values are replaced, but never modified in place
+        new_system_information = dict(system_information)
         system_id = system_information['system_id']
 
         if 'language' in new_system_information:
             feed_language = new_system_information.pop('language')
             new_system_information['languages'] = [feed_language]
+        else:
+            feed_language = new_system_information['languages'][0]
 
         for key in [
             'name',
@@ -171,28 +597,48 @@ class GbfsV3Writer(GbfsV2Writer):
 
         return new_system_information
 
-    def _convert_to_v3(self, feed_language, elements):
-        if not elements:
+    def _convert_entity(self, feed_language: str, plan: V3ConversionPlan, element: Dict) -> Dict:
+        """
+        Returns a (shallow) copy of the element converted to v3, only considering the keys of the given plan.
+        The element itself is not modified, as it might be shared with other writers (e.g. a GbfsV2Writer).
+        Already converted elements stay unchanged.
+        """
+        if not isinstance(element, dict):
+            logger.warning(f'Unexpected additional element: {element}')
+            return element
+
+        element = dict(element)
+        for key in plan.localized_keys:
+            value = element.get(key)
+            if isinstance(value, str):
+                element[key] = [{'language': feed_language, 'text': value}]
+
+        for former_key, new_key in plan.renamed_keys:
+            if former_key in element:
+                element[new_key] = element.pop(former_key)
+
+        for key in plan.timestamp_keys:
+            value = element.get(key)
+            if isinstance(value, int):
+                element[key] = isoformat_timestamp(value)
+        return element
+
+    def _entity_converter(self, kind: str, feed_language: str) -> Optional[EntityConverter]:
+        plan = V3_CONVERSION_PLANS[kind]
+        if not (plan.localized_keys or plan.renamed_keys or plan.timestamp_keys):
             return None
+        return partial(self._convert_entity, feed_language, plan)
 
-        for element in elements:
-            for key in ['name', 'description', 'make', 'model', 'summary']:
-                if key in element and isinstance(element[key], str):
-                    element[key] = [{'language': feed_language, 'text': element[key]}]
-
-            for replacement in [
-                {'former': 'bike_id', 'new': 'vehicle_id'},
-                {'former': 'num_bikes_available', 'new': 'num_vehicles_available'},
-            ]:
-                if replacement['former'] in element:
-                    element[replacement['new']] = element.pop(replacement['former'])
-
-            if not isinstance(element, dict):
-                logger.warning(f'Unexpected additional element: {element}')
-            elif isinstance(element.get('last_reported'), int):
-                element['last_reported'] = datetime.fromtimestamp(element['last_reported'], UTC).isoformat()
-
-        return elements
+    def _convert_to_v3(self, feed_language, elements, plan: V3ConversionPlan = GENERIC_V3_CONVERSION_PLAN):
+        """
+        Returns the elements converted to v3 (in a single pass and only considering the keys of the given plan).
+        The given elements are not modified, but converted into (shallow) copies (see _convert_entity).
+        """
+        if not elements:
+            return None
+        if not (plan.localized_keys or plan.renamed_keys or plan.timestamp_keys):
+            return elements
+        return [self._convert_entity(feed_language, plan, element) for element in elements]
 
     def write_gbfs_feed(
         self,
@@ -209,19 +655,27 @@ class GbfsV3Writer(GbfsV2Writer):
         timestamp: int,
         ttl: int = 60,
     ) -> None:
-        system_information_v3 = self._convert_system_information_to_v3(system_information)
-        feed_language = system_information_v3['languages'][0]
+        # Station information, station status and vehicles, which might be large, are converted chunk by chunk
+        # while they are written (see ConvertedEntities), the (small) rest is converted up front.
+        with timed(self.metrics, 'convert'):
+            system_information_v3 = self._convert_system_information_to_v3(system_information)
+            feed_language = system_information_v3['languages'][0]
+            plans = V3_CONVERSION_PLANS
+            vehicle_types_v3 = self._convert_to_v3(feed_language, vehicle_types, plans['vehicle_types'])
+            geofencing_zones_v3 = self._convert_to_v3(feed_language, geofencing_zones, plans['geofencing_zones'])
+            pricing_plans_v3 = self._convert_to_v3(feed_language, pricing_plans, plans['pricing_plans'])
+            alerts_v3 = self._convert_to_v3(feed_language, alerts, plans['alerts'])
 
         super().write_gbfs_feed(
             destFolder,
             system_information_v3,
-            self._convert_to_v3(feed_language, station_information),
-            self._convert_to_v3(feed_language, station_status),
-            self._convert_to_v3(feed_language, vehicle_types),
-            self._convert_to_v3(feed_language, vehicles),
-            self._convert_to_v3(feed_language, geofencing_zones),
-            self._convert_to_v3(feed_language, pricing_plans),
-            self._convert_to_v3(feed_language, alerts),
+            station_information,
+            station_status,
+            vehicle_types_v3,
+            vehicles,
+            geofencing_zones_v3,
+            pricing_plans_v3,
+            alerts_v3,
             base_url,
             timestamp,
             ttl,
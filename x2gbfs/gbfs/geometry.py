@@ -0,0 +1,269 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .spatial import METERS_PER_DEGREE
+
+Position = List[float]
+Ring = List[Position]
+# A segment between two kept vertices of a ring: ring index, start and end vertex index
+Segment = Tuple[int, int, int]
+
+
+def _polygons(geometry: Optional[Dict[str, Any]]) -> List[List[Ring]]:
+    """
+    Returns the polygons (each a list of rings, the exterior first) of a Polygon or MultiPolygon geometry.
+    """
+    if not geometry:
+        return []
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def count_vertices(features: Iterable[Dict[str, Any]]) -> int:
+    """
+    Returns the number of positions of all (Multi)Polygon rings of the given GeoJSON features.
+    """
+    return sum(len(ring) for feature in features for polygon in _polygons(feature.get('geometry')) for ring in polygon)
+
+
+def _quantize_ring(ring: Ring, precision: int) -> Ring:
+    """
+    Rounds coordinates to precision decimal places and drops consecutive duplicate positions.
+    """
+    quantized: Ring = []
+    for position in ring:
+        rounded = [round(position[0], precision), round(position[1], precision)]
+        if not quantized or rounded != quantized[-1]:
+            quantized.append(rounded)
+    if len(quantized) < 4:
+        # degenerate rings are left as they are
+        return ring
+    return quantized
+
+
+def _signed_area(xs: List[float], ys: List[float], indices: List[int]) -> float:
+    return sum(xs[i] * ys[j] - xs[j] * ys[i] for i, j in zip(indices, indices[1:], strict=False)) / 2
+
+
+def _contains(xs: List[float], ys: List[float], indices: List[int], x: float, y: float) -> bool:
+    """
+    Returns True, if (x, y) lies within the ring formed by the vertices of the given indices (ray casting).
+    """
+    inside = False
+    for i, j in zip(indices, indices[1:], strict=False):
+        if (ys[i] > y) != (ys[j] > y) and x < xs[i] + (y - ys[i]) * (xs[j] - xs[i]) / (ys[j] - ys[i]):
+            inside = not inside
+    return inside
+
+
+class _ProjectedRing:
+    """
+    A ring projected to meters (equirectangular), together with the indices of the vertices kept so far.
+    """
+
+    def __init__(self, ring: Ring, cos_lat: float):
+        self.ring = ring
+        self.xs = [position[0] * METERS_PER_DEGREE * cos_lat for position in ring]
+        self.ys = [position[1] * METERS_PER_DEGREE for position in ring]
+        self.kept: Set[int] = set(range(len(ring)))
+
+    def farthest(self, start: int, end: int) -> Tuple[int, float]:
+        """
+        Returns the index of the vertex between start and end farthest from the segment start-end and its distance.
+        """
+        xs, ys = self.xs, self.ys
+        x1, y1, dx, dy = xs[start], ys[start], xs[end] - xs[start], ys[end] - ys[start]
+        length = math.hypot(dx, dy)
+        farthest_index, farthest_distance = start + 1, -1.0
+        for i in range(start + 1, end):
+            if length > 0:
+                distance = abs(dy * (xs[i] - x1) - dx * (ys[i] - y1)) / length
+            else:
+                distance = math.hypot(xs[i] - x1, ys[i] - y1)
+            if distance > farthest_distance:
+                farthest_index, farthest_distance = i, distance
+        return farthest_index, farthest_distance
+
+    def simplify(self, tolerance_meters: float) -> None:
+        """
+        Keeps only the vertices required to stay within tolerance_meters of the ring (Douglas-Peucker).
+        """
+        last = len(self.ring) - 1
+        # A closed ring is split at the vertex farthest from its first (and last) vertex
+        split, _ = self.farthest(0, last)
+        self.kept = {0, split, last}
+        spans = [(0, split), (split, last)]
+        while spans:
+            start, end = spans.pop()
+            if end - start < 2:
+                continue
+            index, distance = self.farthest(start, end)
+            if distance > tolerance_meters:
+                self.kept.add(index)
+                spans += [(start, index), (index, end)]
+
+    def refine(self, start: int, end: int) -> None:
+        """
+        Additionally keeps the vertex between start and end farthest from the segment start-end.
+        """
+        self.kept.add(self.farthest(start, end)[0])
+
+    def kept_indices(self) -> List[int]:
+        return sorted(self.kept)
+
+
+def _cross(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _on_segment(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> bool:
+    return min(ax, bx) <= cx <= max(ax, bx) and min(ay, by) <= cy <= max(ay, by)
+
+
+def _intersect(
+    p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float], p4: Tuple[float, float]
+) -> bool:
+    """
+    Returns True, if the segments p1-p2 and p3-p4 intersect or touch.
+    """
+    d1 = _cross(*p3, *p4, *p1)
+    d2 = _cross(*p3, *p4, *p2)
+    d3 = _cross(*p1, *p2, *p3)
+    d4 = _cross(*p1, *p2, *p4)
+    if ((d1 > 0 > d2) or (d1 < 0 < d2)) and ((d3 > 0 > d4) or (d3 < 0 < d4)):
+        return True
+    return (
+        (d1 == 0 and _on_segment(*p3, *p4, *p1))
+        or (d2 == 0 and _on_segment(*p3, *p4, *p2))
+        or (d3 == 0 and _on_segment(*p1, *p2, *p3))
+        or (d4 == 0 and _on_segment(*p1, *p2, *p4))
+    )
+
+
+def _intersecting_segments(rings: List[_ProjectedRing]) -> Set[Segment]:
+    """
+    Returns the simplified segments (i.e. spanning dropped vertices) which intersect any other segment
+    of the kept vertices of all rings. Adjacent segments of a ring, which share a vertex, are not compared.
+    """
+    segments = []
+    for ring_index, ring in enumerate(rings):
+        indices = ring.kept_indices()
+        for start, end in zip(indices, indices[1:], strict=False):
+            x1, y1, x2, y2 = ring.xs[start], ring.ys[start], ring.xs[end], ring.ys[end]
+            segments.append((min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2), ring_index, start, end))
+    # sweep over the segments ordered by their min x, comparing only those whose bounding boxes overlap
+    segments.sort()
+    intersecting: Set[Segment] = set()
+    active: List[Tuple[float, float, float, float, int, int, int]] = []
+    for segment in segments:
+        min_x, _, min_y, max_y, ring_index, start, end = segment
+        active = [other for other in active if other[1] >= min_x]
+        ring = rings[ring_index]
+        last = len(ring.ring) - 1
+        for _, _, other_min_y, other_max_y, other_ring_index, other_start, other_end in active:
+            if other_max_y < min_y or other_min_y > max_y:
+                continue
+            if other_ring_index == ring_index and (
+                other_start == end
+                or other_end == start
+                # the first and the last segment of a ring share its first (and last) position
+                or {start, other_end} == {0, last}
+                or {other_start, end} == {0, last}
+            ):
+                continue
+            other_ring = rings[other_ring_index]
+            if end - start < 2 and other_end - other_start < 2:
+                # both segments are part of the original geometry, which can not be fixed by refining
+                continue
+            if _intersect(
+                (ring.xs[start], ring.ys[start]),
+                (ring.xs[end], ring.ys[end]),
+                (other_ring.xs[other_start], other_ring.ys[other_start]),
+                (other_ring.xs[other_end], other_ring.ys[other_end]),
+            ):
+                intersecting.add((ring_index, start, end))
+                intersecting.add((other_ring_index, other_start, other_end))
+        active.append(segment)
+    return {segment for segment in intersecting if segment[2] - segment[1] >= 2}
+
+
+def simplify_features(
+    features: Iterable[Dict[str, Any]], tolerance_meters: Optional[float], precision: int
+) -> List[Dict[str, Any]]:
+    """
+    Returns copies of the given GeoJSON features with (Multi)Polygon coordinates rounded to precision decimal places
+    and consecutive duplicate positions dropped. If tolerance_meters is given, rings are additionally simplified
+    via Douglas-Peucker, so that they deviate at most tolerance_meters from the original rings.
+
+    Simplification preserves topology: wherever a simplified segment would intersect or touch another one (of any ring
+    of any feature), the vertex of the original ring farthest from it is kept as well, until no such intersections
+    remain. Rings whose orientation would flip, and exteriors which would no longer contain their holes,
+    are not simplified, neither are empty polygons and rings with less than four positions.
+    Features of other geometry types are returned unchanged.
+    """
+    features = [dict(feature) for feature in features]
+    polygons_per_feature = [
+        [[_quantize_ring(ring, precision) for ring in polygon] for polygon in _polygons(feature.get('geometry'))]
+        for feature in features
+    ]
+
+    if tolerance_meters:
+        # Empty polygons, polygons with a degenerate exterior and degenerate holes (with less than four positions)
+        # are left as they are. Per remaining polygon, the indices of its rings to simplify (the exterior first).
+        simplified_polygons = [
+            (polygon, [index for index, ring in enumerate(polygon) if len(ring) >= 4])
+            for polygons in polygons_per_feature
+            for polygon in polygons
+            if polygon and len(polygon[0]) >= 4
+        ]
+        latitudes = [polygon[index][0][1] for polygon, indices in simplified_polygons for index in indices]
+        cos_lat = math.cos(math.radians(sum(latitudes) / len(latitudes))) if latitudes else 1.0
+        projected_polygons = [
+            [_ProjectedRing(polygon[index], cos_lat) for index in indices] for polygon, indices in simplified_polygons
+        ]
+        projected_rings = [ring for polygon in projected_polygons for ring in polygon]
+        for projected_ring in projected_rings:
+            if len(projected_ring.ring) > 4:
+                projected_ring.simplify(tolerance_meters)
+        while True:
+            for projected_polygon in projected_polygons:
+                _keep_orientation_and_holes(projected_polygon)
+            intersecting = _intersecting_segments(projected_rings)
+            if not intersecting:
+                break
+            for ring_index, start, end in intersecting:
+                projected_rings[ring_index].refine(start, end)
+
+        for (polygon, indices), projected_polygon in zip(simplified_polygons, projected_polygons, strict=True):
+            for index, ring in zip(indices, projected_polygon, strict=True):
+                polygon[index] = [ring.ring[i] for i in ring.kept_indices()]
+
+    for feature, polygons in zip(features, polygons_per_feature, strict=True):
+        geometry = feature.get('geometry')
+        if not polygons or not geometry:
+            continue
+        coordinates = polygons[0] if geometry['type'] == 'Polygon' else polygons
+        feature['geometry'] = {**geometry, 'coordinates': coordinates}
+    return features
+
+
+def _keep_orientation_and_holes(polygon: List[_ProjectedRing]) -> None:
+    """
+    Restores all vertices of rings whose orientation was flipped by simplification (including rings
+    collapsed to less than four positions or to zero area), and of the exterior,
+    if it no longer contains the first vertex of every hole.
+    """
+    for ring in polygon:
+        all_indices = list(range(len(ring.ring)))
+        original_area = _signed_area(ring.xs, ring.ys, all_indices)
+        kept_indices = ring.kept_indices()
+        simplified_area = _signed_area(ring.xs, ring.ys, kept_indices)
+        if len(kept_indices) < 4 or simplified_area == 0 or (simplified_area > 0) != (original_area > 0):
+            ring.kept = set(all_indices)
+    exterior, holes = polygon[0], polygon[1:]
+    exterior_indices = exterior.kept_indices()
+    if not all(_contains(exterior.xs, exterior.ys, exterior_indices, hole.xs[0], hole.ys[0]) for hole in holes):
+        exterior.kept = set(range(len(exterior.ring)))
@@ -0,0 +1,122 @@
+import codecs
+import json
+from typing import Any, Tuple
+
+# Maps digits and minus to 0 and e/E to e, so that candidates for floats in exponent notation
+# can be found via bytes.find, which is much faster than a regular expression search
+_EXPONENT_CANDIDATE_TRANSLATION = bytes.maketrans(b'0123456789-eE', b'00000000000ee')
+_NUMBER_CHARS = frozenset(b'0123456789.-')
+_VALUE_PRECEDING_CHARS = frozenset(b' \n:,[')
+
+
+def _escape_non_ascii(error: UnicodeError) -> Tuple[str, int]:
+    """
+    Codec error handler escaping non-ASCII characters like json's ensure_ascii does.
+    """
+    if not isinstance(error, UnicodeEncodeError):
+        raise error
+    escaped = []
+    for char in error.object[error.start : error.end]:
+        code_point = ord(char)
+        if code_point < 0x10000:
+            escaped.append(f'\\u{code_point:04x}')
+        else:
+            # characters outside the basic multilingual plane are escaped as surrogate pair
+            code_point -= 0x10000
+            escaped.append(f'\\u{0xD800 | (code_point >> 10):04x}\\u{0xDC00 | (code_point & 0x3FF):04x}')
+    return ''.join(escaped), error.end
+
+
+codecs.register_error('x2gbfs_json_escape', _escape_non_ascii)
+
+
+def _contains_diverging_float(serialized_content: bytes) -> bool:
+    """
+    Returns True, if orjson's output might contain a float formatted differently than by float.__repr__
+    (which the json module uses), i.e. numbers below 1e-4 (0.00001 vs. 1e-05) or exponents (1e16 vs. 1e+16).
+    Matches within strings may cause false positives, but never false negatives.
+    """
+    position = serialized_content.find(b'0.0000')
+    while position != -1:
+        start = position - 1 if position > 0 and serialized_content[position - 1] == ord('-') else position
+        if start > 0 and serialized_content[start - 1] in _VALUE_PRECEDING_CHARS:
+            return True
+        position = serialized_content.find(b'0.0000', position + 1)
+
+    translated_content = serialized_content.translate(_EXPONENT_CANDIDATE_TRANSLATION)
+    position = translated_content.find(b'0e0')
+    while position != -1:
+        # skip back to the start of the token, which, if it is a number, follows a structural character
+        start = position
+        while start > 0 and serialized_content[start - 1] in _NUMBER_CHARS:
+            start -= 1
+        if start > 0 and serialized_content[start - 1] in _VALUE_PRECEDING_CHARS:
+            return True
+        position = translated_content.find(b'0e0', position + 1)
+    return False
+
+
+class JsonSerializer:
+    """
+    Serializes gbfs files via the standard library's json module.
+
+    In canonical mode, content is indented by two spaces. In compact mode, it is written
+    without whitespace and with sorted keys. In both modes, non-ASCII characters are escaped.
+    """
+
+    name = 'json'
+
+    def dumps(self, content: Any, compact: bool = False) -> bytes:
+        if compact:
+            return json.dumps(content, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        return json.dumps(content, indent=2).encode('utf-8')
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Serializes gbfs files via orjson, which is considerably faster, as the json module
+    falls back to its pure python encoder when indenting.
+
+    The output is byte-for-byte the same as JsonSerializer's: non-ASCII characters are escaped
+    afterwards, and content orjson would format differently (floats in exponent notation or below 1e-4)
+    or does not support (e.g. integers exceeding 64 bit or non-string keys) is serialized via JsonSerializer.
+
+    Note: NaN and Infinity (which are not valid JSON) are written as null instead of NaN/Infinity.
+    """
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, content: Any, compact: bool = False) -> bytes:
+        option = self._orjson.OPT_SORT_KEYS if compact else self._orjson.OPT_INDENT_2
+        try:
+            serialized_content = self._orjson.dumps(content, option=option)
+        except self._orjson.JSONEncodeError:
+            return super().dumps(content, compact)
+
+        if _contains_diverging_float(serialized_content):
+            return super().dumps(content, compact)
+        # Non-ASCII characters (and DEL) can only occur within strings, so they can be escaped without parsing
+        if not serialized_content.isascii():
+            serialized_content = serialized_content.decode('utf-8').encode('ascii', 'x2gbfs_json_escape')
+        return serialized_content.replace(b'\x7f', b'\\u007f')
+
+
+SERIALIZERS = {'json': JsonSerializer, 'orjson': OrjsonSerializer}
+
+
+def get_serializer(name: str = 'auto') -> JsonSerializer:
+    """
+    Returns the serializer with the given name. `auto` returns the orjson based serializer,
+    if orjson is installed, the json based one otherwise.
+    """
+    if name != 'auto':
+        return SERIALIZERS[name]()
+    try:
+        return OrjsonSerializer()
+    except ImportError:
+        return JsonSerializer()
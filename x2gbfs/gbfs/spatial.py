@@ -0,0 +1,67 @@
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Mean earth radius (IUGG) and the resulting length of a degree of latitude
+EARTH_RADIUS_METERS = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180
+
+
+class StationGrid:
+    """
+    Uniform grid over the coordinates of stations, which finds the nearest station
+    within radius_meters of a position.
+
+    Cells are (at least) radius_meters wide, so only the 3x3 cells around a position need
+    to be searched, which takes O(1) on average per lookup, independent of the number of stations.
+    Distances are approximated via an equirectangular projection, which, for radii up to
+    a few kilometers, deviates from the great-circle distance by far less than a meter.
+    """
+
+    def __init__(self, stations: Iterable[Mapping[str, Any]], radius_meters: float):
+        if radius_meters <= 0:
+            raise ValueError(f'radius_meters must be positive, but is {radius_meters}')
+        located_stations = [
+            (station['station_id'], station['lat'], station['lon'])
+            for station in stations
+            if _is_number(station.get('lat')) and _is_number(station.get('lon'))
+        ]
+        self.radius_meters = radius_meters
+        self._cell_size_lat = radius_meters / METERS_PER_DEGREE
+        # A degree of longitude shrinks towards the poles. Sizing cells for the station farthest from the equator
+        # (plus one cell for positions just beyond) keeps them at least radius_meters wide everywhere else.
+        max_abs_lat = max((abs(lat) for _, lat, _ in located_stations), default=0.0) + self._cell_size_lat
+        self._cell_size_lon = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(max_abs_lat)), 1e-6))
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, str]]] = {}
+        for station_id, lat, lon in located_stations:
+            self._cells.setdefault(self._cell(lat, lon), []).append((lat, lon, station_id))
+
+    def __len__(self) -> int:
+        return sum(len(cell) for cell in self._cells.values())
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self._cell_size_lat), math.floor(lon / self._cell_size_lon)
+
+    def nearest(self, lat: float, lon: float) -> Optional[str]:
+        """
+        Returns the station_id of the station nearest to the given position, if it is closer than radius_meters,
+        None otherwise.
+        """
+        lat_index, lon_index = self._cell(lat, lon)
+        # distances are compared in squared degrees of latitude, longitudes are scaled accordingly
+        lon_scale = math.cos(math.radians(lat))
+        max_squared_distance = self._cell_size_lat * self._cell_size_lat
+        nearest_station_id = None
+        for cell_lat_index in (lat_index - 1, lat_index, lat_index + 1):
+            for cell_lon_index in (lon_index - 1, lon_index, lon_index + 1):
+                for station_lat, station_lon, station_id in self._cells.get((cell_lat_index, cell_lon_index), ()):
+                    delta_lat = station_lat - lat
+                    delta_lon = (station_lon - lon) * lon_scale
+                    squared_distance = delta_lat * delta_lat + delta_lon * delta_lon
+                    if squared_distance < max_squared_distance:
+                        max_squared_distance = squared_distance
+                        nearest_station_id = station_id
+        return nearest_station_id
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from x2gbfs.gbfs.serializer import JsonSerializer, get_serializer
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFileTracker:
+    """
+    Keeps a fingerprint of the content of rarely changing gbfs files (e.g. system_information.json),
+    so that they are only rewritten when their content changed. Their `last_updated` thus reflects the
+    last real change and their ETag stays the same, so caches can keep them.
+
+    last_updated is not part of the fingerprint. On the first update of a file, its fingerprint
+    is restored from the file written by a previous run (if any).
+    """
+
+    def __init__(self, serializer: Optional[JsonSerializer] = None):
+        self.serializer = serializer or get_serializer()
+        self._fingerprints: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, content: Dict[str, Any]) -> bytes:
+        # the compact serialization has sorted keys, so equal contents have equal fingerprints
+        content_without_timestamp = {key: value for key, value in content.items() if key != 'last_updated'}
+        return hashlib.blake2b(self.serializer.dumps(content_without_timestamp, True), digest_size=16).digest()
+
+    def _load_fingerprint(self, filename: str) -> Optional[bytes]:
+        try:
+            with open(filename, 'rb') as existing_file:
+                return self.fingerprint(json.load(existing_file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, AttributeError):
+            logger.warning(f'Could not read previous {filename}, it will be rewritten')
+            return None
+
+    def is_unchanged(self, filename: str, fingerprint: bytes) -> bool:
+        """
+        Returns True, if filename exists and was written with content of the given fingerprint.
+        """
+        if not os.path.exists(filename):
+            return False
+        with self._lock:
+            previous_fingerprint = self._fingerprints.get(filename)
+        if previous_fingerprint is None:
+            previous_fingerprint = self._load_fingerprint(filename)
+            if previous_fingerprint is not None:
+                self.record(filename, previous_fingerprint)
+        return previous_fingerprint == fingerprint
+
+    def record(self, filename: str, fingerprint: bytes) -> None:
+        """
+        Records that filename has been written with content of the given fingerprint.
+        """
+        with self._lock:
+            self._fingerprints[filename] = fingerprint
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import urldefrag
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_DIR = Path(__file__).parent / 'schemas'
+# Keys identifying an entity, used to report validation errors per entity
+ENTITY_ID_KEYS = ('vehicle_id', 'bike_id', 'station_id', 'vehicle_type_id', 'plan_id', 'alert_id')
+# Number of invalid entities logged per file, so a systematic error does not flood the log
+MAX_LOGGED_ENTITIES = 10
+
+# A compiled schema raises a fastjsonschema.JsonSchemaValueException for the first violation of the given value
+CompiledSchema = Callable[[Any], Any]
+
+
+class FeedValidationError(Exception):
+    """
+    Raised in blocking mode when a file of a gbfs feed does not conform to its schema.
+    """
+
+
+def _compile(schema: Dict[str, Any], schema_id: str) -> CompiledSchema:
+    import fastjsonschema
+
+    def resolve_vendored(uri: str) -> Dict[str, Any]:
+        # fastjsonschema resolves a schema's (https) $id remotely, the vendored schemas must not be fetched though
+        if urldefrag(uri).url != urldefrag(schema_id).url:
+            raise ValueError(f'Unexpected reference to {uri}, only vendored schemas are supported')
+        return schema
+
+    return fastjsonschema.compile(schema, handlers={'http': resolve_vendored, 'https': resolve_vendored})
+
+
+class SchemaValidator:
+    """
+    Validates gbfs files against the vendored official GBFS 2.3 and 3.0 schemas (see x2gbfs/gbfs/schemas)
+    via fastjsonschema (an optional dependency), which compiles them into python code once on construction.
+
+    fastjsonschema only reports a file's first violation. So the items schemas of a file's entity lists
+    (e.g. data.vehicles) are compiled as well, and the entities of an invalid file are validated one by one,
+    to report the first violation of every invalid entity.
+
+    Violations are logged per entity (e.g. vehicle). In blocking mode, a FeedValidationError is raised,
+    so that none of the files of an invalid feed is written. Files without a schema (e.g. delta files) are not validated.
+    """
+
+    def __init__(self, blocking: bool = False, schema_dir: Path = SCHEMA_DIR):
+        try:
+            import fastjsonschema
+        except ImportError as err:
+            raise ImportError('Schema validation requires fastjsonschema (pip install .[validation])') from err
+        self._violation_type = fastjsonschema.JsonSchemaValueException
+        self.blocking = blocking
+        self._validators: Dict[Tuple[str, str], CompiledSchema] = {}
+        # per file, the compiled items schema of each entity list below data, e.g. {'vehicles': ...}
+        self._entity_validators: Dict[Tuple[str, str], Dict[str, CompiledSchema]] = {}
+        for schema_path in sorted(schema_dir.glob('*/*.json')):
+            with open(schema_path, 'rb') as schema_file:
+                schema = json.load(schema_file)
+            key = (schema_path.parent.name.removeprefix('v'), schema_path.name)
+            schema_id = schema.get('$id', '')
+            self._validators[key] = _compile(schema, schema_id)
+            data_properties = schema.get('properties', {}).get('data', {}).get('properties', {})
+            self._entity_validators[key] = {
+                name: _compile(property_schema['items'], schema_id)
+                for name, property_schema in data_properties.items()
+                if isinstance(property_schema.get('items'), dict)
+            }
+
+    def _message(self, violation: Any) -> str:
+        """
+        Returns the violation's message with its path relative to the validated value,
+        e.g. 'lat: must be smaller than or equal to 90'.
+        """
+        # fastjsonschema names the validated value data
+        property_path = violation.name.removeprefix('data').lstrip('.')
+        message = violation.message.removeprefix(f'{violation.name} ')
+        return f'{property_path}: {message}' if property_path else message
+
+    def errors(self, version: str, filename: str, content: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Returns the violations of content, grouped by entity, e.g.
+        {"data.vehicles[3] (vehicle_id 'abc')": ["lat: must be smaller than or equal to 90"]}.
+        Violations outside of entities are grouped as 'file'.
+        """
+        key = (version, os.path.basename(filename))
+        validate = self._validators.get(key)
+        if validate is None:
+            return {}
+        file_violation: Any = None
+        try:
+            validate(content)
+            return {}
+        except self._violation_type as violation:
+            file_violation = violation
+
+        errors: Dict[str, List[str]] = {}
+        data: Any = content.get('data') if isinstance(content, dict) else None
+        valid_entities: Dict[str, List[Any]] = {}
+        for name, validate_entity in self._entity_validators[key].items():
+            entities = data.get(name) if isinstance(data, dict) else None
+            if not isinstance(entities, list):
+                continue
+            valid_entities[name] = []
+            for index, entity in enumerate(entities):
+                try:
+                    validate_entity(entity)
+                    valid_entities[name].append(entity)
+                except self._violation_type as violation:
+                    errors.setdefault(self._describe_entity(f'data.{name}[{index}]', entity), []).append(
+                        self._message(violation)
+                    )
+
+        if valid_entities:
+            # violations outside of entities are determined without the invalid ones
+            try:
+                validate({**content, 'data': {**data, **valid_entities}})
+                file_violation = None
+            except self._violation_type as violation:
+                file_violation = violation
+        if file_violation:
+            errors.setdefault('file', []).append(self._message(file_violation))
+        return errors
+
+    @staticmethod
+    def _describe_entity(description: str, entity: Any) -> str:
+        if isinstance(entity, dict):
+            for id_key in ENTITY_ID_KEYS:
+                if id_key in entity:
+                    return f'{description} ({id_key} {entity[id_key]!r})'
+        return description
+
+    def check_feed(self, version: str, files: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Validates all files (filename and content) of a feed and logs their violations per entity.
+        In blocking mode, raises a FeedValidationError afterwards, if any of them is invalid.
+        """
+        invalid_filenames = [filename for filename, content in files if self._check(version, filename, content)]
+        if invalid_filenames and self.blocking:
+            raise FeedValidationError(
+                f'Files not conforming to the GBFS {version} schemas: {", ".join(invalid_filenames)}'
+            )
+
+    def _check(self, version: str, filename: str, content: Dict[str, Any]) -> bool:
+        """
+        Logs all violations of content per entity and returns whether there are any.
+        """
+        errors = self.errors(version, filename, content)
+        for entity, messages in list(errors.items())[:MAX_LOGGED_ENTITIES]:
+            logger.warning(f'{filename} is invalid: {entity}: {"; ".join(messages)}')
+        if len(errors) > MAX_LOGGED_ENTITIES:
+            logger.warning(f'{filename} is invalid: {len(errors) - MAX_LOGGED_ENTITIES} more entities are invalid')
+        return bool(errors)
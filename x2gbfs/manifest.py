@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from x2gbfs.gbfs.gbfs_writer import isoformat_timestamp
+from x2gbfs.gbfs.serializer import JsonSerializer, get_serializer
+
+if TYPE_CHECKING:
+    from x2gbfs.server import FeedStore
+
+logger = logging.getLogger(__name__)
+
+GBFS_VERSIONS = {2: '2.3', 3: '3.0'}
+SYSTEMS_CSV_COLUMNS = ['System ID', 'Name', 'URL', 'Auto-Discovery URL', 'Supported Versions']
+
+
+def _text(value: Any) -> str:
+    """
+    Returns the text of a (v2) string or the first translation of a (v3) localized string.
+    """
+    if isinstance(value, list):
+        return value[0].get('text', '') if value and isinstance(value[0], dict) else ''
+    return value or ''
+
+
+class Dataset:
+    """
+    A system listed in the manifest, together with the auto-discovery url of every generated GBFS version.
+    """
+
+    def __init__(self, system_id: str, name: str, url: str, versions: List[Tuple[str, str]]):
+        self.system_id = system_id
+        self.name = name
+        self.url = url
+        # (version, url of gbfs.json), ordered by version
+        self.versions = versions
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Dataset) and vars(self) == vars(other)
+
+
+class ManifestWriter:
+    """
+    Maintains a GBFS v3 manifest.json (and, optionally, a systems.csv) listing all feeds
+    generated into `output_dir`.
+
+    Datasets are updated one at a time after their feed was generated, without rescanning the
+    output directory. Files are only rewritten if a dataset changed, and replaced atomically,
+    so consumers never read a partially written file. On startup, the datasets of a previous run are
+    restored from the existing files.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        systems_csv: bool = False,
+        serializer: Optional[JsonSerializer] = None,
+        feed_store: Optional['FeedStore'] = None,
+    ):
+        self.manifest_path = os.path.join(output_dir, 'manifest.json')
+        self.systems_csv_path = os.path.join(output_dir, 'systems.csv') if systems_csv else None
+        self.serializer = serializer or get_serializer()
+        # If given, the manifest is additionally published to this store for serving from memory
+        self.feed_store = feed_store
+        self._datasets: Dict[str, Dataset] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Restores datasets from the manifest.json and systems.csv written by a previous run.
+        """
+        names: Dict[str, Tuple[str, str]] = {}
+        if self.systems_csv_path and os.path.exists(self.systems_csv_path):
+            try:
+                with open(self.systems_csv_path, newline='', encoding='utf-8') as systems_csv:
+                    for row in csv.DictReader(systems_csv):
+                        names[row['System ID']] = (row['Name'], row['URL'])
+            except (OSError, ValueError, KeyError):
+                logger.warning(f'Could not read previous {self.systems_csv_path}, it will be rewritten')
+
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'rb') as manifest:
+                for dataset in json.load(manifest)['data']['datasets']:
+                    system_id = dataset['system_id']
+                    name, url = names.get(system_id, ('', ''))
+                    versions = [(version['version'], version['url']) for version in dataset['versions']]
+                    self._datasets[system_id] = Dataset(system_id, name, url, versions)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning(f'Could not read previous {self.manifest_path}, it will be rewritten')
+
+    def update(self, system_information: Dict[str, Any], feed_urls: Dict[int, str]) -> None:
+        """
+        Updates the dataset of the given system, which has been generated in the given versions
+        (e.g. {3: 'https://example.com/deer/gbfs.json'}) and rewrites the files, if it changed.
+        """
+        system_id = system_information['system_id']
+        versions = [(GBFS_VERSIONS[version], url) for version, url in sorted(feed_urls.items())]
+        dataset = Dataset(system_id, _text(system_information.get('name')), system_information.get('url', ''), versions)
+        with self._lock:
+            if self._datasets.get(system_id) == dataset:
+                return
+            self._datasets[system_id] = dataset
+            datasets = sorted(self._datasets.values(), key=lambda dataset: dataset.system_id)
+            # written while holding the lock, so concurrent updates can not overwrite each other's changes
+            self._write_manifest(datasets)
+            if self.systems_csv_path:
+                self._write_systems_csv(self.systems_csv_path, datasets)
+
+    def _write_manifest(self, datasets: List[Dataset]) -> None:
+        content = {
+            'last_updated': isoformat_timestamp(int(time.time())),
+            'ttl': 0,
+            'version': '3.0',
+            'data': {
+                'datasets': [
+                    {
+                        'system_id': dataset.system_id,
+                        'versions': [{'version': version, 'url': url} for version, url in dataset.versions],
+                    }
+                    for dataset in datasets
+                ]
+            },
+        }
+        body = self.serializer.dumps(content)
+        _replace_atomically(self.manifest_path, body)
+        if self.feed_store:
+            self.feed_store.publish(self.manifest_path, body, 0)
+
+    def _write_systems_csv(self, path: str, datasets: List[Dataset]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(SYSTEMS_CSV_COLUMNS)
+        for dataset in datasets:
+            auto_discovery_url = dataset.versions[-1][1] if dataset.versions else ''
+            supported_versions = ';'.join(version for version, _ in dataset.versions)
+            writer.writerow([dataset.system_id, dataset.name, dataset.url, auto_discovery_url, supported_versions])
+        _replace_atomically(path, buffer.getvalue().encode('utf-8'))
+
+
+def _replace_atomically(path: str, body: bytes) -> None:
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as temp_file:
+        temp_file.write(body)
+    os.replace(temp_path, path)
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, ContextManager, Dict, Generator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from x2gbfs.circuit_breaker import CircuitBreaker
+
+
+class CycleMetrics:
+    """
+    Collects the time spent per stage and the entity counts of a single feed generation cycle.
+
+    Stages are
+    * fetch: retrieving data from the upstream API
+    * transform: deducing availabilities, rounding coordinates etc. in GbfsTransformer
+    * convert: converting the feed to GBFS v3 (if generated as v3)
+    * serialize: encoding gbfs files as JSON
+    * write: writing gbfs files to disk
+    * compress: writing precompressed variants of gbfs files (if enabled)
+    * delta: comparing status files to their previous update (if delta files are enabled)
+    * archive: storing written files in the snapshot archive (if enabled)
+    * validate: validating files against their GBFS schema (if enabled)
+    """
+
+    STAGES = ('fetch', 'transform', 'convert', 'serialize', 'write', 'compress', 'delta', 'archive', 'validate')
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = dict.fromkeys(self.STAGES, 0.0)
+        # stages may be timed concurrently when files are written in parallel
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        # True, if the cycle was abandoned as it exceeded the feed's max_runtime_seconds
+        self.deadline_exceeded = False
+
+    @contextmanager
+    def timed(self, stage: str) -> Generator[None, None, None]:
+        """
+        Adds the time spent in this context to the given stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.durations[stage] = self.durations.get(stage, 0.0) + duration
+
+    def count(self, kind: str, entities: Optional[List]) -> None:
+        self.counts[kind] = len(entities) if entities else 0
+
+    def set_count(self, kind: str, count: int) -> None:
+        self.counts[kind] = count
+
+
+def timed(metrics: Optional[CycleMetrics], stage: str) -> ContextManager:
+    """
+    Returns a context manager timing the given stage, if metrics are collected, a no-op otherwise.
+    """
+    return metrics.timed(stage) if metrics else nullcontext()
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class MetricsExporter:
+    """
+    Keeps the metrics of the latest cycle of every feed and writes them in Prometheus
+    text exposition format to a file, which can be picked up by node-exporter's textfile collector.
+
+    The file is replaced atomically, so the collector never reads a partially written file.
+    If a circuit breaker is given, its per feed state is exported as well.
+    """
+
+    def __init__(self, path: str, circuit_breaker: Optional['CircuitBreaker'] = None) -> None:
+        self.path = path
+        self.circuit_breaker = circuit_breaker
+        self._lock = threading.Lock()
+        self._latest: Dict[str, CycleMetrics] = {}
+        self._last_success: Dict[str, float] = {}
+        self._cycles: Dict[Tuple[str, str], int] = {}
+        self._deadlines_exceeded: Dict[str, int] = {}
+
+    def record(self, feed: str, metrics: CycleMetrics, success: bool) -> None:
+        """
+        Records the metrics of the given feed's cycle and rewrites the metrics file.
+        """
+        with self._lock:
+            result = 'success' if success else 'failure'
+            self._cycles[(feed, result)] = self._cycles.get((feed, result), 0) + 1
+            if metrics.deadline_exceeded:
+                self._deadlines_exceeded[feed] = self._deadlines_exceeded.get(feed, 0) + 1
+            if success:
+                self._latest[feed] = metrics
+                self._last_success[feed] = time.time()
+            self._write()
+
+    def record_skipped(self, feed: str) -> None:
+        """
+        Records that the given feed's update was skipped, as its circuit is open.
+        """
+        with self._lock:
+            self._cycles[(feed, 'skipped')] = self._cycles.get((feed, 'skipped'), 0) + 1
+            self._write()
+
+    def render(self) -> str:
+        lines = [
+            '# HELP x2gbfs_stage_duration_seconds Time spent per stage in the latest successful cycle of a feed.',
+            '# TYPE x2gbfs_stage_duration_seconds gauge',
+        ]
+        for feed, metrics in sorted(self._latest.items()):
+            for stage, duration in metrics.durations.items():
+                lines.append(
+                    f'x2gbfs_stage_duration_seconds{{feed="{_escape_label_value(feed)}",stage="{stage}"}} {duration:.6f}'
+                )
+        lines += [
+            '# HELP x2gbfs_entities Number of entities (or geofencing vertices) in the latest successful cycle of a feed.',
+            '# TYPE x2gbfs_entities gauge',
+        ]
+        for feed, metrics in sorted(self._latest.items()):
+            for kind, count in sorted(metrics.counts.items()):
+                lines.append(f'x2gbfs_entities{{feed="{_escape_label_value(feed)}",kind="{kind}"}} {count}')
+        lines += [
+            '# HELP x2gbfs_last_success_timestamp_seconds Unix time of the latest successful cycle of a feed.',
+            '# TYPE x2gbfs_last_success_timestamp_seconds gauge',
+        ]
+        for feed, timestamp in sorted(self._last_success.items()):
+            lines.append(f'x2gbfs_last_success_timestamp_seconds{{feed="{_escape_label_value(feed)}"}} {timestamp:.3f}')
+        lines += [
+            '# HELP x2gbfs_cycles_total Number of feed generation cycles by result.',
+            '# TYPE x2gbfs_cycles_total counter',
+        ]
+        for (feed, result), count in sorted(self._cycles.items()):
+            lines.append(f'x2gbfs_cycles_total{{feed="{_escape_label_value(feed)}",result="{result}"}} {count}')
+        lines += [
+            '# HELP x2gbfs_deadline_exceeded_total Number of cycles abandoned as they exceeded max_runtime_seconds.',
+            '# TYPE x2gbfs_deadline_exceeded_total counter',
+        ]
+        for feed, count in sorted(self._deadlines_exceeded.items()):
+            lines.append(f'x2gbfs_deadline_exceeded_total{{feed="{_escape_label_value(feed)}"}} {count}')
+        if self.circuit_breaker:
+            lines += self._render_circuit_states(self.circuit_breaker)
+        return '\n'.join(lines) + '\n'
+
+    def _render_circuit_states(self, circuit_breaker: 'CircuitBreaker') -> List[str]:
+        state_lines = [
+            '# HELP x2gbfs_circuit_state Circuit breaker state of a feed (1 for the current state, 0 otherwise).',
+            '# TYPE x2gbfs_circuit_state gauge',
+        ]
+        failure_lines = [
+            '# HELP x2gbfs_consecutive_failures Number of consecutive failed updates of a feed.',
+            '# TYPE x2gbfs_consecutive_failures gauge',
+        ]
+        for feed in sorted({feed for feed, _ in self._cycles}):
+            current_state, consecutive_failures = circuit_breaker.state(feed)
+            label = _escape_label_value(feed)
+            for state in ('closed', 'open', 'half_open'):
+                state_lines.append(
+                    f'x2gbfs_circuit_state{{feed="{label}",state="{state}"}} {int(state == current_state)}'
+                )
+            failure_lines.append(f'x2gbfs_consecutive_failures{{feed="{label}"}} {consecutive_failures}')
+        return state_lines + failure_lines
+
+    def _write(self) -> None:
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temp_path, self.path)
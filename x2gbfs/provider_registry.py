@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict
+
+from x2gbfs.gbfs import BaseProvider, GbfsTransformer
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderInstance:
+    """
+    A feed's config together with the extractor and transformer built for it.
+    """
+
+    def __init__(
+        self, feed_config: Dict[str, Any], extractor: BaseProvider, transformer: GbfsTransformer, config_mtime: int
+    ):
+        self.feed_config = feed_config
+        self.extractor = extractor
+        self.transformer = transformer
+        self.config_mtime = config_mtime
+
+
+class ProviderRegistry:
+    """
+    Builds the extractor (and transformer) of every feed once and keeps them across
+    feed generation cycles, so per instance state like login tokens or caches survives
+    and setup costs are only paid once.
+
+    An instance is rebuilt when its feed config file was modified. Otherwise, the
+    extractor's `reset` hook is called before it is handed out again, so state which must
+    not survive a cycle can be cleared.
+    """
+
+    def __init__(
+        self,
+        build_extractor: Callable[[str, Dict[str, Any]], BaseProvider],
+        config_dir: str = 'config',
+        build_transformer: Callable[[], GbfsTransformer] = GbfsTransformer,
+    ) -> None:
+        self.build_extractor = build_extractor
+        self.config_dir = config_dir
+        self.build_transformer = build_transformer
+        self._instances: Dict[str, ProviderInstance] = {}
+        self._lock = threading.Lock()
+
+    def config_path(self, provider: str) -> str:
+        return f'{self.config_dir}/{provider}.json'
+
+    def get(self, provider: str) -> ProviderInstance:
+        """
+        Returns the (possibly reused) instance for provider.
+
+        Note: callers must ensure an instance is not used by multiple threads at the same time,
+        i.e. a provider's feed is not generated concurrently.
+        """
+        config_path = self.config_path(provider)
+        config_mtime = os.stat(config_path).st_mtime_ns
+
+        with self._lock:
+            instance = self._instances.get(provider)
+
+        if instance is not None and instance.config_mtime == config_mtime:
+            instance.extractor.reset()
+            return instance
+
+        if instance is not None:
+            logger.info(f'Config {config_path} changed, rebuilding provider {provider}')
+
+        with open(config_path) as config_file:
+            feed_config = json.load(config_file)
+        instance = ProviderInstance(
+            feed_config, self.build_extractor(provider, feed_config), self.build_transformer(), config_mtime
+        )
+
+        with self._lock:
+            self._instances[provider] = instance
+        return instance
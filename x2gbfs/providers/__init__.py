@@ -1,13 +1,121 @@
-from .cambio import CambioProvider
-from .cantamen import CantamenIXSIProvider
-from .deer import Deer
-from .example import ExampleProvider
-from .fleetster import FleetsterAPI
-from .free2move import Free2moveAPI, Free2moveProvider
-from .gbfslight import GbfsLightProvider
-from .lastenvelo_fr import LastenVeloFreiburgProvider
-from .mikar import MikarProvider
-from .moqo import MoqoProvider
-from .moqo_einfach_unterwegs import EinfachUnterwegsProvider
-from .moqo_laratogo import LaraToGoProvider
-from .opendatahub import OpenDataHubProvider
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Type
+
+if TYPE_CHECKING:
+    from x2gbfs.gbfs.base_provider import BaseProvider
+
+    from .cambio import CambioProvider
+    from .cantamen import CantamenIXSIProvider
+    from .deer import Deer
+    from .example import ExampleProvider
+    from .fleetster import FleetsterAPI
+    from .free2move import Free2moveAPI, Free2moveProvider
+    from .gbfslight import GbfsLightProvider
+    from .lastenvelo_fr import LastenVeloFreiburgProvider
+    from .mikar import MikarProvider
+    from .moqo import MoqoProvider
+    from .moqo_einfach_unterwegs import EinfachUnterwegsProvider
+    from .moqo_laratogo import LaraToGoProvider
+    from .opendatahub import OpenDataHubProvider
+
+# Provider modules (and their dependencies like websockets or xmltodict) are only imported
+# when one of their classes is accessed, so generating a single feed does not pay for all of them.
+_LAZY_ATTRIBUTES = {
+    'CambioProvider': '.cambio',
+    'CantamenIXSIProvider': '.cantamen',
+    'Deer': '.deer',
+    'ExampleProvider': '.example',
+    'FleetsterAPI': '.fleetster',
+    'Free2moveAPI': '.free2move',
+    'Free2moveProvider': '.free2move',
+    'GbfsLightProvider': '.gbfslight',
+    'LastenVeloFreiburgProvider': '.lastenvelo_fr',
+    'MikarProvider': '.mikar',
+    'MoqoProvider': '.moqo',
+    'EinfachUnterwegsProvider': '.moqo_einfach_unterwegs',
+    'LaraToGoProvider': '.moqo_laratogo',
+    'OpenDataHubProvider': '.opendatahub',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class ProviderSpec:
+    """
+    Declares which provider class generates which feeds. A feed is matched either
+    by its config's `x2gbfs.provider` key (which must equal `name`), by its provider id
+    or by one of the provider id prefixes.
+
+    The provider class is given as `module:ClassName` and only imported when a matching feed is built.
+    """
+
+    def __init__(self, name: str, class_path: str, ids: Sequence[str] = (), prefixes: Sequence[str] = ()):
+        self.name = name
+        self.class_path = class_path
+        self.ids = ids
+        self.prefixes = prefixes
+
+    def load_class(self) -> Type['BaseProvider']:
+        module_name, class_name = self.class_path.split(':')
+        return getattr(import_module(module_name), class_name)
+
+
+PROVIDERS = [
+    ProviderSpec('example', 'x2gbfs.providers.example:ExampleProvider', ids=['example']),
+    ProviderSpec('lastenvelo_fr', 'x2gbfs.providers.lastenvelo_fr:LastenVeloFreiburgProvider', ids=['lastenvelo_fr']),
+    ProviderSpec('deer', 'x2gbfs.providers.deer:Deer', ids=['deer']),
+    ProviderSpec('mikar', 'x2gbfs.providers.mikar:MikarProvider', ids=['mikar']),
+    ProviderSpec('cambio', 'x2gbfs.providers.cambio:CambioProvider', prefixes=['cambio_']),
+    ProviderSpec(
+        'cantamen',
+        'x2gbfs.providers.cantamen:CantamenIXSIProvider',
+        ids=['naturenergie_sharing', 'oekostadt_renningen', 'gruene-flotte_freiburg', 'swu2go', 'conficars_ulm'],
+        prefixes=['stadtmobil_', 'teilauto_'],
+    ),
+    ProviderSpec(
+        'moqo',
+        'x2gbfs.providers.moqo:MoqoProvider',
+        ids=[
+            'stadtwerk_tauberfranken',
+            'flinkster_carsharing',
+            'oberschwabenmobil',
+            'ford_carsharing_autohausbaur',
+            'ford_carsharing_autohauskauderer',
+            'stadtwerke_wertheim',
+            'hertlein_carsharing',
+        ],
+    ),
+    ProviderSpec('lara_to_go', 'x2gbfs.providers.moqo_laratogo:LaraToGoProvider', ids=['lara_to_go']),
+    # MOQO with cargo_bicycle postprocessing
+    ProviderSpec(
+        'einfach_unterwegs',
+        'x2gbfs.providers.moqo_einfach_unterwegs:EinfachUnterwegsProvider',
+        ids=['einfach_unterwegs', 'seefahrer_ecarsharing'],
+    ),
+    ProviderSpec('opendatahub', 'x2gbfs.providers.opendatahub:OpenDataHubProvider', ids=['alpsgo']),
+    ProviderSpec('free2move', 'x2gbfs.providers.free2move:Free2moveProvider', prefixes=['free2move_']),
+    ProviderSpec('gbfs-light', 'x2gbfs.providers.gbfslight:GbfsLightProvider'),
+]
+
+
+def find_provider_spec(provider: str, feed_config: Dict[str, Any]) -> Optional[ProviderSpec]:
+    """
+    Returns the ProviderSpec responsible for the given provider id and feed config, or None.
+    An explicitly configured `x2gbfs.provider` takes precedence over the provider id.
+    """
+    configured_name = feed_config.get('x2gbfs', {}).get('provider')
+    if configured_name:
+        for spec in PROVIDERS:
+            if spec.name == configured_name:
+                return spec
+    for spec in PROVIDERS:
+        if provider in spec.ids:
+            return spec
+    for spec in PROVIDERS:
+        if any(provider.startswith(prefix) for prefix in spec.prefixes):
+            return spec
+    return None
@@ -3,6 +3,8 @@ from datetime import datetime, timezone
 
 from websockets.sync.client import connect
 
+from x2gbfs.deadline import remaining_timeout
+
 
 class IxsiAPI:
     def __init__(self, system_id: str, uri: str, timeout=5, max_size=2**24):
@@ -19,9 +21,9 @@ class IxsiAPI:
         self.max_size = max_size
 
     def _request(self, message):
-        with connect(self.uri, max_size=self.max_size) as websocket:
+        with connect(self.uri, max_size=self.max_size, open_timeout=remaining_timeout(self.timeout)) as websocket:
             websocket.send(message)
-            return websocket.recv(timeout=self.timeout)
+            return websocket.recv(timeout=remaining_timeout(self.timeout))
 
     def result_for_provider(self, provider_id: int):
         timestamp = datetime.fromtimestamp(datetime.now().timestamp(), tz=timezone.utc).isoformat()
@@ -1,6 +1,7 @@
 import json
 import logging
-from typing import Any
+from typing import Any, Optional
+from urllib.parse import urlparse
 
 from x2gbfs.gbfs.base_provider import BaseProvider
 from x2gbfs.util import get, unidecode_with_german_umlauts
@@ -25,6 +26,9 @@ class CambioProvider(BaseProvider):
         self.partner = provider_info.get('partner')
         self.config = feed_config
 
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.STATIONS_URL).hostname
+
     def _all_stations(self) -> list[dict[str, Any]]:
         response = get(self.STATIONS_URL.format(city_id=self.city_id))
         response.raise_for_status()
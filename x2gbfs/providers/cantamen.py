@@ -2,6 +2,7 @@ import logging
 import re
 from datetime import datetime, timezone
 from typing import Any, Dict, Generator, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import xmltodict
 from decouple import config
@@ -96,6 +97,12 @@ class CantamenIXSIProvider(BaseProvider):
         self.config = feed_config
         self.pricing_plan_ids = [plan['plan_id'] for plan in feed_config['feed_data']['pricing_plans']]
 
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.api_url).hostname
+
+    def reset(self) -> None:
+        self.cached_response = None
+
     def _load_response(self) -> Dict[str, Any]:
         if not self.cached_response:
             provider_id = self.config['provider_id']
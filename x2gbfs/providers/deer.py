@@ -1,7 +1,9 @@
 import logging
 from typing import Any, Dict, Generator, Optional, Tuple
 
-from x2gbfs.providers.fleetster import FleetsterProvider
+from decouple import config
+
+from x2gbfs.providers.fleetster import FleetsterAPI, FleetsterProvider
 
 logger = logging.getLogger('x2gbfs.deer')
 
@@ -25,3 +27,11 @@ class Deer(FleetsterProvider):
 
     def __init__(self, feed_config: dict[str, Any], api):
         super().__init__(feed_config, api)
+
+    @classmethod
+    def from_config(cls, feed_config: dict[str, Any]) -> 'Deer':
+        api_url = config('DEER_API_URL')
+        api_user = config('DEER_USER')
+        api_password = config('DEER_PASSWORD')
+
+        return cls(feed_config, FleetsterAPI(api_url, api_user, api_password))
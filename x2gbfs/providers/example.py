@@ -17,7 +17,7 @@ class ExampleProvider(BaseProvider):
     System information and pricing information is read from config/example.json.
 
     Note: to be able to run this via x2gbfs, this ExampleProvider needs to
-    is added to x2gbfs.py's build_extractor method.
+    be registered in x2gbfs.providers.PROVIDERS.
 
     """
 
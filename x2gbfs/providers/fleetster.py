@@ -5,9 +5,11 @@ from datetime import datetime, timezone
 from random import random
 from time import sleep
 from typing import Any, Dict, Generator, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
 
+from x2gbfs.deadline import remaining_timeout
 from x2gbfs.gbfs.base_provider import BaseProvider
 
 logger = logging.getLogger(__name__)
@@ -61,7 +63,7 @@ class FleetsterAPI:
         if self.token is None:
             endpoint = f'{self.api_url}/users/auth'
             body = {'email': self.user, 'password': self.password}
-            response = requests.post(endpoint, json=body, timeout=10)
+            response = requests.post(endpoint, json=body, timeout=remaining_timeout(10))
             response.raise_for_status()
 
             self.token = response.json()['_id']
@@ -81,7 +83,7 @@ class FleetsterAPI:
         while not no_of_login_attempts >= self.MAX_LOGIN_ATTEMPTS:
             no_of_login_attempts += 1
             token = self._login()
-            response = requests.get(url, headers={'Authorization': token}, timeout=10)
+            response = requests.get(url, headers={'Authorization': token}, timeout=remaining_timeout(10))
             if response.status_code == 401:
                 # Authentication issues will cause a retry attempt.
                 # An authentication issue could be caused by a competing client requesting
@@ -95,7 +97,7 @@ class FleetsterAPI:
                 logger.warning(
                     f'Requested token {self.token} was invalid, waiting for {seconds_to_sleep} seconds before retry'
                 )
-                sleep(seconds_to_sleep)
+                sleep(remaining_timeout(seconds_to_sleep))
 
                 # Reset authentication token, so it will be requested again
                 self.token = None
@@ -165,6 +167,15 @@ class FleetsterProvider(BaseProvider):
         self.stationIdCache: set[str] = set()
         self.system_id = feed_config['feed_data']['system_information']['system_id']
 
+    def upstream_host(self) -> Optional[str]:
+        api_url = getattr(self.api, 'api_url', None)
+        return urlparse(api_url).hostname if api_url else None
+
+    def reset(self) -> None:
+        # Stations might have been deleted meanwhile, so we refill the cache from scratch.
+        # Note: the api's authentication token is kept.
+        self.stationIdCache.clear()
+
     def all_stations(self) -> Generator[Dict, None, None]:
         """
         Returns all stations, which are
@@ -7,6 +7,7 @@ import time
 from pathlib import Path
 from typing import Any, Generator, Optional, Tuple
 from urllib.error import HTTPError
+from urllib.parse import urlparse
 
 from decouple import config
 
@@ -175,8 +176,8 @@ class Free2moveProvider(BaseProvider):
 
     System information and pricing information are read from config/free2move_*.json's.
 
-    Note: to be able to run this via x2gbfs, this Free2move class needs to be added
-    to x2gbfs.py's build_extractor method.
+    Note: to be able to run this via x2gbfs, this Free2move class needs to be registered
+    in x2gbfs.providers.PROVIDERS.
 
     Note: The originating API currently publishes persistant vehicle IDs / liccense plate
       information, which is generated into the GBFS' free_bike_status as bike_id and used
@@ -288,6 +289,13 @@ class Free2moveProvider(BaseProvider):
         self.location_id = feed_config['provider_data']['location_id']
         self.api = api
 
+    @classmethod
+    def from_config(cls, feed_config: dict[str, Any]) -> 'Free2moveProvider':
+        return cls(feed_config, Free2moveAPI())
+
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.api.base_url).hostname
+
     def load_vehicles(self, default_last_reported: int) -> Tuple[Optional[dict], Optional[dict]]:
         """
         Retrieves vehicles and vehicle types from provider's API and converts them
@@ -1,6 +1,7 @@
 import json
 import logging
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
+from urllib.parse import urlparse
 
 from x2gbfs.gbfs.base_provider import BaseProvider
 from x2gbfs.util import get
@@ -27,6 +28,12 @@ class GbfsLightProvider(BaseProvider):
         self.url = feed_config['provider_data']['url']
         self.system_id = feed_config['provider_data']['system_id']
 
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.url).hostname
+
+    def reset(self) -> None:
+        self.gbfslight_data = None
+
     def _load_system(self) -> dict[str, Any]:
         if self.gbfslight_data is None:
             self.gbfslight_data = get(self.url).json()
@@ -1,9 +1,11 @@
 import csv
 from datetime import datetime, timezone
 from typing import Any, Dict, Generator, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
 
+from x2gbfs.deadline import remaining_timeout
 from x2gbfs.gbfs.base_provider import BaseProvider
 from x2gbfs.util import timestamp_to_isoformat
 
@@ -39,9 +41,17 @@ class LastenVeloFreiburgProvider(BaseProvider):
     def __init__(self, feed_config: dict[str, Any]):
         self.config = feed_config
 
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.LASTENVELO_API_URL).hostname
+
+    def reset(self) -> None:
+        self.lastenvelo_csv = ''
+
     def _load_lastenvelo_csv(self) -> None:
         response = requests.get(
-            self.LASTENVELO_API_URL, headers={'User-Agent': 'x2gbfs +https://github.com/mobidata-bw/'}, timeout=5
+            self.LASTENVELO_API_URL,
+            headers={'User-Agent': 'x2gbfs +https://github.com/mobidata-bw/'},
+            timeout=remaining_timeout(5),
         )
         response.raise_for_status()
 
@@ -1,7 +1,9 @@
 import logging
 from typing import Any, Dict, Generator, Optional, Tuple
 
-from x2gbfs.providers.fleetster import FleetsterProvider
+from decouple import config
+
+from x2gbfs.providers.fleetster import FleetsterAPI, FleetsterProvider
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,14 @@ class MikarProvider(FleetsterProvider):
     def __init__(self, feed_config: dict[str, Any], api):
         super().__init__(feed_config, api)
 
+    @classmethod
+    def from_config(cls, feed_config: dict[str, Any]) -> 'MikarProvider':
+        api_url = config('MIKAR_API_URL')
+        api_user = config('MIKAR_USER')
+        api_password = config('MIKAR_PASSWORD')
+
+        return cls(feed_config, FleetsterAPI(api_url, api_user, api_password))
+
     def _default_pricing_plan_id(self, vehicle: Dict) -> str:
         """
         Maps mikar's vehicle categories to pricing plans (provided via config).
@@ -2,6 +2,7 @@ import logging
 import re
 from datetime import datetime
 from typing import Any, Dict, Generator, Optional, Tuple
+from urllib.parse import urlparse
 
 from decouple import config
 
@@ -55,6 +56,9 @@ class MoqoProvider(BaseProvider):
         self.team_id = feed_config['provider_data']['team_id']
         self.api_url = f'http://portal.moqo.de/d/{self.team_id}/api/graph/'
 
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.api_url).hostname
+
     def load_stations(self, default_last_reported: int) -> Tuple[Optional[Dict], Optional[Dict]]:
         """
         Retrieves stations from the providers API and converts them
@@ -109,6 +113,8 @@ class MoqoProvider(BaseProvider):
         headers = {'Authorization': f'Bearer {self.api_token}', 'accept': 'application/json'}
         page = 1
         while True:
+            # The number of pages is not limited explicitly, but get raises DeadlineExceeded
+            # once the run's time budget (x2gbfs.max_runtime_seconds) is exhausted
             request_params = dict(params) if params is not None else {}
             request_params['page[number]'] = str(page)
             json_response = get(url, params=request_params, headers=headers).json()
@@ -1,9 +1,11 @@
 import logging
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
 
+from x2gbfs.deadline import remaining_timeout
 from x2gbfs.gbfs.base_provider import BaseProvider
 
 logger = logging.getLogger(__name__)
@@ -28,19 +30,35 @@ class OpenDataHubProvider(BaseProvider):
     STATION_URL = 'https://mobility.api.opendatahub.com/v2/flat,node/CarsharingStation?where=sorigin.eq.%22AlpsGo%22,sactive.eq.true'
     CAR_URL = 'https://mobility.api.opendatahub.com/v2/tree,node/CarsharingCar/current-station,availability/latest?where=sorigin.eq.%22AlpsGo%22,sactive.eq.true'
 
+    raw_cars: Optional[Dict[str, Any]] = None
+    raw_stations: Optional[List[Dict[str, Any]]] = None
+
     def __init__(self, feed_config: dict[str, Any]):
         self.config = feed_config
 
-        response = requests.get(self.CAR_URL, headers=HEADERS, timeout=20)
-        self.raw_cars = response.json()['data']['CarsharingCar']['stations']
+    def upstream_host(self) -> Optional[str]:
+        return urlparse(self.STATION_URL).hostname
+
+    def reset(self) -> None:
+        self.raw_cars = None
+        self.raw_stations = None
+
+    def _load_raw_cars(self) -> Dict[str, Any]:
+        if self.raw_cars is None:
+            response = requests.get(self.CAR_URL, headers=HEADERS, timeout=remaining_timeout(20))
+            self.raw_cars = response.json()['data']['CarsharingCar']['stations']
+        return self.raw_cars
 
-        response = requests.get(self.STATION_URL, headers=HEADERS, timeout=20)
-        self.raw_stations = response.json()['data']
+    def _load_raw_stations(self) -> List[Dict[str, Any]]:
+        if self.raw_stations is None:
+            response = requests.get(self.STATION_URL, headers=HEADERS, timeout=remaining_timeout(20))
+            self.raw_stations = response.json()['data']
+        return self.raw_stations
 
     def load_vehicles(self, default_last_reported: int) -> Tuple[Optional[Dict], Optional[Dict]]:
         types = {}
         vehicles = {}
-        for _, i in self.raw_cars.items():
+        for _, i in self._load_raw_cars().items():
             type_id = self.extract_type_id(i)
             types[type_id] = {
                 # See https://github.com/MobilityData/gbfs/blob/v2.3/gbfs.md#vehicle_typesjson
@@ -79,7 +97,7 @@ class OpenDataHubProvider(BaseProvider):
 
     def load_stations(self, default_last_reported: int) -> Tuple[Optional[Dict], Optional[Dict]]:
         info = {}
-        for i in self.raw_stations:
+        for i in self._load_raw_stations():
             id = i['scode']
             coord = i['scoordinate']
             info[id] = {
@@ -95,7 +113,7 @@ class OpenDataHubProvider(BaseProvider):
     def load_status(self, last_reported: int) -> Optional[Dict]:
         statuses = {}
 
-        for i in self.raw_stations:
+        for i in self._load_raw_stations():
             station_id = i['scode']
             statuses[station_id] = {
                 'station_id': station_id,
@@ -0,0 +1,88 @@
+import heapq
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FeedScheduler:
+    """
+    Keeps track of the next due time of every feed and dispatches feeds at a fixed rate:
+    a feed's next run is scheduled relative to the time it was due, not to the time its
+    previous run completed, so the cadence does not drift by the time a run takes.
+
+    A feed is never dispatched while its previous run is still in progress. If a run takes
+    longer than the feed's period, the feed is due again immediately, but missed runs are
+    not caught up in a burst.
+
+    Note: FeedScheduler is not thread safe and is expected to be used by the dispatching thread only.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.periods: Dict[str, float] = {}
+        self.running: Set[str] = set()
+        # due time of the next run of each feed currently running
+        self._next_due: Dict[str, float] = {}
+        # next due time of each feed currently not running
+        self._due: Dict[str, float] = {}
+        # heap of (due, provider), might contain outdated entries which are skipped lazily
+        self._queue: List[Tuple[float, str]] = []
+
+    def add(self, provider: str, period: float, first_due: Optional[float] = None) -> None:
+        """
+        Registers a feed which should be run every `period` seconds, the first time at `first_due`
+        (defaults to now).
+        """
+        if period <= 0:
+            raise ValueError(f'Refresh interval for {provider} must be positive, got {period}')
+        self.periods[provider] = period
+        self._schedule(provider, self.clock() if first_due is None else first_due)
+
+    def _schedule(self, provider: str, due: float) -> None:
+        self._due[provider] = due
+        heapq.heappush(self._queue, (due, provider))
+
+    def pop_due(self) -> List[str]:
+        """
+        Returns all feeds that are due now and marks them as running.
+        """
+        now = self.clock()
+        due_providers = []
+        while self._queue and self._queue[0][0] <= now:
+            due, provider = heapq.heappop(self._queue)
+            if self._due.get(provider) != due:
+                # outdated queue entry
+                continue
+            del self._due[provider]
+            self.running.add(provider)
+            # Next run is scheduled relative to this run's due time (fixed rate)
+            self._next_due[provider] = due + self.periods[provider]
+            due_providers.append(provider)
+        return due_providers
+
+    def complete(self, provider: str) -> None:
+        """
+        Marks the feed's current run as completed and schedules its next run.
+        """
+        self.running.discard(provider)
+        next_due = self._next_due.pop(provider)
+        now = self.clock()
+        if next_due < now:
+            logger.warning(
+                f'Generating feed for {provider} took longer than its refresh interval of {self.periods[provider]}s'
+            )
+            next_due = now
+        self._schedule(provider, next_due)
+
+    def seconds_until_next_due(self) -> Optional[float]:
+        """
+        Returns the number of seconds until the next feed not currently running is due,
+        or None, if every feed is running.
+        """
+        while self._queue and self._due.get(self._queue[0][1]) != self._queue[0][0]:
+            heapq.heappop(self._queue)
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - self.clock())
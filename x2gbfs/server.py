@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RenderedFile:
+    """
+    The rendered bytes of a gbfs file, together with their gzip compressed variant
+    and the headers needed to serve them.
+    """
+
+    def __init__(self, body: bytes, ttl: int, published_at: float, gzipped_body: Optional[bytes] = None):
+        self.body = body
+        # reused, if the file was precompressed already
+        self.gzipped_body = gzip.compress(body, compresslevel=6, mtime=0) if gzipped_body is None else gzipped_body
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.ttl = ttl
+        self.published_at = published_at
+
+    def max_age(self, now: float) -> int:
+        """
+        Returns the number of seconds this file may still be cached, i.e. its ttl minus the time elapsed since it was published.
+        """
+        return max(0, int(self.ttl - (now - self.published_at)))
+
+
+class FeedStore:
+    """
+    Keeps the latest rendered bytes of every gbfs file written below `root_dir` in memory,
+    keyed by their path relative to `root_dir` (e.g. `deer/gbfs.json`).
+
+    Files are compressed once when published (unless their precompressed variant is given), not on every request.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = os.path.abspath(root_dir)
+        self._files: Dict[str, RenderedFile] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, filename: str) -> str:
+        return os.path.relpath(os.path.abspath(filename), self.root_dir).replace(os.sep, '/')
+
+    def publish(
+        self,
+        filename: str,
+        body: bytes,
+        ttl: int,
+        published_at: Optional[float] = None,
+        gzipped_body: Optional[bytes] = None,
+    ) -> None:
+        """
+        Publishes body as the latest content of filename. gzipped_body, if given, is its gzip compressed variant.
+        """
+        rendered_file = RenderedFile(body, ttl, time.time() if published_at is None else published_at, gzipped_body)
+        key = self._key(filename)
+        with self._lock:
+            self._files[key] = rendered_file
+
+    def touch(self, filename: str, published_at: Optional[float] = None) -> None:
+        """
+        Marks the already published file as up to date again, e.g. as it was left unchanged by an update.
+        """
+        key = self._key(filename)
+        with self._lock:
+            rendered_file = self._files.get(key)
+            if rendered_file:
+                rendered_file.published_at = time.time() if published_at is None else published_at
+
+    def get(self, path: str) -> Optional[RenderedFile]:
+        with self._lock:
+            return self._files.get(path)
+
+    def load_directory(self) -> None:
+        """
+        Publishes all gbfs files already existing below root_dir, so they can be served
+        before the first update cycle completed. Their gzip variants (if precompressed) are reused.
+        """
+        for path in Path(self.root_dir).glob('**/*.json'):
+            try:
+                body = path.read_bytes()
+                ttl = json.loads(body).get('ttl', 0)
+                modified_at = path.stat().st_mtime
+            except (OSError, ValueError, AttributeError):
+                logger.warning(f'Could not load {path}, it will not be served before being updated')
+                continue
+            self.publish(str(path), body, ttl, modified_at, self._read_gzip_variant(path, modified_at))
+
+    @staticmethod
+    def _read_gzip_variant(path: Path, modified_at: float) -> Optional[bytes]:
+        """
+        Returns the content of path's precompressed gzip variant, or None, if there is none or it is outdated.
+        """
+        gzip_path = path.with_name(f'{path.name}.gz')
+        try:
+            if gzip_path.stat().st_mtime < modified_at:
+                return None
+            return gzip_path.read_bytes()
+        except OSError:
+            return None
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            # coding names and parameter names are case-insensitive, see RFC 9110, section 12.5.3
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etags: Tuple[str, ...]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # weak comparison, see RFC 9110, section 13.1.2
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return any(etag in candidates for etag in etags)
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves gbfs files from a FeedStore, supporting conditional requests via ETag/If-None-Match
+    and gzip content encoding.
+    """
+
+    store: FeedStore
+    server_version = 'x2gbfs'
+
+    def do_HEAD(self) -> None:
+        self._serve(include_body=False)
+
+    def do_GET(self) -> None:
+        self._serve(include_body=True)
+
+    def _serve(self, include_body: bool) -> None:
+        path = self.path.split('?', 1)[0].lstrip('/')
+        rendered_file = self.store.get(path)
+        if rendered_file is None:
+            self.send_error(404)
+            return
+
+        use_gzip = _accepts_gzip(self.headers.get('Accept-Encoding'))
+        etag = rendered_file.gzip_etag if use_gzip else rendered_file.etag
+        now = time.time()
+
+        if _etag_matches(self.headers.get('If-None-Match'), (rendered_file.etag, rendered_file.gzip_etag)):
+            self.send_response(304)
+            self._send_cache_headers(rendered_file, etag, now)
+            self.end_headers()
+            return
+
+        body = rendered_file.gzipped_body if use_gzip else rendered_file.body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self._send_cache_headers(rendered_file, etag, now)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, rendered_file: RenderedFile, etag: str, now: float) -> None:
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f'max-age={rendered_file.max_age(now)}')
+        self.send_header('Last-Modified', formatdate(rendered_file.published_at, usegmt=True))
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+def start_server(store: FeedStore, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Starts serving the store's files in a background thread and returns the server.
+    """
+    handler = type('BoundFeedRequestHandler', (FeedRequestHandler,), {'store': store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='x2gbfs-server', daemon=True).start()
+    logger.info(f'Serving feeds on http://{host}:{port}/')
+    return server
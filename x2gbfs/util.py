@@ -1,9 +1,14 @@
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Generator, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Generator, Optional, Tuple
 
-import requests
-from unidecode import unidecode
+from x2gbfs.deadline import remaining_timeout
+
+if TYPE_CHECKING:
+    import requests
+
+# Note: requests and unidecode are imported where needed, so importing this module
+# (which every provider does) does not pull them in for providers not using them.
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +21,8 @@ def unidecode_with_german_umlauts(string: str) -> str:
     As unidecode transliters German umlauts incorrectly (see the FAQ section of https://pypi.org/project/Unidecode/),
     unidecode_with_german_umlauts first replaces them explicitly.
     """
+    from unidecode import unidecode
+
     return unidecode(string.translate(GERMAN_UMLAUTS_TRANSLATIONS))
 
 
@@ -35,10 +42,12 @@ def get(
     headers: Optional[dict[str, str]] = None,
     timeout: int = 5,
     user_agent: str = 'x2gbfs +https://github.com/mobidata-bw/',
-):
+) -> 'requests.Response':
+    import requests
+
     request_headers = dict(headers) if headers is not None else {}
     request_headers['User-Agent'] = user_agent
-    response = requests.get(url, headers=request_headers, timeout=timeout, params=params)
+    response = requests.get(url, headers=request_headers, timeout=remaining_timeout(timeout), params=params)
     response.raise_for_status()
     return response
 
@@ -50,9 +59,11 @@ def post(
     json: Optional[Dict] = None,
     timeout: int = 5,
     user_agent: str = 'x2gbfs +https://github.com/mobidata-bw/',
-):
+) -> 'requests.Response':
+    import requests
+
     request_headers = dict(headers) if headers is not None else {}
     request_headers['User-Agent'] = user_agent
-    response = requests.post(url, headers=request_headers, timeout=timeout, params=params, json=json)
+    response = requests.post(url, headers=request_headers, timeout=remaining_timeout(timeout), params=params, json=json)
     response.raise_for_status()
     return response
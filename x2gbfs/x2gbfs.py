@@ -1,33 +1,29 @@
 import json
 import logging
 import os
+import sys
 import warnings
 from argparse import ArgumentParser
-from random import random
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from functools import partial
 from time import sleep
-from typing import Any, Dict, List
-
-import websockets.exceptions
-from decouple import config
-from requests.exceptions import HTTPError
+from typing import Any, Callable, Dict, List, Optional
 
+from x2gbfs.change_detection import ChangeDetector
+from x2gbfs.circuit_breaker import CircuitBreaker
+from x2gbfs.concurrency import UpstreamLimiter
+from x2gbfs.deadline import DeadlineExceeded, deadline
 from x2gbfs.gbfs import BaseProvider, GbfsTransformer, GbfsV2Writer, GbfsV3Writer
-from x2gbfs.providers import (
-    CambioProvider,
-    CantamenIXSIProvider,
-    Deer,
-    EinfachUnterwegsProvider,
-    ExampleProvider,
-    FleetsterAPI,
-    Free2moveAPI,
-    Free2moveProvider,
-    GbfsLightProvider,
-    LaraToGoProvider,
-    LastenVeloFreiburgProvider,
-    MikarProvider,
-    MoqoProvider,
-    OpenDataHubProvider,
-)
+from x2gbfs.gbfs.delta import DeltaTracker
+from x2gbfs.gbfs.serializer import SERIALIZERS, get_serializer
+from x2gbfs.gbfs.static_files import StaticFileTracker
+from x2gbfs.gbfs.validation import FeedValidationError, SchemaValidator
+from x2gbfs.manifest import ManifestWriter
+from x2gbfs.metrics import CycleMetrics, MetricsExporter, timed
+from x2gbfs.provider_registry import ProviderRegistry
+from x2gbfs.providers import find_provider_spec
+from x2gbfs.scheduler import FeedScheduler
 
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
@@ -40,95 +36,301 @@ X2GBFS_DEFAULT_CONFIG = {
     # Should this feed's gbfs.json use a custom base URL? If true, param `customBaseUrl`
     # must be provided on startup and will be used as feed base url instead of `baseUrl`
     'useCustomBaseUrl': False,
-    # As default, feeds are now generated in v3 (see CHANGELOG.md for further information)
+    # As default, feeds are now generated in v3 (see CHANGELOG.md for further information).
+    # A list of versions (e.g. [2, 3]) generates the feed in every version into a subdirectory v2, v3 etc.,
+    # fetching the upstream data only once.
     'gbfs_version': 3,
+    # Seconds between two updates of this feed, when running with --interval.
+    # If not defined, the feed is updated every ttl seconds, but not more often than every --interval seconds.
+    'refresh_interval': None,
+    # Max number of seconds all upstream requests for this feed may take in total.
+    # If exceeded, the update is abandoned and the previously generated feed is kept.
+    'max_runtime_seconds': None,
+    # If defined, vehicles without station_id are assigned to the nearest station within this many meters,
+    # e.g. for free floating vehicles parked at a provider's parking spots.
+    'station_snapping_radius_meters': None,
+    # If defined, geofencing zones are simplified, deviating at most this many meters from the original geometry.
+    'geofencing_simplification_meters': None,
 }
 
 
 def build_extractor(provider: str, feed_config: Dict[str, Any]) -> BaseProvider:
-    if provider == 'example':
-        return ExampleProvider(feed_config)
-    if provider == 'lastenvelo_fr':
-        return LastenVeloFreiburgProvider(feed_config)
-    if provider == 'deer':
-        api_url = config('DEER_API_URL')
-        api_user = config('DEER_USER')
-        api_password = config('DEER_PASSWORD')
-
-        fleetsterApi = FleetsterAPI(api_url, api_user, api_password)
-        return Deer(feed_config, fleetsterApi)
-    if provider == 'mikar':
-        api_url = config('MIKAR_API_URL')
-        api_user = config('MIKAR_USER')
-        api_password = config('MIKAR_PASSWORD')
-
-        fleetsterApi = FleetsterAPI(api_url, api_user, api_password)
-        return MikarProvider(feed_config, fleetsterApi)
-    if provider.startswith('cambio_'):
-        return CambioProvider(feed_config)
-    if (
-        provider in ['naturenergie_sharing', 'oekostadt_renningen', 'gruene-flotte_freiburg', 'swu2go', 'conficars_ulm']
-        or provider.startswith('stadtmobil_')
-        or provider.startswith('teilauto_')
-    ):
-        return CantamenIXSIProvider(feed_config)
-    if provider in [
-        'stadtwerk_tauberfranken',
-        'flinkster_carsharing',
-        'oberschwabenmobil',
-        'ford_carsharing_autohausbaur',
-        'ford_carsharing_autohauskauderer',
-        'stadtwerke_wertheim',
-        'hertlein_carsharing',
-    ]:
-        return MoqoProvider(feed_config)
-    if provider == 'lara_to_go':
-        return LaraToGoProvider(feed_config)
-    if provider in [
-        'einfach_unterwegs',
-        'seefahrer_ecarsharing',
-    ]:  # cargo_bicycle postprocessing
-        return EinfachUnterwegsProvider(feed_config)
-    if provider in ['alpsgo']:
-        return OpenDataHubProvider(feed_config)
-    if provider.startswith('free2move_'):
-        return Free2moveProvider(feed_config, Free2moveAPI())
-    if feed_config.get('x2gbfs', {}).get('provider') == 'gbfs-light':
-        return GbfsLightProvider(feed_config)
-
-    raise ValueError(f'Unknown config {provider}')
-
-
-def main(providers: List[str], output_dir: str, base_url: str, custom_base_url: str | None, interval: int = 0) -> None:
-    should_loop_infinetly = interval > 0
-    error_occured = False
+    spec = find_provider_spec(provider, feed_config)
+    if spec is None:
+        raise ValueError(f'Unknown config {provider}')
 
-    while True:
-        for provider in providers:
-            try:
-                generate_feed_for(provider, output_dir, base_url, custom_base_url)
-            except HTTPError as err:
-                logger.error(
-                    f'Generating feed for {provider} failed due to HTTP error {err.response.status_code} for url {err.request.url}'
-                )
-                error_occured = True
-            except websockets.exceptions.InvalidMessage as err:
-                logger.error(
-                    f'Generating feed for {provider} failed due to Websockets.InvalidMessage error: {err.args}'
-                )
-                error_occured = True
-            except TimeoutError:
-                logger.error(f'Generating feed for {provider} failed due to timeout error!')
-                error_occured = True
-            except Exception:
-                logger.exception(f'Generating feed for {provider} failed!')
-                error_occured = True
-
-        if should_loop_infinetly:
-            sleep(interval + random() * interval / 10)  # noqa: S311 (no cryptographic purpose)
+    return spec.load_class().from_config(feed_config)
+
+
+def run_provider(
+    provider: str,
+    output_dir: str,
+    base_url: str,
+    custom_base_url: str | None,
+    limiter: Optional[UpstreamLimiter] = None,
+    registry: Optional[ProviderRegistry] = None,
+    exporter: Optional[MetricsExporter] = None,
+    writer_options: Optional[Dict[str, Any]] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    manifest: Optional[ManifestWriter] = None,
+    change_detector: Optional[ChangeDetector] = None,
+) -> bool:
+    """
+    Generates the feed for the given provider, logging (but not raising) any error.
+    Returns True, if the feed was generated successfully, False otherwise.
+    If an exporter is given, the cycle's metrics are recorded.
+
+    If a circuit breaker is given and the provider's circuit is open, the update is skipped
+    and the last successfully generated feed stays published unchanged, i.e. with its original
+    `last_updated` and `ttl`. Consumers can thus tell it's outdated once `last_updated + ttl` has passed.
+    Only failures of the upstream (see UpstreamError) and exceeded time budgets count as circuit breaker failures,
+    local ones (e.g. an invalid feed or a failed write) do not.
+    """
+    if circuit_breaker and not circuit_breaker.allow(provider):
+        logger.debug(f'Skipping {provider}, as its circuit is open')
+        if exporter:
+            exporter.record_skipped(provider)
+        return False
+
+    metrics = CycleMetrics()
+    success = False
+    upstream_failed = False
+    try:
+        generate_feed_for(
+            provider,
+            output_dir,
+            base_url,
+            custom_base_url,
+            limiter,
+            registry,
+            metrics,
+            writer_options,
+            manifest,
+            change_detector,
+        )
+        success = True
+    except DeadlineExceeded:
+        upstream_failed = True
+        metrics.deadline_exceeded = True
+        logger.error(f'Generating feed for {provider} was abandoned, as it exceeded its max_runtime_seconds')
+    except UpstreamError as err:
+        upstream_failed = True
+        cause = err.__cause__
+        error_description = 'timeout error!' if isinstance(cause, TimeoutError) else describe_upstream_error(cause)
+        if error_description:
+            logger.error(f'Generating feed for {provider} failed due to {error_description}')
         else:
-            # In case an error occured, we terminate with exit code 1
-            exit(error_occured)
+            logger.exception(f'Generating feed for {provider} failed!')
+    except FeedValidationError as err:
+        logger.error(f'Generating feed for {provider} failed, as {err}')
+    except Exception:
+        logger.exception(f'Generating feed for {provider} failed!')
+
+    if circuit_breaker:
+        # a local failure (after the upstream responded) leaves the upstream's circuit closed
+        if upstream_failed:
+            circuit_breaker.record_failure(provider)
+        else:
+            circuit_breaker.record_success(provider)
+    if exporter:
+        exporter.record(provider, metrics, success)
+    return success
+
+
+class UpstreamError(Exception):
+    """
+    Raised (from the original error) when fetching or transforming a provider's upstream data failed,
+    as opposed to failures of x2gbfs itself, e.g. writing the feed.
+    """
+
+
+def describe_upstream_error(err: Optional[BaseException]) -> Optional[str]:
+    """
+    Returns a short description for well-known upstream errors, which need not be logged
+    with their stacktrace, or None for any other error.
+
+    Note: requests and websockets are only imported by the providers using them, so we
+    only check for their exceptions if they have been imported.
+    """
+    requests_exceptions = sys.modules.get('requests.exceptions')
+    if requests_exceptions and isinstance(err, requests_exceptions.HTTPError):
+        return f'HTTP error {err.response.status_code} for url {err.request.url}'
+    websockets_exceptions = sys.modules.get('websockets.exceptions')
+    if websockets_exceptions and isinstance(err, websockets_exceptions.InvalidMessage):
+        return f'Websockets.InvalidMessage error: {err.args}'
+    return None
+
+
+def main(
+    providers: List[str],
+    output_dir: str,
+    base_url: str,
+    custom_base_url: str | None,
+    interval: int = 0,
+    workers: int = 1,
+    max_per_host: int = 1,
+    metrics_file: Optional[str] = None,
+    serve: Optional[str] = None,
+    breaker_threshold: int = 3,
+    max_backoff: int = 3600,
+    compact: bool = False,
+    precompress: bool = False,
+    serializer: str = 'auto',
+    delta: bool = False,
+    write_workers: int = 1,
+    manifest: bool = False,
+    systems_csv: bool = False,
+    archive_dir: Optional[str] = None,
+    validate: str = 'off',
+    availability: str = 'full',
+    state_dir: Optional[str] = None,
+) -> None:
+    limiter = UpstreamLimiter(max_per_host)
+    registry = ProviderRegistry(build_extractor, build_transformer=partial(GbfsTransformer, availability))
+    periods = refresh_periods(providers, interval) if interval > 0 else {}
+    # Failing upstreams are only backed off when updating periodically, at least for one refresh period of the feed
+    circuit_breaker = (
+        CircuitBreaker(breaker_threshold, base_backoff=interval, max_backoff=max_backoff, base_backoffs=periods)
+        if interval > 0 and breaker_threshold > 0
+        else None
+    )
+    exporter = MetricsExporter(metrics_file, circuit_breaker) if metrics_file else None
+    json_serializer = get_serializer(serializer)
+    writer_options: Dict[str, Any] = {
+        'compact': compact,
+        'precompress': precompress,
+        'serializer': json_serializer,
+        'static_file_tracker': StaticFileTracker(json_serializer),
+    }
+    if delta:
+        writer_options['delta_tracker'] = DeltaTracker(json_serializer)
+    if archive_dir:
+        # imported only when archiving, as sqlite3 is not needed otherwise
+        from x2gbfs.archive import SnapshotArchive
+
+        writer_options['archive'] = SnapshotArchive(archive_dir, output_dir)
+    if validate != 'off':
+        # schemas are compiled once and shared by all feeds
+        writer_options['validator'] = SchemaValidator(blocking=validate == 'block')
+    if write_workers > 1:
+        # shared by all feeds, as feeds might be generated in parallel already
+        writer_options['write_executor'] = ThreadPoolExecutor(
+            max_workers=write_workers, thread_name_prefix='x2gbfs-write'
+        )
+    if serve:
+        if interval <= 0:
+            raise ValueError('--serve requires feeds to be updated periodically, i.e. --interval > 0')
+        # imported only when serving, as http.server is not needed otherwise
+        from x2gbfs.server import FeedStore, start_server
+
+        feed_store = FeedStore(output_dir)
+        # Serve the feeds of a previous run until they are updated
+        feed_store.load_directory()
+        host, _, port = serve.rpartition(':')
+        start_server(feed_store, host or '0.0.0.0', int(port))  # noqa: S104 (binding all interfaces is intended)
+        writer_options['feed_store'] = feed_store
+    manifest_writer = (
+        ManifestWriter(output_dir, systems_csv, json_serializer, writer_options.get('feed_store'))
+        if manifest or systems_csv
+        else None
+    )
+    change_detector = ChangeDetector(state_dir) if state_dir else None
+    # With a single worker, feeds are generated sequentially in the main thread
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='x2gbfs') if workers > 1 else None
+
+    def run(provider: str) -> bool:
+        return run_provider(
+            provider,
+            output_dir,
+            base_url,
+            custom_base_url,
+            limiter,
+            registry,
+            exporter,
+            writer_options,
+            circuit_breaker,
+            manifest_writer,
+            change_detector,
+        )
+
+    if interval > 0:
+        run_scheduled(periods, run, executor)
+
+    results = list(executor.map(run, providers) if executor else map(run, providers))
+    if executor:
+        executor.shutdown()
+    # In case an error occured, we terminate with exit code 1
+    exit(not all(results))
+
+
+def refresh_periods(providers: List[str], interval: int) -> Dict[str, int]:
+    """
+    Returns the number of seconds between two updates per feed (see refresh_interval_for).
+    """
+    periods = {}
+    for provider in providers:
+        try:
+            periods[provider] = refresh_interval_for(load_feed_config(provider), interval)
+        except Exception:
+            logger.exception(f'Could not determine refresh interval for {provider}, using {interval}s')
+            periods[provider] = interval
+    return periods
+
+
+def run_scheduled(periods: Dict[str, int], run: Callable[[str], bool], executor: Optional[ThreadPoolExecutor]) -> None:
+    """
+    Runs indefinitely and generates every feed according to its refresh period (in seconds, per provider).
+    Feeds are dispatched as soon as they are due, so a slow feed does not delay others
+    (as long as there are idle workers).
+    """
+    scheduler = FeedScheduler()
+    for provider, period in periods.items():
+        scheduler.add(provider, period)
+
+    pending: Dict[Future, str] = {}
+    while True:
+        for provider in scheduler.pop_due():
+            if executor:
+                pending[executor.submit(run, provider)] = provider
+            else:
+                run(provider)
+                scheduler.complete(provider)
+
+        timeout = scheduler.seconds_until_next_due()
+        if pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                scheduler.complete(pending.pop(future))
+        elif timeout:
+            sleep(timeout)
+
+
+def refresh_interval_for(feed_config: Dict[str, Any], interval: int) -> int:
+    """
+    Returns the number of seconds between two updates of a feed. This is the feed's
+    configured refresh_interval, or, if not configured, it's ttl, but at least `interval`.
+    """
+    refresh_interval = get_x2gbfs_config_value(feed_config, 'refresh_interval')
+    if refresh_interval:
+        return refresh_interval
+    return max(interval, get_x2gbfs_config_value(feed_config, 'ttl'))
+
+
+def gbfs_versions_for(feed_config: Dict[str, Any]) -> List[int]:
+    """
+    Returns the list of GBFS versions the feed should be generated in.
+    """
+    gbfs_version = get_x2gbfs_config_value(feed_config, 'gbfs_version')
+    gbfs_versions = gbfs_version if isinstance(gbfs_version, list) else [gbfs_version]
+    for version in gbfs_versions:
+        if version not in (2, 3):
+            raise ValueError(f'Unsupported gbfs_version {version}, expected 2, 3 or a list of them')
+    return gbfs_versions
+
+
+def load_feed_config(provider: str) -> Dict[str, Any]:
+    with open(f'config/{provider}.json') as config_file:
+        return json.load(config_file)
 
 
 def get_x2gbfs_config_value(feed_config, key):
@@ -160,9 +362,15 @@ def write_gbfs_feed(
     last_reported: int,
     ttl: int = 60,
     gbfs_version: int = 3,
+    metrics: Optional[CycleMetrics] = None,
+    writer_options: Optional[Dict[str, Any]] = None,
 ):
-
-    gbfs_writer = GbfsV2Writer() if gbfs_version == 2 else GbfsV3Writer()
+    """
+    Writes the feed in the given gbfs_version. writer_options are passed to the writer
+    and hold deployment wide settings like the FeedStore used in serve mode.
+    """
+    gbfs_writer_class = GbfsV2Writer if gbfs_version == 2 else GbfsV3Writer
+    gbfs_writer = gbfs_writer_class(metrics, **(writer_options or {}))
 
     gbfs_writer.write_gbfs_feed(
         destFolder,
@@ -180,16 +388,25 @@ def write_gbfs_feed(
     )
 
 
-def generate_feed_for(provider: str, output_dir: str, base_url: str, custom_base_url: str | None) -> None:
-    with open(f'config/{provider}.json') as config_file:
-        feed_config = json.load(config_file)
-
-    transformer = GbfsTransformer()
-    extractor = build_extractor(provider, feed_config)
-
-    (info, status, vehicle_types, vehicles, geofencing_zones, last_reported) = transformer.load_stations_and_vehicles(
-        extractor
-    )
+def generate_feed_for(
+    provider: str,
+    output_dir: str,
+    base_url: str,
+    custom_base_url: str | None,
+    limiter: Optional[UpstreamLimiter] = None,
+    registry: Optional[ProviderRegistry] = None,
+    metrics: Optional[CycleMetrics] = None,
+    writer_options: Optional[Dict[str, Any]] = None,
+    manifest: Optional[ManifestWriter] = None,
+    change_detector: Optional[ChangeDetector] = None,
+) -> None:
+    if registry:
+        instance = registry.get(provider)
+        feed_config, extractor, transformer = instance.feed_config, instance.extractor, instance.transformer
+    else:
+        feed_config = load_feed_config(provider)
+        extractor = build_extractor(provider, feed_config)
+        transformer = GbfsTransformer()
 
     is_feed_protected = get_x2gbfs_config_value(feed_config, 'useCustomBaseUrl')
     if is_feed_protected:
@@ -199,25 +416,69 @@ def generate_feed_for(provider: str, output_dir: str, base_url: str, custom_base
     else:
         feed_base_url = f'{base_url}/{provider}'
 
-    system_information = transformer.load_system_information(extractor)
-    pricing_plans = transformer.load_pricing_plans(extractor)
-    alerts = transformer.load_alerts(extractor)
+    max_runtime_seconds = get_x2gbfs_config_value(feed_config, 'max_runtime_seconds')
+    # Only the upstream requests are subject to the per host limit and the time budget, writing the feed is not.
+    # Waiting for the per host limit does not count towards the time budget.
+    try:
+        with limiter.limit(extractor.upstream_host()) if limiter else nullcontext(), deadline(max_runtime_seconds):
+            (info, status, vehicle_types, vehicles, geofencing_zones, last_reported) = (
+                transformer.load_stations_and_vehicles(
+                    extractor,
+                    metrics,
+                    get_x2gbfs_config_value(feed_config, 'station_snapping_radius_meters'),
+                    get_x2gbfs_config_value(feed_config, 'geofencing_simplification_meters'),
+                )
+            )
 
-    write_gbfs_feed(
-        f'{output_dir}/{provider}',
-        system_information,
-        info,
-        status,
-        vehicle_types,
-        vehicles,
-        geofencing_zones,
-        pricing_plans,
-        alerts,
-        feed_base_url,
-        last_reported,
-        ttl=get_x2gbfs_config_value(feed_config, 'ttl'),
-        gbfs_version=get_x2gbfs_config_value(feed_config, 'gbfs_version'),
-    )
+            with timed(metrics, 'fetch'):
+                system_information = transformer.load_system_information(extractor)
+                pricing_plans = transformer.load_pricing_plans(extractor)
+                alerts = transformer.load_alerts(extractor)
+    except DeadlineExceeded:
+        raise
+    except Exception as err:
+        raise UpstreamError(f'Fetching or transforming the data of {provider} failed') from err
+
+    if change_detector:
+        # last_reported only advances for stations and vehicles which changed since the previous cycle
+        with timed(metrics, 'transform'):
+            changed_stations = change_detector.update(provider, 'station_status', status, 'station_id', last_reported)
+            changed_vehicles = change_detector.update(provider, 'vehicles', vehicles, 'bike_id', last_reported)
+        if metrics:
+            metrics.set_count('changed_stations', changed_stations)
+            metrics.set_count('changed_vehicles', changed_vehicles)
+
+    if metrics:
+        metrics.count('stations', info)
+        metrics.count('vehicles', vehicles)
+        metrics.count('vehicle_types', vehicle_types)
+
+    gbfs_versions = gbfs_versions_for(feed_config)
+    feed_urls = {}
+    for gbfs_version in gbfs_versions:
+        # Note: writers do not modify the entities, so they can be shared by all versions
+        version_subdir = f'/v{gbfs_version}' if len(gbfs_versions) > 1 else ''
+        feed_urls[gbfs_version] = f'{feed_base_url}{version_subdir}/gbfs.json'
+        write_gbfs_feed(
+            f'{output_dir}/{provider}{version_subdir}',
+            system_information,
+            info,
+            status,
+            vehicle_types,
+            vehicles,
+            geofencing_zones,
+            pricing_plans,
+            alerts,
+            f'{feed_base_url}{version_subdir}',
+            last_reported,
+            ttl=get_x2gbfs_config_value(feed_config, 'ttl'),
+            gbfs_version=gbfs_version,
+            metrics=metrics,
+            writer_options=writer_options,
+        )
+    if manifest and not is_feed_protected:
+        # protected feeds are not listed publicly
+        manifest.update(system_information, feed_urls)
     logger.info(f'Updated feeds for {provider}')
 
 
@@ -243,11 +504,145 @@ if __name__ == '__main__':
         '-i',
         '--interval',
         required=False,
-        help='if provided, feeds will be updated every interval seconds. 0 means feeds are only genereated once',
+        help='if provided, feeds will be updated every interval seconds (or their configured refresh_interval/ttl, if longer). 0 means feeds are only genereated once',
         default=0,
         type=int,
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        required=False,
+        help='number of feeds generated in parallel. 1 means feeds are generated one after another',
+        default=1,
+        type=int,
+    )
+    parser.add_argument(
+        '--maxPerHost',
+        required=False,
+        help='max number of feeds concurrently requesting the same upstream host (only relevant for workers > 1)',
+        default=1,
+        type=int,
+    )
+
+    parser.add_argument(
+        '--metricsFile',
+        required=False,
+        help='if provided, per feed timings and entity counts are written to this file in Prometheus text format (e.g. for the node-exporter textfile collector)',
+    )
+
+    parser.add_argument(
+        '--serve',
+        required=False,
+        help='if provided as [host:]port, feeds are additionally served via HTTP from memory, with ETag and gzip support (requires --interval)',
+    )
+
+    parser.add_argument(
+        '--breakerThreshold',
+        required=False,
+        help='number of consecutive upstream failures after which updates of a feed are skipped with exponential backoff, starting with its refresh interval (only relevant with --interval). 0 disables backoff',
+        default=3,
+        type=int,
+    )
+    parser.add_argument(
+        '--maxBackoff',
+        required=False,
+        help='max number of seconds updates of a failing feed are skipped',
+        default=3600,
+        type=int,
+    )
+
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='write feeds without whitespace, with sorted keys and entities sorted by id',
+    )
+    parser.add_argument(
+        '--precompress',
+        action='store_true',
+        help='additionally write .gz (and, if brotli is installed, .br) compressed variants of every file, e.g. for nginx gzip_static',
+    )
+
+    parser.add_argument(
+        '--serializer',
+        choices=['auto', *SERIALIZERS],
+        default='auto',
+        help='JSON serializer used to write feeds. auto uses orjson, if installed, json otherwise. Both produce identical output',
+    )
+
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='additionally write the vehicles and stations changed since the previous update to *.delta.json',
+    )
+
+    parser.add_argument(
+        '--writeWorkers',
+        required=False,
+        help='number of threads serializing and writing the files of feeds concurrently',
+        default=1,
+        type=int,
+    )
+
+    parser.add_argument(
+        '--manifest',
+        action='store_true',
+        help='maintain a GBFS manifest.json listing all generated feeds in the output directory',
+    )
+    parser.add_argument(
+        '--systemsCsv',
+        action='store_true',
+        help='maintain a systems.csv listing all generated feeds in the output directory (implies --manifest)',
+    )
+
+    parser.add_argument(
+        '--archiveDir',
+        required=False,
+        help='archive every published state of the feeds in this directory (see python -m x2gbfs.archive)',
+    )
+
+    parser.add_argument(
+        '--validate',
+        choices=['off', 'warn', 'block'],
+        default='off',
+        help='validate files against the GBFS schemas. warn logs invalid entities, block additionally does not write any file of an invalid feed',
+    )
+
+    parser.add_argument(
+        '--availability',
+        choices=GbfsTransformer.AVAILABILITY_MODES,
+        default='full',
+        help='how station availabilities are deduced from vehicles. incremental only recomputes stations whose vehicles changed since the previous update (only relevant with --interval), verify additionally checks the result against a full recomputation',
+    )
+
+    parser.add_argument(
+        '--stateDir',
+        required=False,
+        help='only advance last_reported of stations and vehicles which changed since the previous update, keeping their fingerprints in this directory across restarts',
+    )
 
     args = parser.parse_args()
 
-    main(args.providers.split(','), args.outputDir, args.baseUrl, args.customBaseUrl, args.interval)
+    main(
+        args.providers.split(','),
+        args.outputDir,
+        args.baseUrl,
+        args.customBaseUrl,
+        args.interval,
+        args.workers,
+        args.maxPerHost,
+        args.metricsFile,
+        args.serve,
+        args.breakerThreshold,
+        args.maxBackoff,
+        args.compact,
+        args.precompress,
+        args.serializer,
+        args.delta,
+        args.writeWorkers,
+        args.manifest,
+        args.systemsCsv,
+        args.archiveDir,
+        args.validate,
+        args.availability,
+        args.stateDir,
+    )